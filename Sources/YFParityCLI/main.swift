@@ -25,13 +25,60 @@ struct Args {
 
 @main
 struct YFParityCLI {
+    /// Shared across every payload so a `serve` session bootstraps the Yahoo
+    /// cookie/crumb pair once instead of once per operation.
+    /// `YF_PARITY_BASE_URL` points the query1, query2, root and cookie-bootstrap
+    /// hosts, and with them the basic cookie/crumb handshake, at an offline
+    /// stand-in such as `tools/parity_standin.py`. Each host keeps its name as
+    /// a `/__host/<host>` path prefix so a recording proxy can forward to the
+    /// host the request was meant for. The csrf consent fallback in
+    /// `YFCrumbStore` still goes to guce.yahoo.com and consent.yahoo.com; the
+    /// stand-in's crumb always succeeds, so an offline run never reaches it.
+    static let client: YFinanceClient = {
+        guard let raw = ProcessInfo.processInfo.environment["YF_PARITY_BASE_URL"],
+              let base = URL(string: raw.trimmingCharacters(in: .whitespacesAndNewlines)),
+              base.scheme != nil else {
+            return YFinanceClient()
+        }
+        func standIn(_ host: String) -> URL {
+            base.appendingPathComponent("__host").appendingPathComponent(host)
+        }
+        return YFinanceClient(
+            query1BaseURL: standIn("query1.finance.yahoo.com"),
+            query2BaseURL: standIn("query2.finance.yahoo.com"),
+            rootBaseURL: standIn("finance.yahoo.com"),
+            cookieBootstrapURL: standIn("fc.yahoo.com")
+        )
+    }()
+
+    /// Every Yahoo operation runs through one coordinator so snapshots can
+    /// report attempts, rate limits and traces alongside the data. It only
+    /// counts: one attempt per operation, no cooldown wait and no permit cap,
+    /// so the Swift side behaves like the bare client Python yfinance is
+    /// compared against, and the harness's own request budget stays in charge.
+    static let coordinator = YFRequestCoordinator(
+        policy: YFRequestPolicy(
+            maxConcurrentRequests: Int.max,
+            maxAttempts: 1,
+            baseRetryDelay: 0,
+            maxRetryDelay: 0,
+            retryJitterFraction: 0,
+            baseRateLimitCooldown: 0,
+            maxRateLimitCooldown: 0
+        )
+    )
+
     static func main() async {
         do {
             let args = try parseArgs(Array(CommandLine.arguments.dropFirst()))
+            if args.command == "serve" || args.command == "batch" {
+                await serve()
+                return
+            }
             let payload = try await run(args: args)
             try printJSON(payload)
         } catch {
-            let message = (error as? LocalizedError)?.errorDescription ?? error.localizedDescription
+            let message = errorMessage(error)
             let payload: [String: Any] = [
                 "ok": false,
                 "error": message
@@ -77,11 +124,80 @@ struct YFParityCLI {
           YFParityCLI snapshot --symbol AAPL [--period 1mo] [--interval 1d] [--history-limit 30] [--earnings-limit 4] [--income-limit 4] [--freq yearly]
           YFParityCLI quote --symbol AAPL
           YFParityCLI history --symbol AAPL [--period 1mo] [--interval 1d] [--limit 30]
+          YFParityCLI history --symbol AAPL --start <epoch-seconds> [--end <epoch-seconds>] [--interval 1d]
           YFParityCLI earnings-dates --symbol AAPL [--limit 4]
           YFParityCLI income-stmt --symbol AAPL [--freq yearly|quarterly] [--limit 4]
+          YFParityCLI ping
+          YFParityCLI serve
+
+        `serve` (alias `batch`) reads newline-delimited JSON requests on stdin, e.g.
+          {"id": 1, "command": "snapshot", "symbol": "AAPL", "period": "1mo", "history-limit": 30}
+        and writes one JSON result per line, echoing `id`, until stdin closes.
+        `ping` answers without touching Yahoo, so callers can time process startup.
+
+        `snapshot` and `history` accept `--bars-path <file>` to write history bars to a
+        columnar file (format `yfcol1`) instead of inline JSON rows.
+
+        `snapshot` results carry `diagnostics`, the redacted YFDiagnosticsExport for the
+        requests that snapshot made.
         """
     }
 
+    /// Long-lived request loop used by `tools/parity_harness.py` so one process
+    /// (and one Yahoo cookie/crumb session) serves every symbol of a run.
+    static func serve() async {
+        while let line = readLine(strippingNewline: true) {
+            let trimmed = line.trimmingCharacters(in: .whitespacesAndNewlines)
+            if trimmed.isEmpty { continue }
+
+            var requestID: Any?
+            var payload: [String: Any]
+            do {
+                let request = try parseRequestLine(trimmed)
+                requestID = request.id
+                payload = try await run(args: request.args)
+            } catch {
+                payload = ["ok": false, "error": errorMessage(error)]
+            }
+            if let requestID {
+                payload["id"] = requestID
+            }
+            writeLine(payload)
+        }
+    }
+
+    static func parseRequestLine(_ line: String) throws -> (id: Any?, args: Args) {
+        guard let object = try? JSONSerialization.jsonObject(with: Data(line.utf8)) as? [String: Any] else {
+            throw ParityCLIError.invalidOption("Request line is not a JSON object")
+        }
+
+        var options: [String: String] = [:]
+        for (key, value) in object where key != "id" && key != "command" {
+            let name = key.replacingOccurrences(of: "_", with: "-")
+            switch value {
+            case let text as String:
+                options[name] = text
+            case let number as NSNumber:
+                options[name] = number.stringValue
+            case is NSNull:
+                continue
+            default:
+                throw ParityCLIError.invalidOption("Unsupported value for request field: \(key)")
+            }
+        }
+
+        let command = (object["command"] as? String) ?? "snapshot"
+        var id: Any? = object["id"]
+        if id is NSNull {
+            id = nil
+        }
+        return (id, Args(command: command.lowercased(), options: options))
+    }
+
+    static func errorMessage(_ error: Error) -> String {
+        (error as? LocalizedError)?.errorDescription ?? error.localizedDescription
+    }
+
     static func run(args: Args) async throws -> [String: Any] {
         switch args.command {
         case "snapshot":
@@ -99,7 +215,8 @@ struct YFParityCLI {
                 historyLimit: historyLimit,
                 earningsLimit: earningsLimit,
                 incomeLimit: incomeLimit,
-                incomeFrequency: freq
+                incomeFrequency: freq,
+                barsPath: args.options["bars-path"]
             )
         case "quote":
             let symbol = try requiredOption("symbol", in: args.options)
@@ -109,7 +226,18 @@ struct YFParityCLI {
             let period = args.options["period"] ?? "1mo"
             let interval = args.options["interval"] ?? "1d"
             let limit = intOption("limit", in: args.options, defaultValue: 30)
-            return try await historyPayload(symbol: symbol, period: period, interval: interval, limit: limit)
+            let barsPath = args.options["bars-path"]
+            if let start = try dateOption("start", in: args.options) {
+                let end = try dateOption("end", in: args.options) ?? Date()
+                return try await historyWindowPayload(
+                    symbol: symbol,
+                    interval: interval,
+                    start: start,
+                    end: end,
+                    barsPath: barsPath
+                )
+            }
+            return try await historyPayload(symbol: symbol, period: period, interval: interval, limit: limit, barsPath: barsPath)
         case "earnings-dates":
             let symbol = try requiredOption("symbol", in: args.options)
             let limit = intOption("limit", in: args.options, defaultValue: 4)
@@ -119,6 +247,8 @@ struct YFParityCLI {
             let limit = intOption("limit", in: args.options, defaultValue: 4)
             let freq = args.options["freq"] ?? "yearly"
             return try await incomePayload(symbol: symbol, frequency: freq, limit: limit)
+        case "ping":
+            return ["ok": true, "command": "ping"]
         default:
             throw ParityCLIError.usage(usageText)
         }
@@ -138,9 +268,21 @@ struct YFParityCLI {
         return max(1, value)
     }
 
+    static func dateOption(_ name: String, in options: [String: String]) throws -> Date? {
+        guard let raw = options[name] else {
+            return nil
+        }
+        guard let seconds = TimeInterval(raw) else {
+            throw ParityCLIError.invalidOption("--\(name) expects epoch seconds, got \(raw)")
+        }
+        return Date(timeIntervalSince1970: seconds)
+    }
+
     static func quotePayload(symbol: String) async throws -> [String: Any] {
-        let ticker = YFTicker(symbol)
-        let quote = try await ticker.quote()
+        let ticker = YFTicker(symbol, client: client)
+        let quote = try await coordinator.execute(endpoint: "quote", resource: symbol.uppercased()) {
+            try await ticker.quote()
+        }
         let normalized = normalizeQuote(symbol: symbol, quote: quote)
         return [
             "ok": true,
@@ -150,24 +292,155 @@ struct YFParityCLI {
         ]
     }
 
-    static func historyPayload(symbol: String, period: String, interval: String, limit: Int) async throws -> [String: Any] {
-        let ticker = YFTicker(symbol)
-        let series = try await ticker.history(
-            period: period,
-            interval: interval,
-            prepost: false,
-            actions: true,
-            autoAdjust: true,
-            backAdjust: false,
-            repair: false,
-            keepNa: false,
-            rounding: false
+    static func historyPayload(
+        symbol: String,
+        period: String,
+        interval: String,
+        limit: Int,
+        barsPath: String? = nil
+    ) async throws -> [String: Any] {
+        let ticker = YFTicker(symbol, client: client)
+        let resource = "\(symbol.uppercased()):\(period):\(interval)"
+        let series = try await coordinator.execute(endpoint: "history", resource: resource) {
+            try await ticker.history(
+                period: period,
+                interval: interval,
+                prepost: false,
+                actions: true,
+                autoAdjust: true,
+                backAdjust: false,
+                repair: false,
+                keepNa: false,
+                rounding: false
+            )
+        }
+
+        let sorted = series.bars.sorted { $0.date < $1.date }
+        var data = try historyData(Array(sorted.suffix(max(1, limit))), interval: interval, barsPath: barsPath)
+        data["period"] = period
+        return [
+            "ok": true,
+            "operation": "history",
+            "symbol": symbol.uppercased(),
+            "data": data
+        ]
+    }
+
+    /// Every bar in `[start, end)`; the harness walks long histories in
+    /// date-ordered windows so neither process holds `period=max` at once.
+    static func historyWindowPayload(
+        symbol: String,
+        interval: String,
+        start: Date,
+        end: Date,
+        barsPath: String? = nil
+    ) async throws -> [String: Any] {
+        guard let parsedInterval = YFinanceClient.Interval(pythonValue: interval) else {
+            throw ParityCLIError.invalidOption("Unsupported interval: \(interval)")
+        }
+        let ticker = YFTicker(symbol, client: client)
+        let resource = "\(symbol.uppercased()):custom:\(interval)"
+        let series = try await coordinator.execute(endpoint: "history", resource: resource) {
+            try await ticker.history(
+                start: start,
+                end: end,
+                interval: parsedInterval,
+                prepost: false,
+                actions: true,
+                autoAdjust: true,
+                backAdjust: false,
+                repair: false,
+                keepNa: false,
+                rounding: false
+            )
+        }
+
+        let sorted = series.bars.filter { $0.date >= start && $0.date < end }.sorted { $0.date < $1.date }
+        var data = try historyData(sorted, interval: interval, barsPath: barsPath)
+        data["start"] = Int(start.timeIntervalSince1970)
+        data["end"] = Int(end.timeIntervalSince1970)
+        return [
+            "ok": true,
+            "operation": "history",
+            "symbol": symbol.uppercased(),
+            "data": data
+        ]
+    }
+
+    /// JSON `bars` rows, or with `barsPath` a columnar file the caller can
+    /// memory-map instead of parsing (see `writeBarColumns`).
+    static func historyData(_ bars: [YFHistoryBar], interval: String, barsPath: String?) throws -> [String: Any] {
+        guard let barsPath else {
+            let rows = historyRows(bars, interval: interval)
+            return ["interval": interval, "barCount": rows.count, "bars": rows]
+        }
+        try writeBarColumns(bars, to: barsPath)
+        return [
+            "interval": interval,
+            "barCount": bars.count,
+            "columns": ["format": barColumnsFormat, "path": barsPath]
+        ]
+    }
+
+    static let barColumnsFormat = "yfcol1"
+
+    /// Columnar bar file read by `read_bar_columns` in `tools/parity_harness.py`:
+    ///
+    ///     bytes 0..<8      magic "YFCOL1\0\0"
+    ///     bytes 8..<16     header length H, little-endian UInt64
+    ///     bytes 16..<16+H  UTF-8 JSON {"rows": n, "columns": [{"name", "dtype", "offset"}]}
+    ///     column data      starts at 16+H rounded up to 8; offsets are relative to it
+    ///
+    /// Timestamps and volume are `<i8` (epoch seconds; missing volume is
+    /// `Int64.min`), prices are `<f8` with NaN for missing values, `repaired`
+    /// is `|u1`. Every column starts on an 8-byte boundary.
+    static func writeBarColumns(_ bars: [YFHistoryBar], to path: String) throws {
+        let columns: [(name: String, dtype: String, bytes: Data)] = [
+            ("timestamp", "<i8", littleEndianBytes(bars.map { Int64($0.date.timeIntervalSince1970.rounded(.down)) })),
+            ("open", "<f8", littleEndianBytes(bars.map { $0.open ?? .nan })),
+            ("high", "<f8", littleEndianBytes(bars.map { $0.high ?? .nan })),
+            ("low", "<f8", littleEndianBytes(bars.map { $0.low ?? .nan })),
+            ("close", "<f8", littleEndianBytes(bars.map { $0.close ?? .nan })),
+            ("adjustedClose", "<f8", littleEndianBytes(bars.map { $0.adjustedClose ?? .nan })),
+            ("volume", "<i8", littleEndianBytes(bars.map { bar in bar.volume.map { Int64($0) } ?? Int64.min })),
+            ("repaired", "|u1", Data(bars.map { $0.repaired ? UInt8(1) : UInt8(0) }))
+        ]
+
+        var body = Data()
+        var descriptors: [[String: Any]] = []
+        for column in columns {
+            descriptors.append(["name": column.name, "dtype": column.dtype, "offset": body.count])
+            body.append(column.bytes)
+            body.append(Data(count: (8 - body.count % 8) % 8))
+        }
+        let header = try JSONSerialization.data(
+            withJSONObject: ["rows": bars.count, "columns": descriptors],
+            options: [.sortedKeys]
         )
 
+        var file = Data("YFCOL1\0\0".utf8)
+        file.append(littleEndianBytes([UInt64(header.count)]))
+        file.append(header)
+        file.append(Data(count: (8 - file.count % 8) % 8))
+        file.append(body)
+        try file.write(to: URL(fileURLWithPath: path), options: .atomic)
+    }
+
+    static func littleEndianBytes(_ values: [Int64]) -> Data {
+        values.map(\.littleEndian).withUnsafeBytes { Data($0) }
+    }
+
+    static func littleEndianBytes(_ values: [UInt64]) -> Data {
+        values.map(\.littleEndian).withUnsafeBytes { Data($0) }
+    }
+
+    static func littleEndianBytes(_ values: [Double]) -> Data {
+        values.map(\.bitPattern.littleEndian).withUnsafeBytes { Data($0) }
+    }
+
+    static func historyRows(_ bars: [YFHistoryBar], interval: String) -> [[String: Any]] {
         let isIntraday = interval.lowercased().contains("m") || interval.lowercased().contains("h")
-        let sorted = series.bars.sorted { $0.date < $1.date }
-        let sliced = Array(sorted.suffix(max(1, limit)))
-        let rows: [[String: Any]] = sliced.map { bar in
+        return bars.map { bar in
             [
                 "date": formatDate(bar.date, includeTime: isIntraday),
                 "open": numberOrNull(bar.open),
@@ -179,24 +452,14 @@ struct YFParityCLI {
                 "repaired": bar.repaired
             ]
         }
-
-        return [
-            "ok": true,
-            "operation": "history",
-            "symbol": symbol.uppercased(),
-            "data": [
-                "period": period,
-                "interval": interval,
-                "barCount": rows.count,
-                "bars": rows
-            ]
-        ]
     }
 
     static func earningsPayload(symbol: String, limit: Int) async throws -> [String: Any] {
-        let ticker = YFTicker(symbol)
+        let ticker = YFTicker(symbol, client: client)
         let fetchLimit = min(max(limit * 4, 12), 100)
-        let table = try await ticker.earningsDatesTable(limit: fetchLimit, offset: 0)
+        let table = try await coordinator.execute(endpoint: "earnings-dates", resource: symbol.uppercased()) {
+            try await ticker.earningsDatesTable(limit: fetchLimit, offset: 0)
+        }
         let normalized = normalizeEarningsRows(table.rows, limit: limit)
 
         return [
@@ -215,8 +478,11 @@ struct YFParityCLI {
             throw ParityCLIError.invalidOption("Unsupported frequency: \(frequency)")
         }
 
-        let ticker = YFTicker(symbol)
-        let table = try await ticker.incomeStmtTable(freq: freq)
+        let ticker = YFTicker(symbol, client: client)
+        let resource = "\(symbol.uppercased()):income:\(freq.rawValue)"
+        let table = try await coordinator.execute(endpoint: "financials", resource: resource) {
+            try await ticker.incomeStmtTable(freq: freq)
+        }
         let rows = normalizeIncomeRows(table.rows, limit: limit)
 
         return [
@@ -238,8 +504,11 @@ struct YFParityCLI {
         historyLimit: Int,
         earningsLimit: Int,
         incomeLimit: Int,
-        incomeFrequency: String
+        incomeFrequency: String,
+        barsPath: String? = nil
     ) async throws -> [String: Any] {
+        let before = await coordinator.snapshot()
+        let startedAt = Date()
         var errors: [[String: Any]] = []
         var quote: Any = NSNull()
         var history: Any = NSNull()
@@ -254,7 +523,13 @@ struct YFParityCLI {
         }
 
         do {
-            let result = try await historyPayload(symbol: symbol, period: period, interval: interval, limit: historyLimit)
+            let result = try await historyPayload(
+                symbol: symbol,
+                period: period,
+                interval: interval,
+                limit: historyLimit,
+                barsPath: barsPath
+            )
             history = result["data"] ?? NSNull()
         } catch {
             errors.append(["operation": "history", "error": error.localizedDescription])
@@ -274,6 +549,7 @@ struct YFParityCLI {
             errors.append(["operation": "income-stmt", "error": error.localizedDescription])
         }
 
+        let diagnostics = await diagnosticsPayload(since: before, startedAt: startedAt)
         return [
             "ok": errors.isEmpty,
             "operation": "snapshot",
@@ -282,10 +558,47 @@ struct YFParityCLI {
             "history": history,
             "earnings_dates": earnings,
             "income_stmt": income,
-            "errors": errors
+            "errors": errors,
+            "diagnostics": diagnostics
         ]
     }
 
+    /// Redacted `YFDiagnosticsExport` covering only the requests made since
+    /// `before`. `serve` runs one request at a time, so counter deltas and
+    /// traces started after `startedAt` belong to this snapshot alone.
+    static func diagnosticsPayload(since before: YFRequestDiagnosticsSnapshot, startedAt: Date) async -> Any {
+        let after = await coordinator.snapshot()
+        let window = YFRequestDiagnosticsSnapshot(
+            logicalRequests: after.logicalRequests - before.logicalRequests,
+            attempts: after.attempts - before.attempts,
+            successes: after.successes - before.successes,
+            failures: after.failures - before.failures,
+            retries: after.retries - before.retries,
+            rateLimits: after.rateLimits - before.rateLimits,
+            coalescedRequests: after.coalescedRequests - before.coalescedRequests,
+            cacheHits: after.cacheHits - before.cacheHits,
+            cacheMisses: after.cacheMisses - before.cacheMisses,
+            activeRequests: after.activeRequests,
+            queuedRequests: after.queuedRequests,
+            cooldownUntil: after.cooldownUntil,
+            recentTraces: after.recentTraces.filter { $0.startedAt >= startedAt }
+        )
+
+        // Millisecond ISO 8601 so trace start times keep their ordering.
+        let encoder = JSONEncoder()
+        encoder.dateEncodingStrategy = .custom { date, encoder in
+            let formatter = ISO8601DateFormatter()
+            formatter.formatOptions = [.withInternetDateTime, .withFractionalSeconds]
+            var container = encoder.singleValueContainer()
+            try container.encode(formatter.string(from: date))
+        }
+        guard let data = try? encoder.encode(window.redactedExport()),
+              let object = try? JSONSerialization.jsonObject(with: data) else {
+            return NSNull()
+        }
+        return object
+    }
+
     static func normalizeQuote(symbol: String, quote: YFQuote?) -> [String: Any] {
         [
             "symbol": quote?.symbol ?? symbol.uppercased(),
@@ -589,6 +902,15 @@ struct YFParityCLI {
         return NSNull()
     }
 
+    /// Unbuffered variant of `printJSON` for `serve`: the harness blocks on each
+    /// line, so results must not sit in the stdout buffer.
+    static func writeLine(_ payload: [String: Any]) {
+        var data = (try? JSONSerialization.data(withJSONObject: payload, options: [.sortedKeys]))
+            ?? Data("{\"ok\":false,\"error\":\"encoding_failed\"}".utf8)
+        data.append(0x0A)
+        FileHandle.standardOutput.write(data)
+    }
+
     static func printJSON(_ payload: [String: Any]) throws {
         let data = try JSONSerialization.data(withJSONObject: payload, options: [.sortedKeys])
         if let text = String(data: data, encoding: .utf8) {
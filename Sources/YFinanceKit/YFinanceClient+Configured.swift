@@ -6,7 +6,8 @@ extension YFinanceClient {
         userAgent: String = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36",
         query1BaseURL: URL = URL(string: "https://query1.finance.yahoo.com")!,
         query2BaseURL: URL = URL(string: "https://query2.finance.yahoo.com")!,
-        rootBaseURL: URL = URL(string: "https://finance.yahoo.com")!
+        rootBaseURL: URL = URL(string: "https://finance.yahoo.com")!,
+        cookieBootstrapURL: URL = URL(string: "https://fc.yahoo.com")!
     ) async -> YFinanceClient {
         let network = await YFConfigStore.shared.network
 
@@ -22,7 +23,8 @@ extension YFinanceClient {
             userAgent: userAgent,
             query1BaseURL: query1BaseURL,
             query2BaseURL: query2BaseURL,
-            rootBaseURL: rootBaseURL
+            rootBaseURL: rootBaseURL,
+            cookieBootstrapURL: cookieBootstrapURL
         )
     }
 }
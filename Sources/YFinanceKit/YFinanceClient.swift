@@ -132,7 +132,8 @@ public actor YFinanceClient {
         userAgent: String = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36",
         query1BaseURL: URL = URL(string: "https://query1.finance.yahoo.com")!,
         query2BaseURL: URL = URL(string: "https://query2.finance.yahoo.com")!,
-        rootBaseURL: URL = URL(string: "https://finance.yahoo.com")!
+        rootBaseURL: URL = URL(string: "https://finance.yahoo.com")!,
+        cookieBootstrapURL: URL = URL(string: "https://fc.yahoo.com")!
     ) {
         self.session = session
         self.transport = YFURLSessionTransport(session: session)
@@ -141,7 +142,13 @@ public actor YFinanceClient {
         self.query2BaseURL = query2BaseURL
         self.rootBaseURL = rootBaseURL
         self.decoder = JSONDecoder()
-        self.crumbStore = YFCrumbStore(session: session, userAgent: userAgent)
+        self.crumbStore = YFCrumbStore(
+            session: session,
+            userAgent: userAgent,
+            query1BaseURL: query1BaseURL,
+            query2BaseURL: query2BaseURL,
+            cookieBootstrapURL: cookieBootstrapURL
+        )
     }
 
     nonisolated public func ticker(_ symbol: String) -> YFTicker {
@@ -17,6 +17,9 @@ actor YFCrumbStore {
 
     private let session: URLSession
     private let userAgent: String
+    private let query1BaseURL: URL
+    private let query2BaseURL: URL
+    private let cookieBootstrapURL: URL
     private let crumbTTL: TimeInterval = 60 * 60 * 6
     private let requestTimeout: TimeInterval = 10
 
@@ -26,9 +29,18 @@ actor YFCrumbStore {
     private var clearedLegacyCache = false
     private var crumbFlight: CrumbFlight?
 
-    init(session: URLSession, userAgent: String) {
+    init(
+        session: URLSession,
+        userAgent: String,
+        query1BaseURL: URL = URL(string: "https://query1.finance.yahoo.com")!,
+        query2BaseURL: URL = URL(string: "https://query2.finance.yahoo.com")!,
+        cookieBootstrapURL: URL = URL(string: "https://fc.yahoo.com")!
+    ) {
         self.session = session
         self.userAgent = userAgent
+        self.query1BaseURL = query1BaseURL
+        self.query2BaseURL = query2BaseURL
+        self.cookieBootstrapURL = cookieBootstrapURL
     }
 
     func currentCrumb(forceRefresh: Bool = false) async throws -> String {
@@ -115,26 +127,16 @@ actor YFCrumbStore {
         switch strategy {
         case .basic:
             try await warmBasicCookieJar()
-            guard let url = URL(string: "https://query1.finance.yahoo.com/v1/test/getcrumb") else {
-                throw YFinanceError.invalidURL("https://query1.finance.yahoo.com/v1/test/getcrumb")
-            }
-            return try await fetchCrumb(from: url)
+            return try await fetchCrumb(from: query1BaseURL.appendingPathComponent("v1/test/getcrumb"))
 
         case .csrf:
             try await warmCSRFCookieJar()
-            guard let url = URL(string: "https://query2.finance.yahoo.com/v1/test/getcrumb") else {
-                throw YFinanceError.invalidURL("https://query2.finance.yahoo.com/v1/test/getcrumb")
-            }
-            return try await fetchCrumb(from: url)
+            return try await fetchCrumb(from: query2BaseURL.appendingPathComponent("v1/test/getcrumb"))
         }
     }
 
     private func warmBasicCookieJar() async throws {
-        guard let cookieURL = URL(string: "https://fc.yahoo.com") else {
-            throw YFinanceError.invalidURL("https://fc.yahoo.com")
-        }
-
-        var request = baseRequest(url: cookieURL)
+        var request = baseRequest(url: cookieBootstrapURL)
         request.setValue("text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8", forHTTPHeaderField: "Accept")
 
         do {
@@ -163,6 +163,48 @@ final class YFinanceSessionTests: XCTestCase {
         }
     }
 
+    func testCustomBaseURLsRouteCookieAndCrumbHandshake() async throws {
+        let session = makeSession()
+        let base = URL(string: "http://127.0.0.1:8765")!
+        let client = YFinanceClient(
+            session: session,
+            query1BaseURL: base,
+            query2BaseURL: base,
+            rootBaseURL: base,
+            cookieBootstrapURL: base
+        )
+        var sawCookieBootstrap = false
+
+        MockYahooURLProtocol.handler = { request in
+            guard let url = request.url else {
+                throw TestError.missingURL
+            }
+            XCTAssertEqual(url.host, "127.0.0.1", "Every request must stay on the configured stand-in host")
+
+            if url.path.isEmpty || url.path == "/" {
+                sawCookieBootstrap = true
+                return Self.response(url: url, status: 200, body: "ok")
+            }
+            if url.path == "/v1/test/getcrumb" {
+                return Self.response(url: url, status: 200, body: "standin-crumb")
+            }
+            if url.path == "/v7/finance/quote" {
+                let components = URLComponents(url: url, resolvingAgainstBaseURL: false)
+                let crumb = components?.queryItems?.first(where: { $0.name == "crumb" })?.value
+                XCTAssertEqual(crumb, "standin-crumb")
+                let body = """
+                {"quoteResponse": {"result": [{"symbol": "AAPL", "regularMarketPrice": 200.0}], "error": null}}
+                """
+                return Self.response(url: url, status: 200, body: body)
+            }
+            throw TestError.unexpectedURL(url.absoluteString)
+        }
+
+        let quote = try await client.quote(symbol: "AAPL")
+        XCTAssertEqual(quote?.symbol, "AAPL")
+        XCTAssertTrue(sawCookieBootstrap)
+    }
+
     private func makeSession() -> URLSession {
         let configuration = URLSessionConfiguration.ephemeral
         configuration.protocolClasses = [MockYahooURLProtocol.self]
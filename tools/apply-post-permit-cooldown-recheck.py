@@ -5,53 +5,30 @@ A request can pass the first cooldown check, wait in the global concurrency
 queue, and observe a new 429 while queued. Without a second check, permit resume
 could leak that request through the newly-opened cooldown. This exact migration
 runs after coordinator cancellation hardening.
+
+The patch specs live in `hardening_migrations.py`; `prepare-hardening-candidate*.py`
+apply them together with the other migrations in one pass.
 """
 
 from __future__ import annotations
 
-from pathlib import Path
+import argparse
 import sys
 
-ROOT = Path(__file__).resolve().parents[1]
-TARGET = ROOT / "Sources" / "YFinanceKit" / "YFinanceResilience.swift"
+from hardening_migrations import POST_PERMIT_COOLDOWN_RECHECK
+from source_migrations import MigrationError, execute_migrations
 
 
-class MigrationError(RuntimeError):
-    pass
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="Print the unified diff instead of writing sources.")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore verdicts cached in .build/hardening-cache.")
+    return parser.parse_args()
 
 
 def main() -> int:
-    text = TARGET.read_text(encoding="utf-8")
-    new_fragment = """            do {
-                // Cooldown may have opened while this request was queued for a
-                // global permit. Recheck before the provider operation starts.
-                try await waitForCooldown()
-                try Task.checkCancellation()
-                let value = try await operation()
-"""
-    old_fragment = """            do {
-                try Task.checkCancellation()
-                let value = try await operation()
-"""
-
-    if new_fragment in text:
-        changed = False
-    elif old_fragment in text:
-        text = text.replace(old_fragment, new_fragment, 1)
-        changed = True
-    else:
-        raise MigrationError("Expected post-permit operation block not found")
-
-    if text.count("try await waitForCooldown()") < 2:
-        raise MigrationError("Coordinator must check cooldown both before and after permit acquisition")
-    if "try await acquirePermit()" not in text:
-        raise MigrationError("Coordinator cancellation/permit migration must run before cooldown recheck")
-
-    if changed:
-        TARGET.write_text(text, encoding="utf-8")
-        print("Added post-permit Yahoo cooldown recheck.")
-    else:
-        print("Post-permit Yahoo cooldown recheck already applied.")
+    args = parse_args()
+    execute_migrations([POST_PERMIT_COOLDOWN_RECHECK], dry_run=args.dry_run, use_cache=not args.no_cache)
     return 0
 
 
@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+"""Offline analysis of ``YFDiagnosticsExport`` JSON documents.
+
+Reads any number of exports (files, ``.jsonl`` files with one export per line,
+or directories of either), one document at a time, and reports:
+
+- latency histograms per endpoint, plus the slowest resources, from trace
+  ``durationMilliseconds``
+- retry and rate-limit rates, from the counters and from the traces
+- rate-limit cooldown windows, from ``cooldownUntil``
+- the coalescing ratio
+- active/queued request timelines, bucketed by export time
+
+Exports are parsed one at a time and never kept, and latency histograms have a
+fixed size. Memory still grows with the input: one key per distinct trace (for
+deduplication), running totals per distinct resource, one entry per export
+seen in a cooldown, one counter set per occupied ``--bucket-seconds`` timeline
+bucket, and the last counters of each export sequence.
+
+Traces are deduplicated because successive exports from one process repeat
+the same ``recentTraces`` ring buffer. YFinanceKit never resets its counters,
+so by default (``--counters cumulative``) each export is a running total since
+process start. Within a sequence (the lines of one ``.jsonl`` file, or the
+``.json`` files of one directory, in name order) only the growth since the
+previous export is added, and a counter that drops marks a process restart,
+after which the export's values count in full. ``--counters windowed`` sums
+every export as given, for exports that each cover their own window, such as
+the per-snapshot ``diagnostics`` of YFParityCLI.
+
+Swift's default ``JSONEncoder`` writes dates as seconds since 2001-01-01;
+ISO 8601 strings and Unix-epoch numbers are accepted too (``--numeric-dates``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import math
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+EXPORT_COUNTERS = (
+    "logicalRequests",
+    "attempts",
+    "successes",
+    "failures",
+    "retries",
+    "rateLimits",
+    "coalescedRequests",
+    "cacheHits",
+    "cacheMisses",
+)
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+NUMERIC_DATE_MODES = ("auto", "reference", "unix")
+COUNTER_MODES = ("cumulative", "windowed")
+# Swift's Date reference point (timeIntervalSinceReferenceDate == 0).
+REFERENCE_EPOCH = dt.datetime(2001, 1, 1, tzinfo=dt.timezone.utc)
+UNIX_EPOCH = dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Analyse YFDiagnosticsExport JSON documents offline.")
+    parser.add_argument("paths", nargs="+", help="Export files (.json/.jsonl) or directories containing them")
+    parser.add_argument("--output-json", default="artifacts/diagnostics_analysis.json")
+    parser.add_argument("--output-md", default="artifacts/diagnostics_analysis.md")
+    parser.add_argument(
+        "--bucket-seconds",
+        type=int,
+        default=60,
+        help="Timeline bucket width in seconds (default: 60).",
+    )
+    parser.add_argument(
+        "--numeric-dates",
+        default="auto",
+        choices=NUMERIC_DATE_MODES,
+        help="How to read numeric dates: Swift reference-date seconds, Unix seconds, or guess (default: auto).",
+    )
+    parser.add_argument(
+        "--counters",
+        default="cumulative",
+        choices=COUNTER_MODES,
+        help="cumulative: exports are running totals, add the growth per sequence; "
+        "windowed: each export covers its own window, sum them (default: cumulative).",
+    )
+    parser.add_argument("--top-resources", type=int, default=20, help="Slowest resources to list (default: 20).")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    analyzer = DiagnosticsAnalyzer(
+        bucket_seconds=max(1, args.bucket_seconds),
+        numeric_dates=args.numeric_dates,
+        top_resources=max(1, args.top_resources),
+        counter_mode=args.counters,
+    )
+    for source, export in iter_exports(Path(path) for path in args.paths):
+        if export is None:
+            analyzer.add_error(source)
+        else:
+            analyzer.add_export(export, sequence=export_sequence(source))
+    result = analyzer.result()
+    if result["inputs"]["exports"] == 0:
+        print("No diagnostics exports found.", file=sys.stderr)
+        return 2
+
+    output_json = Path(args.output_json)
+    output_md = Path(args.output_md)
+    output_json.parent.mkdir(parents=True, exist_ok=True)
+    output_md.parent.mkdir(parents=True, exist_ok=True)
+    output_json.write_text(json.dumps(result, indent=2, sort_keys=True), encoding="utf-8")
+    output_md.write_text(render_markdown(result), encoding="utf-8")
+
+    totals = result["totals"]
+    print(
+        f"Analysed {result['inputs']['exports']} exports, {result['inputs']['unique_traces']} unique traces: "
+        f"attempts/request={format_ratio(totals['attempts_per_request'])} "
+        f"retry_rate={format_percent(totals['retry_rate'])} "
+        f"rate_limit_rate={format_percent(totals['rate_limit_rate'])}"
+    )
+    print(f"JSON: {output_json}")
+    print(f"MD:   {output_md}")
+    return 0
+
+
+def iter_exports(paths: Iterable[Path]) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+    """Yield ``(source, export)`` one document at a time; ``export`` is None when unreadable."""
+    for path in paths:
+        if path.is_dir():
+            files = sorted(p for p in path.rglob("*") if p.suffix in (".json", ".jsonl") and p.is_file())
+        else:
+            files = [path]
+        for file in files:
+            if file.suffix == ".jsonl":
+                yield from iter_json_lines(file)
+                continue
+            try:
+                document = json.loads(file.read_text(encoding="utf-8"))
+            except (OSError, UnicodeDecodeError, json.JSONDecodeError):
+                yield str(file), None
+                continue
+            yield str(file), document if is_export(document) else None
+
+
+def export_sequence(source: str) -> str:
+    """The sequence an export belongs to: its ``.jsonl`` file, or the directory of its ``.json`` file."""
+    path, _, line = source.rpartition(":")
+    if path.endswith(".jsonl") and line.isdigit():
+        return path
+    return str(Path(source).parent)
+
+
+def iter_json_lines(path: Path) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+    try:
+        handle = path.open("r", encoding="utf-8")
+    except OSError:
+        yield str(path), None
+        return
+    with handle:
+        for number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            source = f"{path}:{number}"
+            try:
+                document = json.loads(line)
+            except json.JSONDecodeError:
+                yield source, None
+                continue
+            yield source, document if is_export(document) else None
+
+
+def is_export(document: Any) -> bool:
+    return isinstance(document, dict) and "logicalRequests" in document and "traces" in document
+
+
+def parse_export_date(value: Any, numeric_dates: str = "auto") -> Optional[dt.datetime]:
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        if not math.isfinite(value):
+            return None
+        # Reference-date seconds stay below 1e9 until 2032; Unix seconds passed it in 2001.
+        epoch = REFERENCE_EPOCH
+        if numeric_dates == "unix" or (numeric_dates == "auto" and value >= 1e9):
+            epoch = UNIX_EPOCH
+        return epoch + dt.timedelta(seconds=float(value))
+    if isinstance(value, str):
+        text = value.strip()
+        if text.endswith("Z"):
+            text = text[:-1] + "+00:00"
+        try:
+            parsed = dt.datetime.fromisoformat(text)
+        except ValueError:
+            return None
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=dt.timezone.utc)
+    return None
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; quantiles are bucket upper edges."""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.n = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, milliseconds: float) -> None:
+        index = len(LATENCY_BUCKETS_MS)
+        for position, edge in enumerate(LATENCY_BUCKETS_MS):
+            if milliseconds <= edge:
+                index = position
+                break
+        self.counts[index] += 1
+        self.n += 1
+        self.total += milliseconds
+        self.max = max(self.max, milliseconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.n == 0:
+            return None
+        target = q * self.n
+        seen = 0
+        for position, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                return float(LATENCY_BUCKETS_MS[position]) if position < len(LATENCY_BUCKETS_MS) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={edge}" for edge in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+        return {
+            "count": self.n,
+            "mean_ms": round(self.total / self.n, 1) if self.n else None,
+            "max_ms": self.max if self.n else None,
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class DiagnosticsAnalyzer:
+    """Folds exports into running totals; call ``result()`` once at the end."""
+
+    def __init__(
+        self,
+        *,
+        bucket_seconds: int = 60,
+        numeric_dates: str = "auto",
+        top_resources: int = 20,
+        counter_mode: str = "cumulative",
+    ) -> None:
+        self.bucket_seconds = bucket_seconds
+        self.numeric_dates = numeric_dates
+        self.top_resources = top_resources
+        self.exports = 0
+        self.errors: List[str] = []
+        self.error_count = 0
+        self.counter_mode = counter_mode
+        self.counters = {name: 0 for name in EXPORT_COUNTERS}
+        self.last_counters: Dict[str, Dict[str, int]] = {}
+        self.restarts = 0
+        self.seen_traces: set = set()
+        self.duplicate_traces = 0
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.endpoints: Dict[str, Dict[str, int]] = {}
+        self.resources: Dict[Tuple[str, str], List[float]] = {}
+        self.timeline: Dict[int, Dict[str, int]] = {}
+        self.cooldowns: List[Tuple[dt.datetime, dt.datetime]] = []
+        self.first_seen: Optional[dt.datetime] = None
+        self.last_seen: Optional[dt.datetime] = None
+
+    def add_error(self, source: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < 50:
+            self.errors.append(source)
+
+    def add_export(self, export: Dict[str, Any], *, sequence: str = "") -> None:
+        self.exports += 1
+        values = {name: int(export.get(name) or 0) for name in EXPORT_COUNTERS}
+        previous = self.last_counters.get(sequence) if self.counter_mode == "cumulative" else None
+        if previous is not None and any(values[name] < previous[name] for name in EXPORT_COUNTERS):
+            self.restarts += 1
+            previous = None
+        for name in EXPORT_COUNTERS:
+            self.counters[name] += values[name] - (previous[name] if previous else 0)
+        if self.counter_mode == "cumulative":
+            self.last_counters[sequence] = values
+
+        generated_at = parse_export_date(export.get("generatedAt"), self.numeric_dates)
+        if generated_at is not None:
+            self.note_time(generated_at)
+            bucket = self.bucket(generated_at)
+            bucket["exports"] += 1
+            bucket["max_active"] = max(bucket["max_active"], int(export.get("activeRequests") or 0))
+            bucket["max_queued"] = max(bucket["max_queued"], int(export.get("queuedRequests") or 0))
+            cooldown_until = parse_export_date(export.get("cooldownUntil"), self.numeric_dates)
+            if cooldown_until is not None and cooldown_until > generated_at:
+                self.cooldowns.append((generated_at, cooldown_until))
+
+        for trace in export.get("traces") or []:
+            if isinstance(trace, dict):
+                self.add_trace(trace)
+
+    def add_trace(self, trace: Dict[str, Any]) -> None:
+        key = (
+            trace.get("endpoint"),
+            trace.get("resource"),
+            str(trace.get("startedAt")),
+            trace.get("durationMilliseconds"),
+            trace.get("attempts"),
+            trace.get("outcome"),
+        )
+        if key in self.seen_traces:
+            self.duplicate_traces += 1
+            return
+        self.seen_traces.add(key)
+
+        endpoint = str(trace.get("endpoint") or "unknown")
+        resource = str(trace.get("resource") or "")
+        duration = float(trace.get("durationMilliseconds") or 0)
+        attempts = int(trace.get("attempts") or 0)
+        outcome = str(trace.get("outcome") or "unknown")
+
+        self.latency.setdefault(endpoint, LatencyHistogram()).add(duration)
+        stats = self.endpoints.setdefault(
+            endpoint, {"traces": 0, "attempts": 0, "retried": 0, "rateLimited": 0, "failed": 0, "cancelled": 0}
+        )
+        stats["traces"] += 1
+        stats["attempts"] += attempts
+        stats["retried"] += 1 if attempts > 1 else 0
+        stats["rateLimited"] += 1 if outcome == "rateLimited" else 0
+        stats["failed"] += 1 if outcome == "failure" else 0
+        stats["cancelled"] += 1 if outcome == "cancelled" else 0
+
+        totals = self.resources.setdefault((endpoint, resource), [0, 0.0, 0.0])
+        totals[0] += 1
+        totals[1] += duration
+        totals[2] = max(totals[2], duration)
+
+        started_at = parse_export_date(trace.get("startedAt"), self.numeric_dates)
+        if started_at is not None:
+            self.note_time(started_at)
+            bucket = self.bucket(started_at)
+            bucket["traces_started"] += 1
+            bucket["rate_limited"] += 1 if outcome == "rateLimited" else 0
+
+    def note_time(self, moment: dt.datetime) -> None:
+        if self.first_seen is None or moment < self.first_seen:
+            self.first_seen = moment
+        if self.last_seen is None or moment > self.last_seen:
+            self.last_seen = moment
+
+    def bucket(self, moment: dt.datetime) -> Dict[str, int]:
+        start = int(moment.timestamp()) // self.bucket_seconds * self.bucket_seconds
+        return self.timeline.setdefault(
+            start, {"exports": 0, "max_active": 0, "max_queued": 0, "traces_started": 0, "rate_limited": 0}
+        )
+
+    def cooldown_windows(self) -> List[Dict[str, Any]]:
+        """Merge overlapping ``[seen_at, cooldownUntil)`` intervals into windows."""
+        windows: List[List[dt.datetime]] = []
+        for seen_at, until in sorted(self.cooldowns):
+            if windows and seen_at <= windows[-1][1]:
+                windows[-1][1] = max(windows[-1][1], until)
+            else:
+                windows.append([seen_at, until])
+        return [
+            {
+                "first_seen": start.isoformat(),
+                "until": end.isoformat(),
+                "seconds": round((end - start).total_seconds(), 1),
+            }
+            for start, end in windows
+        ]
+
+    def result(self) -> Dict[str, Any]:
+        counters = self.counters
+        logical = counters["logicalRequests"]
+        attempts = counters["attempts"]
+        lookups = counters["cacheHits"] + counters["cacheMisses"]
+        windows = self.cooldown_windows()
+
+        resources = sorted(self.resources.items(), key=lambda item: (-item[1][1], item[0]))[: self.top_resources]
+        endpoints: Dict[str, Any] = {}
+        for endpoint, stats in sorted(self.endpoints.items()):
+            traces = stats["traces"]
+            endpoints[endpoint] = {
+                **stats,
+                "retry_rate": ratio(stats["retried"], traces),
+                "rate_limit_rate": ratio(stats["rateLimited"], traces),
+                "latency": self.latency[endpoint].to_dict(),
+            }
+
+        return {
+            "generated_at": dt.datetime.now(dt.timezone.utc).isoformat(),
+            "inputs": {
+                "exports": self.exports,
+                "unreadable": self.error_count,
+                "unreadable_sources": self.errors,
+                "unique_traces": len(self.seen_traces),
+                "duplicate_traces": self.duplicate_traces,
+                "counter_mode": self.counter_mode,
+                "sequences": len(self.last_counters),
+                "restarts": self.restarts,
+                "first_seen": self.first_seen.isoformat() if self.first_seen else None,
+                "last_seen": self.last_seen.isoformat() if self.last_seen else None,
+            },
+            "totals": {
+                **counters,
+                "attempts_per_request": ratio(attempts, logical),
+                "retry_rate": ratio(counters["retries"], attempts),
+                "rate_limit_rate": ratio(counters["rateLimits"], attempts),
+                "coalescing_ratio": ratio(counters["coalescedRequests"], logical + counters["coalescedRequests"]),
+                "cache_hit_rate": ratio(counters["cacheHits"], lookups),
+            },
+            "endpoints": endpoints,
+            "slowest_resources": [
+                {
+                    "endpoint": endpoint,
+                    "resource": resource,
+                    "traces": int(count),
+                    "total_ms": round(total, 1),
+                    "mean_ms": round(total / count, 1) if count else None,
+                    "max_ms": round(peak, 1),
+                }
+                for (endpoint, resource), (count, total, peak) in resources
+            ],
+            "cooldowns": {
+                "windows": windows,
+                "count": len(windows),
+                "total_seconds": round(sum(window["seconds"] for window in windows), 1),
+            },
+            "timeline": {
+                "bucket_seconds": self.bucket_seconds,
+                "buckets": [
+                    {"start": dt.datetime.fromtimestamp(start, tz=dt.timezone.utc).isoformat(), **values}
+                    for start, values in sorted(self.timeline.items())
+                ],
+            },
+        }
+
+
+def ratio(numerator: float, denominator: float) -> Optional[float]:
+    return round(numerator / denominator, 4) if denominator else None
+
+
+def format_ratio(value: Optional[float]) -> str:
+    return "n/a" if value is None else f"{value:.2f}"
+
+
+def format_percent(value: Optional[float]) -> str:
+    return "n/a" if value is None else f"{value:.1%}"
+
+
+def format_ms(value: Optional[float]) -> str:
+    return "n/a" if value is None else f"{value:.0f}"
+
+
+def render_markdown(result: Dict[str, Any]) -> str:
+    lines: List[str] = []
+    inputs = result.get("inputs", {})
+    totals = result.get("totals", {})
+    lines.append("# YFinanceKit Diagnostics Analysis")
+    lines.append("")
+    lines.append(f"- Generated: `{result.get('generated_at', '')}`")
+    lines.append(
+        f"- Inputs: exports={inputs.get('exports', 0)} unreadable={inputs.get('unreadable', 0)} "
+        f"unique_traces={inputs.get('unique_traces', 0)} duplicate_traces={inputs.get('duplicate_traces', 0)}"
+    )
+    lines.append(
+        f"- Counters: {inputs.get('counter_mode', 'windowed')} "
+        f"(sequences={inputs.get('sequences', 0)} restarts={inputs.get('restarts', 0)})"
+    )
+    lines.append(f"- Span: `{inputs.get('first_seen')}` .. `{inputs.get('last_seen')}`")
+    lines.append(
+        f"- Requests: logical={totals.get('logicalRequests', 0)} attempts={totals.get('attempts', 0)} "
+        f"attempts_per_request={format_ratio(totals.get('attempts_per_request'))} "
+        f"retry_rate={format_percent(totals.get('retry_rate'))} "
+        f"rate_limit_rate={format_percent(totals.get('rate_limit_rate'))}"
+    )
+    lines.append(
+        f"- Coalescing ratio: {format_percent(totals.get('coalescing_ratio'))}; "
+        f"cache hit rate: {format_percent(totals.get('cache_hit_rate'))}"
+    )
+
+    lines.append("")
+    lines.append("## Endpoints")
+    lines.append("")
+    lines.append("| Endpoint | Traces | Retried | Rate limited | Failed | p50 ms | p95 ms | p99 ms | Max ms |")
+    lines.append("|---|---:|---:|---:|---:|---:|---:|---:|---:|")
+    for endpoint, stats in result.get("endpoints", {}).items():
+        latency = stats.get("latency", {})
+        lines.append(
+            f"| `{endpoint}` | {stats['traces']} | {format_percent(stats.get('retry_rate'))} | "
+            f"{format_percent(stats.get('rate_limit_rate'))} | {stats['failed']} | "
+            f"{format_ms(latency.get('p50_ms'))} | {format_ms(latency.get('p95_ms'))} | "
+            f"{format_ms(latency.get('p99_ms'))} | {format_ms(latency.get('max_ms'))} |"
+        )
+
+    lines.append("")
+    lines.append("## Latency Histograms")
+    lines.append("")
+    labels = [f"<={edge}" for edge in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+    lines.append("| Endpoint | " + " | ".join(labels) + " |")
+    lines.append("|---|" + "---:|" * len(labels))
+    for endpoint, stats in result.get("endpoints", {}).items():
+        buckets = stats.get("latency", {}).get("buckets", {})
+        lines.append(f"| `{endpoint}` | " + " | ".join(str(buckets.get(label, 0)) for label in labels) + " |")
+
+    lines.append("")
+    lines.append("## Slowest Resources")
+    lines.append("")
+    lines.append("| Endpoint | Resource | Traces | Total ms | Mean ms | Max ms |")
+    lines.append("|---|---|---:|---:|---:|---:|")
+    for entry in result.get("slowest_resources", []):
+        lines.append(
+            f"| `{entry['endpoint']}` | `{entry['resource']}` | {entry['traces']} | {entry['total_ms']:.0f} | "
+            f"{format_ms(entry.get('mean_ms'))} | {format_ms(entry.get('max_ms'))} |"
+        )
+
+    cooldowns = result.get("cooldowns", {})
+    lines.append("")
+    lines.append("## Cooldown Windows")
+    lines.append("")
+    lines.append(f"- Windows: {cooldowns.get('count', 0)}, total {cooldowns.get('total_seconds', 0)} s")
+    for window in cooldowns.get("windows", [])[:50]:
+        lines.append(f"  - `{window['first_seen']}` .. `{window['until']}` ({window['seconds']} s)")
+
+    timeline = result.get("timeline", {})
+    lines.append("")
+    lines.append(f"## Queue Depth Timeline ({timeline.get('bucket_seconds', 0)} s buckets)")
+    lines.append("")
+    lines.append("| Bucket | Exports | Max active | Max queued | Traces started | Rate limited |")
+    lines.append("|---|---:|---:|---:|---:|---:|")
+    for bucket in timeline.get("buckets", []):
+        lines.append(
+            f"| `{bucket['start']}` | {bucket['exports']} | {bucket['max_active']} | {bucket['max_queued']} | "
+            f"{bucket['traces_started']} | {bucket['rate_limited']} |"
+        )
+    return "\n".join(lines).rstrip() + "\n"
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
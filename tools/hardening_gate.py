@@ -0,0 +1,304 @@
+"""Shared engine for the static hardening gates.
+
+Gate rules are data in `hardening_gates.json`, grouped by purpose. Each rule
+targets a `path`, a list of `paths` or a `glob`, and checks one of:
+
+- ``exists``: the file is present (``true``) or absent (``false``)
+- ``fragment``/``fragments``: literal occurrences in the file
+- ``pattern``: regex matches in the file
+
+``count`` compares the observed occurrences (``">= 1"`` by default, ``"== 0"``
+for forbidden fragments, ``">= 2"`` for repeated calls). Rules expand into
+single checks, which are bucketed by file; files are evaluated in parallel,
+each read at most once with all its literal fragments counted in one batch.
+Every failure is reported, never just the first. Results serialize to JSON for
+tooling (``--output-json``). Observed counts are cached per file content in
+`verdict_cache.py`, so unchanged files are neither read nor rescanned.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import operator
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from verdict_cache import VerdictCache, digest_json
+
+ROOT = Path(__file__).resolve().parents[1]
+RULES_FILE = Path(__file__).resolve().with_name("hardening_gates.json")
+RULES_SCHEMA_VERSION = 1
+RESULTS_SCHEMA_VERSION = 1
+
+COUNT_EXPRESSION = re.compile(r"^\s*(>=|<=|==|!=|>|<)\s*(\d+)\s*$")
+OPERATORS: Dict[str, Callable[[int, int], bool]] = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+}
+
+
+class GateRuleError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Check:
+    rule: str
+    group: str
+    path: str
+    kind: str  # "exists", "fragment" or "pattern"
+    needle: str
+    count: str
+    message: str
+
+    def passes(self, observed: int) -> bool:
+        match = COUNT_EXPRESSION.match(self.count)
+        assert match is not None
+        return OPERATORS[match.group(1)](observed, int(match.group(2)))
+
+
+@dataclass(frozen=True)
+class CheckResult:
+    check: Check
+    observed: Optional[int]
+    passed: bool
+    message: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rule": self.check.rule,
+            "group": self.check.group,
+            "path": self.check.path,
+            "kind": self.check.kind,
+            "needle": self.check.needle,
+            "expected": self.check.count,
+            "observed": self.observed,
+            "passed": self.passed,
+            "message": self.message,
+        }
+
+
+def load_rules(path: Path = RULES_FILE) -> Dict[str, Any]:
+    document = json.loads(path.read_text(encoding="utf-8"))
+    if document.get("schema_version") != RULES_SCHEMA_VERSION:
+        raise GateRuleError(f"{path}: unsupported schema_version {document.get('schema_version')!r}")
+    if not isinstance(document.get("groups"), dict):
+        raise GateRuleError(f"{path}: missing groups")
+    return document
+
+
+def expand_rules(document: Dict[str, Any], groups: Sequence[str], root: Path = ROOT) -> List[Check]:
+    """Turn the selected rule groups into single checks, in file order."""
+    checks: List[Check] = []
+    for group in groups:
+        try:
+            rules = document["groups"][group]["rules"]
+        except KeyError:
+            raise GateRuleError(f"Unknown hardening gate rule group: {group}") from None
+        for rule in rules:
+            checks.extend(expand_rule(rule, group, root))
+    return checks
+
+
+def expand_rule(rule: Dict[str, Any], group: str, root: Path) -> Iterable[Check]:
+    rule_id = str(rule.get("id") or f"{group}.rule")
+    if "glob" in rule:
+        directory, _, pattern = str(rule["glob"]).rpartition("/")
+        base = root / directory
+        paths = sorted(str(path.relative_to(root)) for path in base.glob(pattern)) if base.is_dir() else []
+    else:
+        paths = list(rule.get("paths") or [rule.get("path")])
+        if not all(isinstance(path, str) and path for path in paths):
+            raise GateRuleError(f"Rule {rule_id} needs a path, paths or glob")
+
+    if "exists" in rule:
+        kind = "exists"
+        needles = [""]
+        count = ">= 1" if rule["exists"] else "== 0"
+        default_message = "Missing hardening file: {path}" if rule["exists"] else "Unexpected file: {path}"
+    elif "pattern" in rule:
+        kind = "pattern"
+        needles = [str(rule["pattern"])]
+        count = str(rule.get("count", ">= 1"))
+        default_message = "{path} does not match {fragment}"
+    elif "fragment" in rule or "fragments" in rule:
+        kind = "fragment"
+        needles = [str(item) for item in (rule.get("fragments") or [rule.get("fragment")])]
+        count = str(rule.get("count", ">= 1"))
+        default_message = "{path} fragment count {count} failed for {fragment}"
+    else:
+        raise GateRuleError(f"Rule {rule_id} needs exists, fragment(s) or pattern")
+    if not COUNT_EXPRESSION.match(count):
+        raise GateRuleError(f"Rule {rule_id} has an invalid count expression: {count!r}")
+
+    template = str(rule.get("message") or default_message)
+    for path in paths:
+        for needle in needles:
+            yield Check(
+                rule=rule_id,
+                group=group,
+                path=path,
+                kind=kind,
+                needle=needle,
+                count=count,
+                message=template.format(path=path, fragment=needle, count=count),
+            )
+
+
+def count_fragments(text: str, fragments: Iterable[str]) -> Dict[str, int]:
+    """Occurrences of each distinct fragment, scanning `text` once per fragment at C speed."""
+    return {fragment: text.count(fragment) for fragment in dict.fromkeys(fragments)}
+
+
+def observe_content(text: str, checks: Sequence[Check]) -> List[int]:
+    """Observed counts for the fragment/pattern `checks`, in order."""
+    fragments = count_fragments(text, (check.needle for check in checks if check.kind == "fragment"))
+    return [
+        fragments[check.needle] if check.kind == "fragment" else sum(1 for _ in re.finditer(check.needle, text))
+        for check in checks
+    ]
+
+
+def evaluate_file(
+    root: Path, path: str, checks: List[Check], cache: Optional[VerdictCache] = None
+) -> List[CheckResult]:
+    target = root / path
+    content_checks = [check for check in checks if check.kind != "exists"]
+    observed_content: Optional[List[int]] = None
+    if content_checks:
+        # Cache observed counts, not verdicts, so editing a count expression reuses them.
+        key = None
+        digest = cache.file_sha256(path) if cache is not None and cache.enabled else None
+        if cache is not None and digest is not None:
+            ruleset = digest_json([[check.kind, check.needle] for check in content_checks])
+            key = cache.key("hardening-gate", ruleset, {path: digest})
+            cached = cache.load(key)
+            if isinstance(cached, list) and len(cached) == len(content_checks):
+                observed_content = cached
+        if observed_content is None:
+            try:
+                text = target.read_text(encoding="utf-8")
+            except (FileNotFoundError, IsADirectoryError):
+                text = None
+            if text is not None:
+                observed_content = observe_content(text, content_checks)
+                if key is not None and cache is not None:
+                    cache.store(key, observed_content)
+
+    observed_by_check = dict(zip((id(check) for check in content_checks), observed_content or []))
+    results = []
+    for check in checks:
+        if check.kind == "exists":
+            observed: Optional[int] = 1 if target.exists() else 0
+        elif observed_content is None:
+            results.append(CheckResult(check, None, False, f"{check.message} (cannot read {path})"))
+            continue
+        else:
+            observed = observed_by_check[id(check)]
+        results.append(CheckResult(check, observed, check.passes(observed), check.message))
+    return results
+
+
+def evaluate(
+    checks: Sequence[Check],
+    root: Path = ROOT,
+    *,
+    jobs: Optional[int] = None,
+    cache: Optional[VerdictCache] = None,
+) -> List[CheckResult]:
+    """Evaluate `checks` file by file in parallel; results keep `checks` order."""
+    by_path: Dict[str, List[Tuple[int, Check]]] = {}
+    for index, check in enumerate(checks):
+        by_path.setdefault(check.path, []).append((index, check))
+
+    def run(item: Tuple[str, List[Tuple[int, Check]]]) -> List[Tuple[int, CheckResult]]:
+        path, indexed = item
+        results = evaluate_file(root, path, [check for _, check in indexed], cache)
+        return [(index, result) for (index, _), result in zip(indexed, results)]
+
+    ordered: List[Optional[CheckResult]] = [None] * len(checks)
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for batch in executor.map(run, by_path.items()):
+            for index, result in batch:
+                ordered[index] = result
+    if cache is not None:
+        cache.save()
+    return [result for result in ordered if result is not None]
+
+
+def results_document(
+    results: Sequence[CheckResult],
+    *,
+    groups: Sequence[str],
+    rules_file: Path,
+    cache: Optional[VerdictCache] = None,
+) -> Dict[str, Any]:
+    failures = [result for result in results if not result.passed]
+    return {
+        "cache": cache.describe() if cache is not None else None,
+        "schema_version": RESULTS_SCHEMA_VERSION,
+        "rules_file": str(rules_file),
+        "groups": list(groups),
+        "passed": not failures,
+        "checks": len(results),
+        "failed": len(failures),
+        "files": len({result.check.path for result in results}),
+        "failures": [result.to_dict() for result in failures],
+        "results": [result.to_dict() for result in results],
+    }
+
+
+def parse_gate_args(description: str) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--rules", default=str(RULES_FILE), help="Gate rule file (default: tools/hardening_gates.json)")
+    parser.add_argument("--output-json", help="Write machine-readable results to this path ('-' for stdout)")
+    parser.add_argument("--jobs", type=int, default=None, help="Parallel file workers (default: executor default)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and do not update .build/hardening-cache")
+    return parser.parse_args()
+
+
+def run_gate(
+    groups: Sequence[str],
+    *,
+    description: str,
+    failure_title: str,
+    passed_lines: Sequence[str],
+    root: Path = ROOT,
+) -> int:
+    """CLI entry point shared by the verify-*-source-state.py scripts."""
+    args = parse_gate_args(description)
+    rules_file = Path(args.rules)
+    try:
+        checks = expand_rules(load_rules(rules_file), groups, root)
+    except (OSError, ValueError) as exc:
+        print(f"{failure_title}: cannot load rules: {exc}", file=sys.stderr)
+        return 2
+    cache = VerdictCache.for_repo(root, enabled=not args.no_cache)
+    results = evaluate(checks, root, jobs=args.jobs, cache=cache)
+    document = results_document(results, groups=groups, rules_file=rules_file, cache=cache)
+
+    if args.output_json == "-":
+        print(json.dumps(document, indent=2, sort_keys=True))
+    elif args.output_json:
+        output = Path(args.output_json)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(document, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+    stream = sys.stderr if args.output_json == "-" else sys.stdout
+    if document["failed"]:
+        print(f"{failure_title}: {document['failed']} of {document['checks']} check(s) failed", file=sys.stderr)
+        for failure in document["failures"]:
+            print(f"  - [{failure['rule']}] {failure['message']}", file=sys.stderr)
+        return 2
+    for line in passed_lines:
+        print(line, file=stream)
+    return 0
@@ -0,0 +1,626 @@
+"""Declarative exact-source migrations for the YFinanceKit hardening candidate.
+
+Each `Migration` used to be its own apply-*.py script that re-read and rewrote
+YFinanceClient.swift or YFinanceResilience.swift. The scripts now run their
+spec through `source_migrations.py`; `prepare-hardening-candidate*.py` run
+the whole ordered list in one in-memory pass with a single atomic write.
+"""
+
+from __future__ import annotations
+
+from source_migrations import Migration, Patch, Requirement
+
+CLIENT = "Sources/YFinanceKit/YFinanceClient.swift"
+RESILIENCE = "Sources/YFinanceKit/YFinanceResilience.swift"
+
+
+# Extract raw URLSession I/O from the giant compatibility client. Endpoint
+# construction, Yahoo session policy, retries and repair logic stay in
+# `YFinanceClient`; only the URLSession send and HTTP response normalization
+# move into `YFURLSessionTransport`.
+
+OLD_TRANSPORT_PROPERTY = """\
+    private let session: URLSession
+    private let decoder: JSONDecoder
+"""
+NEW_TRANSPORT_PROPERTY = """\
+    private let session: URLSession
+    private let transport: any YFHTTPTransporting
+    private let decoder: JSONDecoder
+"""
+
+OLD_TRANSPORT_INIT = """\
+        self.session = session
+        self.userAgent = userAgent
+"""
+NEW_TRANSPORT_INIT = """\
+        self.session = session
+        self.transport = YFURLSessionTransport(session: session)
+        self.userAgent = userAgent
+"""
+
+OLD_TRANSPORT_IO = """\
+                let (data, response) = try await session.data(for: request)
+                guard let httpResponse = response as? HTTPURLResponse else {
+                    throw YFinanceError.missingData("Expected HTTPURLResponse")
+                }
+                if debugEnabled {
+                    print("[YFinanceKit] \\(method) \\(redactedURLString(url)) -> \\(httpResponse.statusCode) (\\(data.count) bytes)")
+                }
+                try validateResponse(data: data, response: httpResponse)
+                return data
+"""
+NEW_TRANSPORT_IO = """\
+                let response = try await transport.send(request)
+                if debugEnabled {
+                    print("[YFinanceKit] \\(method) \\(redactedURLString(url)) -> \\(response.statusCode) (\\(response.data.count) bytes)")
+                }
+                try validateResponse(
+                    data: response.data,
+                    statusCode: response.statusCode,
+                    retryAfterHeader: response.header("Retry-After")
+                )
+                return response.data
+"""
+
+OLD_VALIDATE_RESPONSE = """\
+    private func validateResponse(data: Data, response: HTTPURLResponse) throws {
+        // Keep rate limits distinct so callers do not mistake a Yahoo edge
+        // throttle for a malformed finance payload.
+        if response.statusCode == 429 {
+            throw YFinanceError.httpStatus(429)
+        }
+
+        if let envelope = try? decoder.decode(YFFinanceErrorEnvelope.self, from: data),
+           let yahooError = envelope.finance?.error {
+            throw YFinanceError.serverError(
+                code: yahooError.code ?? "unknown",
+                description: yahooError.description ?? "Unknown Yahoo error"
+            )
+        }
+
+        guard (200...299).contains(response.statusCode) else {
+            throw YFinanceError.httpStatus(response.statusCode)
+        }
+    }
+"""
+NEW_VALIDATE_RESPONSE = """\
+    private func validateResponse(
+        data: Data,
+        statusCode: Int,
+        retryAfterHeader: String?
+    ) throws {
+        // Keep provider backpressure distinct from auth/session failures.
+        if statusCode == 429 {
+            let retryAfter = YFRetryAfterParser.parse(retryAfterHeader)
+            throw YFinanceError.rateLimited(retryAfter: retryAfter)
+        }
+
+        if let envelope = try? decoder.decode(YFFinanceErrorEnvelope.self, from: data),
+           let yahooError = envelope.finance?.error {
+            throw YFinanceError.serverError(
+                code: yahooError.code ?? "unknown",
+                description: yahooError.description ?? "Unknown Yahoo error"
+            )
+        }
+
+        guard (200...299).contains(statusCode) else {
+            throw YFinanceError.httpStatus(statusCode)
+        }
+    }
+"""
+
+TRANSPORT_EXTRACTION = Migration(
+    name="transport-extraction",
+    description="Extract URLSession transport",
+    patches=(
+        Patch(
+            label="transport property",
+            target=CLIENT,
+            old=OLD_TRANSPORT_PROPERTY,
+            new=NEW_TRANSPORT_PROPERTY,
+            identity="private let transport: any YFHTTPTransporting",
+        ),
+        Patch(
+            label="transport init",
+            target=CLIENT,
+            old=OLD_TRANSPORT_INIT,
+            new=NEW_TRANSPORT_INIT,
+            identity="self.transport = YFURLSessionTransport(session: session)",
+        ),
+        Patch(
+            label="transport request I/O",
+            target=CLIENT,
+            old=OLD_TRANSPORT_IO,
+            new=NEW_TRANSPORT_IO,
+            identity="let response = try await transport.send(request)",
+            count=2,
+        ),
+        Patch(
+            label="status-code response validation",
+            target=CLIENT,
+            old=OLD_VALIDATE_RESPONSE,
+            new=NEW_VALIDATE_RESPONSE,
+            identity="retryAfterHeader: String?",
+        ),
+    ),
+    requirements=tuple(
+        Requirement(CLIENT, (fragment,), f"Transport extraction missing expected fragment: {fragment}")
+        for fragment in (
+            "private let transport: any YFHTTPTransporting",
+            "self.transport = YFURLSessionTransport(session: session)",
+            "let response = try await transport.send(request)",
+            "retryAfterHeader: response.header(\"Retry-After\")",
+            "throw YFinanceError.rateLimited(retryAfter: retryAfter)",
+        )
+    )
+    + (
+        Requirement(
+            CLIENT,
+            ("session.data(for: request)",),
+            "YFinanceClient still contains direct URLSession request I/O",
+            minimum=0,
+            maximum=0,
+        ),
+    ),
+    applied_message="Extracted YFinanceClient raw request I/O into YFURLSessionTransport.",
+    noop_message="YFinanceClient transport extraction already applied.",
+)
+
+
+# Make YFRequestCoordinator's global permit queue cancellation-safe: a task
+# cancelled while waiting for the Yahoo concurrency permit must not later
+# resume and still start provider work.
+
+OLD_PERMIT_STATE = """\
+    private var activeRequests = 0
+    private var permitWaiters: [CheckedContinuation<Void, Never>] = []
+    private var cooldownUntil: Date?
+"""
+NEW_PERMIT_STATE = """\
+    private struct PermitWaiter {
+        let id: UUID
+        let continuation: CheckedContinuation<Void, Error>
+    }
+
+    private var activeRequests = 0
+    private var permitWaiters: [PermitWaiter] = []
+    private var preparingPermitWaiterIDs: Set<UUID> = []
+    private var cancelledBeforePermitEnqueue: Set<UUID> = []
+    private var cooldownUntil: Date?
+"""
+
+OLD_ACQUIRE_CALL = """\
+            try await waitForCooldown()
+            await acquirePermit()
+            attempts += 1
+            attempt += 1
+
+            do {
+                let value = try await operation()
+"""
+NEW_ACQUIRE_CALL = """\
+            do {
+                try await waitForCooldown()
+                try await acquirePermit()
+            } catch is CancellationError {
+                let endedAt = await clock.now()
+                appendTrace(
+                    YFRequestTrace(
+                        endpoint: endpoint,
+                        resource: resource,
+                        startedAt: requestStartedAt,
+                        duration: endedAt.timeIntervalSince(requestStartedAt),
+                        attempts: attempt,
+                        outcome: .cancelled,
+                        failureKind: nil
+                    )
+                )
+                throw CancellationError()
+            }
+
+            attempts += 1
+            attempt += 1
+
+            do {
+                try Task.checkCancellation()
+                let value = try await operation()
+"""
+
+OLD_OPERATION_CATCH = """\
+            } catch {
+                releasePermit()
+                let kind = YFinanceErrorClassifier.kind(of: error)
+
+                if kind == .rateLimited {
+"""
+NEW_OPERATION_CATCH = """\
+            } catch is CancellationError {
+                releasePermit()
+                let endedAt = await clock.now()
+                appendTrace(
+                    YFRequestTrace(
+                        endpoint: endpoint,
+                        resource: resource,
+                        startedAt: requestStartedAt,
+                        duration: endedAt.timeIntervalSince(requestStartedAt),
+                        attempts: attempt,
+                        outcome: .cancelled,
+                        failureKind: nil
+                    )
+                )
+                throw CancellationError()
+            } catch {
+                releasePermit()
+                let kind = YFinanceErrorClassifier.kind(of: error)
+
+                if kind == .rateLimited {
+"""
+
+OLD_ACQUIRE_PERMIT = """\
+    private func acquirePermit() async {
+        if activeRequests < policy.maxConcurrentRequests {
+            activeRequests += 1
+            return
+        }
+
+        await withCheckedContinuation { continuation in
+            permitWaiters.append(continuation)
+        }
+    }
+
+    private func releasePermit() {
+        if !permitWaiters.isEmpty {
+            let waiter = permitWaiters.removeFirst()
+            waiter.resume()
+            return
+        }
+        activeRequests = max(0, activeRequests - 1)
+    }
+"""
+NEW_ACQUIRE_PERMIT = """\
+    private func acquirePermit() async throws {
+        try Task.checkCancellation()
+        if activeRequests < policy.maxConcurrentRequests {
+            activeRequests += 1
+            return
+        }
+
+        let id = UUID()
+        preparingPermitWaiterIDs.insert(id)
+        try await withTaskCancellationHandler(
+            operation: {
+                try await withCheckedThrowingContinuation { continuation in
+                    preparingPermitWaiterIDs.remove(id)
+                    if cancelledBeforePermitEnqueue.remove(id) != nil || Task.isCancelled {
+                        continuation.resume(throwing: CancellationError())
+                        return
+                    }
+                    permitWaiters.append(
+                        PermitWaiter(id: id, continuation: continuation)
+                    )
+                }
+            },
+            onCancel: {
+                Task { await self.cancelPermitWaiter(id: id) }
+            }
+        )
+    }
+
+    private func cancelPermitWaiter(id: UUID) {
+        if let index = permitWaiters.firstIndex(where: { $0.id == id }) {
+            let waiter = permitWaiters.remove(at: index)
+            waiter.continuation.resume(throwing: CancellationError())
+            return
+        }
+        if preparingPermitWaiterIDs.contains(id) {
+            cancelledBeforePermitEnqueue.insert(id)
+        }
+    }
+
+    private func releasePermit() {
+        while !permitWaiters.isEmpty {
+            let waiter = permitWaiters.removeFirst()
+            waiter.continuation.resume()
+            return
+        }
+        activeRequests = max(0, activeRequests - 1)
+    }
+"""
+
+OLD_QUEUED_REQUESTS = """\
+            queuedRequests: permitWaiters.count,
+"""
+NEW_QUEUED_REQUESTS = """\
+            queuedRequests: permitWaiters.count + preparingPermitWaiterIDs.count,
+"""
+
+COORDINATOR_CANCELLATION = Migration(
+    name="coordinator-cancellation",
+    description="Make global permit waiting cancellation-safe",
+    patches=(
+        Patch(
+            label="permit waiter state",
+            target=RESILIENCE,
+            old=OLD_PERMIT_STATE,
+            new=NEW_PERMIT_STATE,
+            identity="private struct PermitWaiter",
+        ),
+        Patch(
+            label="cancellable permit acquisition",
+            target=RESILIENCE,
+            old=OLD_ACQUIRE_CALL,
+            new=NEW_ACQUIRE_CALL,
+            identity="try await acquirePermit()",
+        ),
+        Patch(
+            label="cancelled operation trace",
+            target=RESILIENCE,
+            old=OLD_OPERATION_CATCH,
+            new=NEW_OPERATION_CATCH,
+            identity="} catch is CancellationError {\n                releasePermit()",
+        ),
+        Patch(
+            label="throwing permit queue",
+            target=RESILIENCE,
+            old=OLD_ACQUIRE_PERMIT,
+            new=NEW_ACQUIRE_PERMIT,
+            identity="private func cancelPermitWaiter(id: UUID)",
+        ),
+        Patch(
+            label="queued request count",
+            target=RESILIENCE,
+            old=OLD_QUEUED_REQUESTS,
+            new=NEW_QUEUED_REQUESTS,
+            identity="queuedRequests: permitWaiters.count + preparingPermitWaiterIDs.count",
+        ),
+    ),
+    requirements=tuple(
+        Requirement(RESILIENCE, (fragment,), f"Coordinator cancellation patch missing expected fragment: {fragment}")
+        for fragment in (
+            "private struct PermitWaiter",
+            "try await acquirePermit()",
+            "try Task.checkCancellation()",
+            "private func cancelPermitWaiter(id: UUID)",
+            "withCheckedThrowingContinuation",
+            "outcome: .cancelled",
+            "queuedRequests: permitWaiters.count + preparingPermitWaiterIDs.count",
+        )
+    )
+    + (
+        Requirement(
+            RESILIENCE,
+            ("[CheckedContinuation<Void, Never>]",),
+            "Legacy non-cancellable permit continuation is still present",
+            minimum=0,
+            maximum=0,
+        ),
+    ),
+    applied_message="Made YFRequestCoordinator permit waiting cancellation-safe.",
+    noop_message="Coordinator permit cancellation hardening already applied.",
+)
+
+
+# A request can pass the first cooldown check, wait in the global concurrency
+# queue, and observe a new 429 while queued. Without a second check, permit
+# resume could leak that request through the newly-opened cooldown.
+
+OLD_POST_PERMIT_OPERATION = """\
+            do {
+                try Task.checkCancellation()
+                let value = try await operation()
+"""
+NEW_POST_PERMIT_OPERATION = """\
+            do {
+                // Cooldown may have opened while this request was queued for a
+                // global permit. Recheck before the provider operation starts.
+                try await waitForCooldown()
+                try Task.checkCancellation()
+                let value = try await operation()
+"""
+
+POST_PERMIT_COOLDOWN_RECHECK = Migration(
+    name="post-permit-cooldown-recheck",
+    description="Recheck cooldown after queued permit acquisition",
+    patches=(
+        Patch(
+            label="post-permit cooldown recheck",
+            target=RESILIENCE,
+            old=OLD_POST_PERMIT_OPERATION,
+            new=NEW_POST_PERMIT_OPERATION,
+            identity=NEW_POST_PERMIT_OPERATION,
+        ),
+    ),
+    requirements=(
+        Requirement(
+            RESILIENCE,
+            ("try await waitForCooldown()",),
+            "Coordinator must check cooldown both before and after permit acquisition",
+            minimum=2,
+        ),
+        Requirement(
+            RESILIENCE,
+            ("try await acquirePermit()",),
+            "Coordinator cancellation/permit migration must run before cooldown recheck",
+        ),
+    ),
+    applied_message="Added post-permit Yahoo cooldown recheck.",
+    noop_message="Post-permit Yahoo cooldown recheck already applied.",
+)
+
+
+# The remaining surgical 429/Retry-After core edits. When transport extraction
+# already moved response headers into Sendable values, the 429 parser step is
+# recognized as complete and only the crumb-recovery/coordinator edits apply.
+
+OLD_CRUMB_RECOVERY = """\
+        } catch {
+            guard shouldUseCrumb else {
+                throw error
+            }
+
+            await crumbStore.invalidate()
+            let refreshedCrumb = try await crumbStore.currentCrumb(forceRefresh: true)
+            return try await executeRequest(
+                baseURL: baseURL,
+                path: path,
+                queryItems: withCrumb(queryItems, crumb: refreshedCrumb),
+                method: method,
+                body: body,
+                headers: headers,
+                timeout: effectiveTimeout
+            )
+        }
+"""
+NEW_CRUMB_RECOVERY = """\
+        } catch {
+            // A target-endpoint 429 is provider backpressure, not evidence that
+            // the Yahoo cookie/crumb strategy is invalid. Do not generate a
+            // second request by switching/refreshing the session.
+            if YFinanceErrorClassifier.kind(of: error) == .rateLimited {
+                throw error
+            }
+
+            guard shouldUseCrumb else {
+                throw error
+            }
+
+            await crumbStore.invalidate()
+            let refreshedCrumb = try await crumbStore.currentCrumb(forceRefresh: true)
+            return try await executeRequest(
+                baseURL: baseURL,
+                path: path,
+                queryItems: withCrumb(queryItems, crumb: refreshedCrumb),
+                method: method,
+                body: body,
+                headers: headers,
+                timeout: effectiveTimeout
+            )
+        }
+"""
+
+OLD_HTTP_429 = """\
+        if response.statusCode == 429 {
+            throw YFinanceError.httpStatus(429)
+        }
+"""
+NEW_HTTP_429 = """\
+        if response.statusCode == 429 {
+            let retryAfter = YFRetryAfterParser.parse(
+                response.value(forHTTPHeaderField: "Retry-After")
+            )
+            throw YFinanceError.rateLimited(retryAfter: retryAfter)
+        }
+"""
+
+OLD_RATE_LIMIT_COOLDOWN = """\
+                if kind == .rateLimited {
+                    rateLimits += 1
+                    failures += 1
+                    rateLimitStreak += 1
+                    await openRateLimitCooldown()
+                    let endedAt = await clock.now()
+"""
+NEW_RATE_LIMIT_COOLDOWN = """\
+                if kind == .rateLimited {
+                    rateLimits += 1
+                    failures += 1
+                    rateLimitStreak += 1
+                    if let retryAfter = (error as? YFinanceError)?.retryAfter, retryAfter > 0 {
+                        let now = await clock.now()
+                        let proposed = now.addingTimeInterval(
+                            min(retryAfter, policy.maxRateLimitCooldown)
+                        )
+                        if cooldownUntil == nil || proposed > cooldownUntil! {
+                            cooldownUntil = proposed
+                        }
+                    } else {
+                        await openRateLimitCooldown()
+                    }
+                    let endedAt = await clock.now()
+"""
+
+OLD_RETRY_AFTER_COMMENT = """\
+    /// Allows a transport that can see `Retry-After` to feed a stronger cooldown
+    /// signal into the shared gate. Current `YFinanceClient` does not expose response
+    /// headers, so resilient wrappers otherwise use exponential cooldowns.
+"""
+NEW_RETRY_AFTER_COMMENT = """\
+    /// Allows callers/transports to feed an explicit `Retry-After` signal into
+    /// the shared gate. Core HTTP 429 errors also carry this metadata when the
+    /// provider sends the header.
+"""
+
+CORE_RATE_LIMIT = Migration(
+    name="core-rate-limit",
+    description="Apply strict 429 and Retry-After behavior",
+    patches=(
+        Patch(
+            label="429 bypasses crumb recovery",
+            target=CLIENT,
+            old=OLD_CRUMB_RECOVERY,
+            new=NEW_CRUMB_RECOVERY,
+            identity="YFinanceErrorClassifier.kind(of: error) == .rateLimited",
+        ),
+        Patch(
+            label="Retry-After-aware 429 error",
+            target=CLIENT,
+            old=OLD_HTTP_429,
+            new=NEW_HTTP_429,
+            identity=NEW_HTTP_429,
+            skip_when=(
+                "retryAfterHeader: String?",
+                "YFRetryAfterParser.parse(retryAfterHeader)",
+                "YFinanceError.rateLimited(retryAfter: retryAfter)",
+            ),
+        ),
+        Patch(
+            label="coordinator honors Retry-After",
+            target=RESILIENCE,
+            old=OLD_RATE_LIMIT_COOLDOWN,
+            new=NEW_RATE_LIMIT_COOLDOWN,
+            identity="(error as? YFinanceError)?.retryAfter",
+        ),
+        Patch(
+            label="Retry-After doc comment",
+            target=RESILIENCE,
+            old=OLD_RETRY_AFTER_COMMENT,
+            new=NEW_RETRY_AFTER_COMMENT,
+            identity=NEW_RETRY_AFTER_COMMENT,
+            optional=True,
+        ),
+    ),
+    requirements=(
+        Requirement(
+            CLIENT,
+            ("YFinanceErrorClassifier.kind(of: error) == .rateLimited",),
+            "Client patch is missing strict 429 crumb-recovery bypass",
+        ),
+        Requirement(
+            CLIENT,
+            ("YFinanceError.rateLimited(retryAfter: retryAfter)",),
+            "Client patch is missing Retry-After-aware 429 error",
+        ),
+        Requirement(
+            CLIENT,
+            ("response.value(forHTTPHeaderField: \"Retry-After\")", "retryAfterHeader: String?"),
+            "Client patch is missing a Retry-After header path",
+        ),
+        Requirement(
+            RESILIENCE,
+            ("(error as? YFinanceError)?.retryAfter",),
+            "Coordinator patch did not preserve Retry-After metadata",
+        ),
+    ),
+    applied_message="Applied strict 429/Retry-After core hardening.",
+    noop_message="Core rate-limit hardening already applied.",
+)
+
+
+# Order matters: later migrations patch text introduced by earlier ones.
+MIGRATIONS = (
+    TRANSPORT_EXTRACTION,
+    COORDINATOR_CANCELLATION,
+    POST_PERMIT_COOLDOWN_RECHECK,
+    CORE_RATE_LIMIT,
+)
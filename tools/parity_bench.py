@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""Latency benchmark for YFinanceKit (via YFParityCLI) vs Python yfinance.
+
+Times quote/history/earnings/income per symbol on both sides and writes one
+JSON document meant to be diffed between YFinanceKit commits:
+
+- ``startup``: one-off costs before any data request (``YFParityCLI serve``
+  spawn of the prebuilt binary; ``import yfinance`` in a fresh interpreter)
+- ``cold_ms``: the first call of each operation for a symbol, before warm-up.
+  For the first symbol of a side this includes the Yahoo cookie/crumb bootstrap.
+- ``steady``: percentiles over ``--repeats`` timed calls after ``--warmup``
+  discarded calls
+
+Both sides run strictly one call at a time and alternate per sample so network
+drift hits them equally. YFParityCLI is built once in ``--swift-config``
+(release by default) before timing starts, so no SwiftPM work is measured.
+Swift calls go through one long-lived serve process of that binary; Python
+calls use a fresh ``yf.Ticker`` per sample so yfinance's per-ticker caches
+never turn a repeat into a no-op. Run against ``--standin-fixtures`` to take
+Yahoo out of the numbers entirely.
+
+Volatile run details (timestamps, wall time) live under ``run``; everything
+else is keyed, sorted and rounded so unchanged performance diffs cleanly.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+BENCH_SCHEMA_VERSION = 1
+OPERATIONS = ("quote", "history", "earnings", "income")
+SIDES = ("swift", "python")
+PERCENTILES = (50, 90, 95)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark YFinanceKit vs Python yfinance latency per operation.")
+    parser.add_argument(
+        "--package-path",
+        default=str(Path(__file__).resolve().parents[1]),
+        help="YFinanceKit package root",
+    )
+    parser.add_argument("--symbols", default="AAPL,MSFT,BTC-USD", help="Comma-separated symbols")
+    parser.add_argument(
+        "--operations",
+        default=",".join(OPERATIONS),
+        help=f"Comma-separated subset of {','.join(OPERATIONS)} (default: all)",
+    )
+    parser.add_argument("--sides", default=",".join(SIDES), help="Comma-separated subset of swift,python")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed steady-state calls per operation (default: 5)")
+    parser.add_argument("--warmup", type=int, default=1, help="Discarded calls after the cold call (default: 1)")
+    parser.add_argument("--period", default="1mo")
+    parser.add_argument("--interval", default="1d")
+    parser.add_argument("--history-limit", type=int, default=30)
+    parser.add_argument("--earnings-limit", type=int, default=4)
+    parser.add_argument("--income-limit", type=int, default=4)
+    parser.add_argument("--income-freq", choices=["yearly", "quarterly"], default="yearly")
+    parser.add_argument("--swift-bin", default="swift")
+    parser.add_argument(
+        "--swift-config",
+        default="release",
+        choices=["debug", "release"],
+        help="SwiftPM configuration YFParityCLI is built in before timing starts (default: release).",
+    )
+    parser.add_argument("--timeout-sec", type=int, default=180)
+    parser.add_argument("--output", default="artifacts/parity_bench.json")
+    parser.add_argument(
+        "--standin-fixtures",
+        default=None,
+        help="Benchmark offline against this fixture archive (see parity_standin.py).",
+    )
+    parser.add_argument(
+        "--yahoo-base-url",
+        default=None,
+        help="Benchmark against an already running stand-in at this base URL.",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    package_path = Path(args.package_path).resolve()
+    symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+    operations = selected(args.operations, OPERATIONS, "operation")
+    sides = selected(args.sides, SIDES, "side")
+    if not symbols:
+        print("No symbols provided.", file=sys.stderr)
+        return 2
+
+    harness = load_harness()
+    output = harness.resolve_output_path(package_path, args.output)
+    swift_cli = None
+    if "swift" in sides:
+        try:
+            swift_cli = harness.build_swift_cli(
+                swift_bin=args.swift_bin, package_path=package_path, config=args.swift_config
+            )
+        except harness.SwiftBuildError as exc:
+            print(f"Cannot build {harness.SWIFT_PRODUCT}: {exc}", file=sys.stderr)
+            return 2
+    with harness.yahoo_endpoint(
+        package_path=package_path,
+        standin_fixtures=args.standin_fixtures,
+        yahoo_base_url=args.yahoo_base_url,
+    ) as (yahoo_base_url, data_source):
+        report = run_bench(
+            harness,
+            package_path=package_path,
+            symbols=symbols,
+            operations=operations,
+            sides=sides,
+            repeats=max(1, args.repeats),
+            warmup=max(0, args.warmup),
+            period=args.period,
+            interval=args.interval,
+            history_limit=max(1, args.history_limit),
+            earnings_limit=max(1, args.earnings_limit),
+            income_limit=max(1, args.income_limit),
+            income_freq=args.income_freq,
+            swift_bin=args.swift_bin,
+            swift_cli=swift_cli,
+            timeout_sec=max(20, args.timeout_sec),
+            yahoo_base_url=yahoo_base_url,
+            data_source=data_source,
+        )
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    for line in describe_bench(report):
+        print(line)
+    print(f"JSON: {output}")
+    failed = sum(
+        sample["errors"]
+        for operations_by_symbol in report["symbols"].values()
+        for sides_by_operation in operations_by_symbol.values()
+        for sample in sides_by_operation.values()
+        if isinstance(sample, dict) and "errors" in sample
+    )
+    return 0 if failed == 0 else 1
+
+
+def selected(raw: str, known: Tuple[str, ...], label: str) -> List[str]:
+    wanted = [name.strip() for name in raw.split(",") if name.strip()]
+    unknown = sorted(set(wanted) - set(known))
+    if unknown:
+        raise SystemExit(f"Unknown {label}(s): {', '.join(unknown)}")
+    return [name for name in known if name in wanted]
+
+
+def load_harness() -> Any:
+    tools_dir = str(Path(__file__).resolve().parent)
+    if tools_dir not in sys.path:
+        sys.path.insert(0, tools_dir)
+    try:
+        import parity_harness
+    except ImportError as exc:
+        raise SystemExit(f"Parity harness dependencies are missing: {exc}")
+    return parity_harness
+
+
+def run_bench(
+    harness: Any,
+    *,
+    package_path: Path,
+    symbols: List[str],
+    operations: List[str],
+    sides: List[str],
+    repeats: int,
+    warmup: int,
+    period: str,
+    interval: str,
+    history_limit: int,
+    earnings_limit: int,
+    income_limit: int,
+    income_freq: str,
+    swift_bin: str,
+    timeout_sec: int,
+    swift_cli: Any = None,
+    yahoo_base_url: Optional[str] = None,
+    data_source: Optional[str] = None,
+) -> Dict[str, Any]:
+    started = time.perf_counter()
+    generated_at = dt.datetime.now(dt.timezone.utc).isoformat()
+    yf = harness.yf
+
+    swift_env: Optional[Dict[str, str]] = None
+    python_session: Any = None
+    if yahoo_base_url:
+        swift_env = {**os.environ, "YF_PARITY_BASE_URL": yahoo_base_url}
+        python_session = harness.load_tool_module("parity_standin").standin_session(yahoo_base_url)
+    else:
+        # A fresh tz cache keeps cold history timings independent of earlier runs.
+        yf.set_tz_cache_location(tempfile.mkdtemp(prefix="yfinance-bench-"))
+
+    swift_requests: Dict[str, Dict[str, Any]] = {
+        "quote": {"command": "quote"},
+        "history": {"command": "history", "period": period, "interval": interval, "limit": history_limit},
+        "earnings": {"command": "earnings-dates", "limit": earnings_limit},
+        "income": {"command": "income-stmt", "freq": income_freq, "limit": income_limit},
+    }
+
+    def python_call(operation: str, symbol: str) -> Dict[str, Any]:
+        ticker = yf.Ticker(symbol, session=python_session) if python_session is not None else yf.Ticker(symbol)
+        if operation == "quote":
+            return harness.python_quote(symbol, ticker)
+        if operation == "history":
+            return harness.python_history(ticker, period=period, interval=interval, limit=history_limit)
+        if operation == "earnings":
+            return harness.python_earnings_dates(ticker, limit=earnings_limit)
+        return harness.python_income_stmt(ticker, frequency=income_freq, limit=income_limit)
+
+    session = harness.SwiftServeSession(swift_bin=swift_bin, package_path=package_path, env=swift_env, cli=swift_cli)
+
+    def swift_call(operation: str, symbol: str) -> Dict[str, Any]:
+        result = session.request({**swift_requests[operation], "symbol": symbol}, timeout_sec)
+        if not result.get("ok", False):
+            raise RuntimeError(str(result.get("error") or result.get("errors") or "swift_request_failed"))
+        return result
+
+    calls: Dict[str, Callable[[str, str], Dict[str, Any]]] = {"swift": swift_call, "python": python_call}
+
+    startup: Dict[str, Any] = {}
+    try:
+        if "swift" in sides:
+            startup["swift"] = swift_startup(session, timeout_sec)
+        if "python" in sides:
+            startup["python"] = python_startup()
+
+        results: Dict[str, Dict[str, Any]] = {}
+        for symbol in symbols:
+            results[symbol] = {}
+            for operation in operations:
+                samples: Dict[str, List[Tuple[Optional[float], Optional[str]]]] = {side: [] for side in sides}
+                for _ in range(1 + warmup + repeats):
+                    for side in sides:
+                        samples[side].append(timed(calls[side], operation, symbol))
+                entry: Dict[str, Any] = {
+                    side: summarize_samples(samples[side], warmup=warmup) for side in sides
+                }
+                ratio = steady_ratio(entry)
+                if ratio is not None:
+                    entry["swift_over_python_p50"] = ratio
+                results[symbol][operation] = entry
+                print(f"  {symbol} {operation}: " + describe_entry(entry), flush=True)
+    finally:
+        session.close()
+
+    return {
+        "schema": BENCH_SCHEMA_VERSION,
+        "config": {
+            "symbols": symbols,
+            "operations": operations,
+            "sides": sides,
+            "repeats": repeats,
+            "warmup": warmup,
+            "period": period,
+            "interval": interval,
+            "history_limit": history_limit,
+            "earnings_limit": earnings_limit,
+            "income_limit": income_limit,
+            "income_freq": income_freq,
+            "data_source": data_source or "yahoo",
+            "swift_config": swift_cli.config if swift_cli is not None else None,
+        },
+        "environment": bench_environment(package_path, yf),
+        "run": {
+            "generated_at": generated_at,
+            "wall_sec": round(time.perf_counter() - started, 1),
+        },
+        "startup": startup,
+        "symbols": results,
+        "operations": pool_operations(results, operations, sides),
+    }
+
+
+def timed(
+    call: Callable[[str, str], Dict[str, Any]], operation: str, symbol: str
+) -> Tuple[Optional[float], Optional[str]]:
+    """Wall-clock milliseconds for one call, or ``(None, error)`` when it failed."""
+    start = time.perf_counter()
+    try:
+        call(operation, symbol)
+    except Exception as exc:  # noqa: BLE001
+        return None, str(exc)[:200]
+    return (time.perf_counter() - start) * 1000.0, None
+
+
+def swift_startup(session: Any, timeout_sec: int) -> Dict[str, Any]:
+    # The session pings a fresh child before its first request; ping never
+    # touches Yahoo, so "spawn" is process start of the prebuilt binary only.
+    reply = session.request({"command": "ping"}, timeout_sec)
+    spawn = session.last_timings.get("spawn") if reply.get("ok", False) else None
+    return {"spawn_ms": round_ms(spawn * 1000.0) if spawn is not None else None}
+
+
+def python_startup() -> Dict[str, Any]:
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", "import yfinance"], capture_output=True, check=False)
+    elapsed = (time.perf_counter() - start) * 1000.0
+    return {"import_ms": round_ms(elapsed) if proc.returncode == 0 else None}
+
+
+def summarize_samples(samples: List[Tuple[Optional[float], Optional[str]]], *, warmup: int) -> Dict[str, Any]:
+    steady = [value for value, _ in samples[1 + warmup :] if value is not None]
+    errors = [error for _, error in samples if error is not None]
+    summary: Dict[str, Any] = {
+        "cold_ms": round_ms(samples[0][0]),
+        "errors": len(errors),
+        "steady": latency_stats(np.array(steady, dtype=float)),
+    }
+    if errors:
+        summary["first_error"] = errors[0]
+    return summary
+
+
+def latency_stats(timings: np.ndarray) -> Dict[str, Any]:
+    if timings.size == 0:
+        return {"n": 0}
+    stats: Dict[str, Any] = {
+        "n": int(timings.size),
+        "min_ms": round_ms(float(timings.min())),
+        "max_ms": round_ms(float(timings.max())),
+        "mean_ms": round_ms(float(timings.mean())),
+    }
+    for q, value in zip(PERCENTILES, np.percentile(timings, PERCENTILES)):
+        stats[f"p{q}_ms"] = round_ms(float(value))
+    return stats
+
+
+def steady_ratio(entry: Dict[str, Any]) -> Optional[float]:
+    swift = ((entry.get("swift") or {}).get("steady") or {}).get("p50_ms")
+    python = ((entry.get("python") or {}).get("steady") or {}).get("p50_ms")
+    if not swift or not python:
+        return None
+    return round(swift / python, 2)
+
+
+def pool_operations(results: Dict[str, Dict[str, Any]], operations: List[str], sides: List[str]) -> Dict[str, Any]:
+    """Per-operation view across symbols: median cold call and median steady p50."""
+    pooled: Dict[str, Any] = {}
+    for operation in operations:
+        entry: Dict[str, Any] = {}
+        for side in sides:
+            per_symbol = [symbol_results[operation][side] for symbol_results in results.values()]
+            colds = [item["cold_ms"] for item in per_symbol if item["cold_ms"] is not None]
+            p50s = [item["steady"]["p50_ms"] for item in per_symbol if "p50_ms" in item["steady"]]
+            entry[side] = {
+                "cold_median_ms": round_ms(float(np.median(colds))) if colds else None,
+                "steady_p50_median_ms": round_ms(float(np.median(p50s))) if p50s else None,
+                "errors": sum(item["errors"] for item in per_symbol),
+            }
+        ratio = steady_ratio(
+            {side: {"steady": {"p50_ms": entry[side]["steady_p50_median_ms"]}} for side in sides}
+        )
+        if ratio is not None:
+            entry["swift_over_python_p50"] = ratio
+        pooled[operation] = entry
+    return pooled
+
+
+def bench_environment(package_path: Path, yf: Any) -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "-C", str(package_path), "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=False,
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "package_commit": commit,
+        "yfinance": getattr(yf, "__version__", "unknown"),
+        "python": platform.python_version(),
+        "platform": f"{platform.system()}-{platform.machine()}",
+    }
+
+
+def round_ms(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 1)
+
+
+def format_ms(value: Optional[float]) -> str:
+    return "n/a" if value is None else f"{value:.1f}ms"
+
+
+def describe_entry(entry: Dict[str, Any]) -> str:
+    parts = []
+    for side in SIDES:
+        if side not in entry:
+            continue
+        steady = entry[side]["steady"]
+        parts.append(
+            f"{side} cold={format_ms(entry[side]['cold_ms'])} "
+            f"p50={format_ms(steady.get('p50_ms'))} p95={format_ms(steady.get('p95_ms'))}"
+        )
+    return "; ".join(parts)
+
+
+def describe_bench(report: Dict[str, Any]) -> List[str]:
+    startup = report["startup"]
+    lines = [
+        "Startup: "
+        + ", ".join(
+            f"{side} {name}={format_ms(value)}" for side in SIDES for name, value in (startup.get(side) or {}).items()
+        )
+    ]
+    for operation, entry in report["operations"].items():
+        sides = [
+            f"{side} cold~{format_ms(entry[side]['cold_median_ms'])} "
+            f"p50~{format_ms(entry[side]['steady_p50_median_ms'])}"
+            for side in SIDES
+            if side in entry
+        ]
+        ratio = entry.get("swift_over_python_p50")
+        suffix = f" (swift/python p50 {ratio}x)" if ratio is not None else ""
+        lines.append(f"{operation}: " + "; ".join(sides) + suffix)
+    return lines
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
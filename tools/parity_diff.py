@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""Structural diff of two parity reports or matrix aggregates.
+
+Aligns both sides by (scenario, symbol, comparison) and lists only what
+changed, most severe first:
+
+1. status regressions (``pass -> warn``, ``warn -> fail``, ...)
+2. symbols or comparisons missing from the new side
+3. status changes of equal severity (``warn <-> skip``)
+4. metric deltas beyond ``--rel-threshold`` and ``--abs-threshold``
+5. symbols or comparisons new on the new side
+6. status improvements
+
+Metrics are compared under the dotted names of ``parity_ledger.py``
+(``avg_close_rel_diff``, ``columns.close.p95``, ...). Reports are
+stream-parsed: each symbol entry is reduced to its statuses and numeric
+metrics before the next one is read, and members nobody compares (raw bars,
+timings, diagnostics) are skipped without being decoded, so large matrix
+outputs never sit in memory whole. The exit code is 1 when anything
+regressed, so the diff can gate a package pin bump.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import json
+import re
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from parity_ledger import flatten_metrics
+from parity_rescore import scenario_report_path
+
+# Severity rank of a status for transitions; a skip is as bad as a warn.
+STATUS_SEVERITY = {"pass": 0, "skip": 1, "warn": 1, "fail": 2}
+CHANGE_KINDS = ("regression", "removed", "changed", "metric", "added", "improvement")
+STREAMED_ARRAYS = ("symbols",)
+# Members of a symbol entry the diff reads; everything else (timings,
+# diagnostics, raw bars) is skipped without being decoded.
+SYMBOL_MEMBERS = ("symbol", "status", "comparisons")
+WHITESPACE = re.compile(rb"[ \t\n\r]*")
+STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+PLAIN = rb'[^"\[\]{}]*'
+# Plain text, whole strings and whole containers without nested containers,
+# consumed in one C-level match; skip() only loops once per nesting level.
+FLAT_RUN = re.compile(
+    PLAIN + rb"(?:(?:" + STRING
+    + rb"|\{" + PLAIN + rb"(?:" + STRING + PLAIN + rb")*\}"
+    + rb"|\[" + PLAIN + rb"(?:" + STRING + PLAIN + rb")*\])" + PLAIN + rb")*"
+)
+# A string, number or literal; anything else is left to json.loads to reject.
+SCALAR = re.compile(STRING + rb'|[^\s,:\[\]{}"]+')
+
+# (scenario, symbol) -> {"status": ..., "comparisons": {name: (status, {metric: value})}}
+Side = Dict[Tuple[str, str], Dict[str, Any]]
+
+
+@dataclass
+class Change:
+    kind: str
+    scenario: str
+    symbol: str
+    comparison: Optional[str]
+    detail: str
+    magnitude: float = 0.0
+    metric: Optional[str] = None
+    before: Any = None
+    after: Any = None
+
+    def sort_key(self) -> Tuple[int, float, str, str, str]:
+        return (CHANGE_KINDS.index(self.kind), -self.magnitude, self.scenario, self.symbol, self.comparison or "")
+
+    def describe(self) -> str:
+        where = f"{self.scenario}/{self.symbol}" if self.scenario else self.symbol
+        if self.comparison:
+            where += f" {self.comparison}"
+        return f"{self.kind:<11}  {where}: {self.detail}"
+
+
+class JsonStream:
+    """Incremental reader for one large JSON document.
+
+    The document is scanned as bytes by compiled regexes, from a buffer that
+    only grows while a single value is being read, so memory is bounded by
+    the largest value kept (one trimmed symbol report, say) rather than by
+    the file. Values nobody needs are skipped by bracket matching outside
+    strings without building objects; kept values go to ``json.loads``.
+    """
+
+    def __init__(self, handle: BinaryIO, *, chunk_size: int = 1 << 20) -> None:
+        self.handle = handle
+        self.chunk_size = chunk_size
+        self.buffer = b""
+        self.pos = 0
+        # Start of the value being read; fill() must not drop it.
+        self.mark: Optional[int] = None
+
+    def fill(self) -> bool:
+        keep = self.pos if self.mark is None else self.mark
+        chunk = self.handle.read(max(self.chunk_size, len(self.buffer) - keep))
+        if not chunk:
+            return False
+        self.buffer = self.buffer[keep:] + chunk
+        self.pos -= keep
+        if self.mark is not None:
+            self.mark = 0
+        return True
+
+    def peek(self) -> bytes:
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos : self.pos + 1]
+            if not self.fill():
+                return b""
+
+    def expect(self, char: bytes) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"expected {char.decode()!r}, found {found.decode() or 'end of file'!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        self.mark = self.pos
+        try:
+            self.skip()
+            return json.loads(self.buffer[self.mark : self.pos])
+        finally:
+            self.mark = None
+
+    def skip(self) -> None:
+        """Step over the next value without decoding it."""
+        if self.peek() not in (b"[", b"{"):
+            while True:
+                match = SCALAR.match(self.buffer, self.pos)
+                # A scalar that ends the buffer may continue in the next chunk.
+                if (match is None or match.end() == len(self.buffer)) and self.fill():
+                    continue
+                if match is None:
+                    raise ValueError(f"invalid JSON value at byte {self.pos} of the buffer")
+                self.pos = match.end()
+                return
+        if self.skip_indented():
+            return
+        self.pos += 1
+        depth = 1
+        while True:
+            self.pos = FLAT_RUN.match(self.buffer, self.pos).end()
+            char = self.buffer[self.pos : self.pos + 1]
+            if char in (b"[", b"{"):
+                depth += 1
+            elif char in (b"]", b"}"):
+                depth -= 1
+            else:
+                # End of the buffer, or a string that continues in the next chunk.
+                if not self.fill():
+                    raise ValueError("unexpected end of file inside a JSON value")
+                continue
+            self.pos += 1
+            if depth == 0:
+                return
+
+    def skip_indented(self) -> bool:
+        """Skip a multi-line container written by ``json.dumps(indent=...)``.
+
+        Its closing bracket is the first line indented exactly like the line
+        that opened it, and raw newlines never occur inside JSON strings, so
+        one ``bytes.find`` replaces bracket matching. Returns False (nothing
+        consumed) when the value is not laid out that way.
+        """
+        start = self.pos
+        if self.buffer[start + 1 : start + 2] != b"\n":
+            return False
+        newline = self.buffer.rfind(b"\n", 0, start)
+        if newline < 0:
+            # The opening line is no longer buffered; its indent is unknown.
+            return False
+        line = self.buffer[newline + 1 : start]
+        indent = line[: len(line) - len(line.lstrip(b" \t"))]
+        inner = self.buffer[start + 2 : start + 3 + len(indent)]
+        if inner[: len(indent)] != indent or inner[len(indent) :] not in (b" ", b"\t"):
+            # Members not indented deeper (indent=0, say): brackets must be matched.
+            return False
+        closer = b"]" if self.buffer[start : start + 1] == b"[" else b"}"
+        needle = b"\n" + indent + closer
+        self.pos += 1
+        while True:
+            found = self.buffer.find(needle, self.pos)
+            if found >= 0:
+                self.pos = found + len(needle)
+                return True
+            # Keep only the tail a needle could still start in.
+            self.pos = max(self.pos, len(self.buffer) - len(needle) + 1)
+            if not self.fill():
+                raise ValueError("unexpected end of file inside a JSON value")
+
+    def object(self, keep: Sequence[str]) -> Any:
+        """Decode an object with only the `keep` members; other values are skipped."""
+        if self.peek() != b"{":
+            return self.value()
+        self.pos += 1
+        members: Dict[str, Any] = {}
+        if self.peek() != b"}":
+            while True:
+                key = self.value()
+                self.expect(b":")
+                if key in keep:
+                    members[key] = self.value()
+                else:
+                    self.skip()
+                if not self.separator():
+                    break
+        self.expect(b"}")
+        return members
+
+    def separator(self) -> bool:
+        if self.peek() == b",":
+            self.pos += 1
+            return True
+        return False
+
+
+def iter_members(path: Path) -> Iterator[Tuple[str, Any]]:
+    """Yield ``(key, value)`` per top-level member; ``symbols`` yields once per (trimmed) entry."""
+    with path.open("rb") as handle:
+        stream = JsonStream(handle)
+        stream.expect(b"{")
+        if stream.peek() == b"}":
+            return
+        while True:
+            key = stream.value()
+            stream.expect(b":")
+            if key in STREAMED_ARRAYS and stream.peek() == b"[":
+                stream.expect(b"[")
+                if stream.peek() != b"]":
+                    while True:
+                        yield key, stream.object(SYMBOL_MEMBERS)
+                        if not stream.separator():
+                            break
+                stream.expect(b"]")
+            else:
+                yield key, stream.value()
+            if not stream.separator():
+                break
+        stream.expect(b"}")
+
+
+def compact_symbol(symbol_report: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "status": symbol_report.get("status"),
+        "comparisons": {
+            name: (comparison.get("status"), dict(flatten_metrics(comparison.get("metrics") or {})))
+            for name, comparison in (symbol_report.get("comparisons") or {}).items()
+        },
+    }
+
+
+def load_side(path: Path) -> Tuple[Side, Dict[str, Dict[str, Any]]]:
+    """Compact symbol entries keyed by (scenario, symbol), plus each scenario's summary."""
+    symbols: Side = {}
+    summaries: Dict[str, Dict[str, Any]] = {}
+    members: Dict[str, Any] = {}
+    for key, value in iter_members(path):
+        if key == "symbols":
+            symbols[("", str(value.get("symbol")))] = compact_symbol(value)
+        else:
+            members[key] = value
+    if "scenarios" not in members:
+        summaries[""] = members.get("summary") or {}
+        return symbols, summaries
+
+    package = Path(members.get("package_path") or path.parent)
+    for entry in members["scenarios"] or []:
+        if not entry:
+            continue
+        name = str(entry.get("name"))
+        summaries[name] = entry.get("summary") or {}
+        report = scenario_report_path(entry.get("json") or "", package=package, aggregate_dir=path.parent)
+        if report is None:
+            print(f"warning: {path}: scenario report for {name} not found", file=sys.stderr)
+            continue
+        for key, value in iter_members(report):
+            if key == "symbols":
+                symbols[(name, str(value.get("symbol")))] = compact_symbol(value)
+    return symbols, summaries
+
+
+def metric_selected(name: str, patterns: Sequence[str]) -> bool:
+    return not patterns or any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+
+
+def diff_sides(
+    old: Side,
+    new: Side,
+    *,
+    rel_threshold: float,
+    abs_threshold: float,
+    metrics: Sequence[str] = (),
+) -> List[Change]:
+    changes: List[Change] = []
+    for key in sorted(old.keys() | new.keys()):
+        scenario, symbol = key
+        if key not in new:
+            changes.append(Change("removed", scenario, symbol, None, "symbol missing from the new report", 1.0))
+            continue
+        if key not in old:
+            changes.append(Change("added", scenario, symbol, None, "symbol new in the new report", 1.0))
+            continue
+        old_comparisons = old[key]["comparisons"]
+        new_comparisons = new[key]["comparisons"]
+        for name in sorted(old_comparisons.keys() | new_comparisons.keys()):
+            if name not in new_comparisons:
+                changes.append(Change("removed", scenario, symbol, name, "comparison missing from the new report", 1.0))
+                continue
+            if name not in old_comparisons:
+                changes.append(Change("added", scenario, symbol, name, "comparison new in the new report", 1.0))
+                continue
+            (before, old_metrics), (after, new_metrics) = old_comparisons[name], new_comparisons[name]
+            if before != after:
+                step = STATUS_SEVERITY.get(after, 1) - STATUS_SEVERITY.get(before, 1)
+                kind = "improvement" if step < 0 else "regression" if step > 0 else "changed"
+                changes.append(Change(kind, scenario, symbol, name, f"{before} -> {after}", abs(step), before=before, after=after))
+            for metric in sorted(old_metrics.keys() & new_metrics.keys()):
+                if not metric_selected(metric, metrics):
+                    continue
+                a, b = old_metrics[metric], new_metrics[metric]
+                delta = b - a
+                scale = max(abs(a), abs(b))
+                if abs(delta) <= abs_threshold or abs(delta) <= rel_threshold * scale:
+                    continue
+                relative = abs(delta) / scale if scale else float("inf")
+                changes.append(
+                    Change(
+                        "metric",
+                        scenario,
+                        symbol,
+                        name,
+                        f"{metric} {a:.6g} -> {b:.6g} ({delta:+.6g}, {relative * 100:.1f}%)",
+                        relative,
+                        metric=metric,
+                        before=a,
+                        after=b,
+                    )
+                )
+    return sorted(changes, key=Change.sort_key)
+
+
+def describe_summaries(old: Dict[str, Dict[str, Any]], new: Dict[str, Dict[str, Any]]) -> List[str]:
+    lines = []
+    for scenario in sorted(old.keys() | new.keys()):
+        before, after = old.get(scenario) or {}, new.get(scenario) or {}
+        counts = " ".join(
+            f"{status}={before.get(status, 0)}->{after.get(status, 0)}"
+            for status in ("pass", "warn", "fail", "skip")
+            if before.get(status, 0) != after.get(status, 0)
+        )
+        score = f"score {before.get('score', 0.0):.1f} -> {after.get('score', 0.0):.1f}"
+        lines.append(f"{scenario or 'report'}: {score}{'  ' + counts if counts else ''}")
+    return lines
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Diff two parity reports or matrix aggregates.")
+    parser.add_argument("old", help="Baseline report JSON or aggregate.json")
+    parser.add_argument("new", help="Candidate report JSON or aggregate.json")
+    parser.add_argument(
+        "--rel-threshold",
+        type=float,
+        default=0.10,
+        help="Report a metric delta only above this fraction of the larger value (default: 0.10).",
+    )
+    parser.add_argument(
+        "--abs-threshold",
+        type=float,
+        default=1e-3,
+        help="Report a metric delta only above this absolute size (default: 0.001).",
+    )
+    parser.add_argument(
+        "--metric",
+        action="append",
+        default=[],
+        help="Only compare metrics matching this glob, e.g. 'avg_*' or 'columns.close.*'. Repeatable.",
+    )
+    parser.add_argument("--output-json", default=None, help="Also write the changes as JSON to this path.")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    try:
+        old, old_summaries = load_side(Path(args.old))
+        new, new_summaries = load_side(Path(args.new))
+    except (OSError, ValueError) as exc:
+        print(f"Cannot diff: {exc}", file=sys.stderr)
+        return 2
+
+    changes = diff_sides(
+        old,
+        new,
+        rel_threshold=max(0.0, args.rel_threshold),
+        abs_threshold=max(0.0, args.abs_threshold),
+        metrics=args.metric,
+    )
+    for line in describe_summaries(old_summaries, new_summaries):
+        print(line)
+    if changes:
+        print("")
+    for change in changes:
+        print(change.describe())
+    counts = {kind: sum(1 for change in changes if change.kind == kind) for kind in CHANGE_KINDS}
+    print(f"\n{len(changes)} change(s): " + " ".join(f"{kind}={count}" for kind, count in counts.items()))
+
+    if args.output_json:
+        output = Path(args.output_json)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        document = {
+            "old": args.old,
+            "new": args.new,
+            "summaries": {"old": old_summaries, "new": new_summaries},
+            "counts": counts,
+            "changes": [asdict(change) for change in changes],
+        }
+        output.write_text(json.dumps(document, indent=2, sort_keys=True), encoding="utf-8")
+    return 1 if counts["regression"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
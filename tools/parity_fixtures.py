@@ -0,0 +1,323 @@
+"""Recorded Yahoo HTTP fixtures for offline parity runs.
+
+Archive layout::
+
+    <archive>/index.json               one entry per recorded request
+    <archive>/blobs/<sha256>.gz|.zst   compressed response body, one per unique body
+
+Identical bodies (the same Yahoo payload fetched by Swift and Python, or
+repeated across scenarios) are stored once; the index only references them by
+digest, so the archive loads quickly and blobs are read on first use.
+
+Requests are matched host-agnostically on method, path, non-volatile query
+items and (for POST) the canonical JSON body. When no exact match exists, the
+recorded request on the same path for the same instrument (identical symbol,
+ticker or search parameters) sharing the most query/body tokens wins, so Swift
+and Python clients that phrase the same Yahoo call differently still replay the
+same payload. A request for an instrument that was never recorded is a miss.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import urllib.parse
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+ARCHIVE_VERSION = 1
+
+# Query items that change on every call (session crumb, cache busters, rolling
+# period bounds) and must not take part in request identity.
+VOLATILE_QUERY_PARAMS = frozenset({"crumb", "period1", "period2", "_", "corsDomain"})
+
+# Query items (and ``eq`` operands of visualization query bodies) naming the
+# instrument a request is about. A near-miss lookup never crosses them: a quote
+# for another symbol is a wrong answer, not an approximate one.
+IDENTITY_PARAMS = frozenset({"symbol", "symbols", "ticker", "tickers", "q"})
+
+BLOB_CODECS = ("gzip", "zstd")
+BLOB_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+
+@dataclass(frozen=True)
+class FixtureRequest:
+    method: str
+    path: str
+    query: Tuple[Tuple[str, str], ...]
+    body_digest: Optional[str]
+    tokens: frozenset
+    identity: frozenset = frozenset()
+
+    @property
+    def key(self) -> str:
+        query = urllib.parse.urlencode(self.query)
+        return f"{self.method} {self.path}?{query}#{self.body_digest or ''}"
+
+
+@dataclass(frozen=True)
+class FixtureResponse:
+    status: int
+    content_type: str
+    body: bytes
+
+
+def normalize_request(method: str, target: str, body: Optional[bytes] = None) -> FixtureRequest:
+    """Normalize a request line target (path or absolute URL) plus body."""
+    parts = urllib.parse.urlsplit(target)
+    path = parts.path or "/"
+    query = tuple(
+        sorted(
+            (name, value)
+            for name, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+            if name not in VOLATILE_QUERY_PARAMS
+        )
+    )
+    tokens = {f"{name}={value}" for name, value in query}
+    identity = {f"{name}={value}" for name, value in query if name in IDENTITY_PARAMS}
+
+    body_digest: Optional[str] = None
+    if body:
+        try:
+            decoded = json.loads(body)
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            body_digest = hashlib.sha256(body).hexdigest()
+        else:
+            canonical = json.dumps(decoded, sort_keys=True, separators=(",", ":"))
+            body_digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+            tokens.update(f"body:{leaf}" for leaf in json_leaves(decoded))
+            identity.update(f"body:{name}={value}" for name, value in json_identity(decoded))
+
+    return FixtureRequest(
+        method=method.upper(),
+        path=path,
+        query=query,
+        body_digest=body_digest,
+        tokens=frozenset(tokens),
+        identity=frozenset(identity),
+    )
+
+
+def zstandard_module() -> Any:
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise RuntimeError("zstd fixture blobs need the 'zstandard' package (pip install zstandard)") from exc
+    return zstandard
+
+
+def compress_blob(body: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard_module().ZstdCompressor(level=19).compress(body)
+    # mtime=0 keeps blobs byte-identical across recordings of the same body.
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+def decompress_blob(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard_module().ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def blob_path(root: Path, digest: str, codec: str) -> Path:
+    return root / "blobs" / f"{digest}{BLOB_SUFFIXES[codec]}"
+
+
+def load_index(root: Path) -> List[Dict[str, Any]]:
+    index_path = root / "index.json"
+    if not index_path.exists():
+        return []
+    index = json.loads(index_path.read_text(encoding="utf-8"))
+    if index.get("version") != ARCHIVE_VERSION:
+        raise ValueError(f"Unsupported fixture archive version in {index_path}: {index.get('version')}")
+    return list(index.get("entries", []))
+
+
+def json_leaves(value: Any) -> Iterable[str]:
+    if isinstance(value, dict):
+        for item in value.values():
+            yield from json_leaves(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from json_leaves(item)
+    elif value is not None:
+        yield str(value)
+
+
+def json_identity(value: Any) -> Iterable[Tuple[str, str]]:
+    """``(name, value)`` of every ``{"operator": "eq", "operands": [name, value]}`` on an identity name."""
+    if isinstance(value, dict):
+        operands = value.get("operands")
+        if (
+            str(value.get("operator", "")).lower() == "eq"
+            and isinstance(operands, list)
+            and len(operands) == 2
+            and operands[0] in IDENTITY_PARAMS
+        ):
+            yield str(operands[0]), str(operands[1])
+        for item in value.values():
+            yield from json_identity(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from json_identity(item)
+
+
+class FixtureArchive:
+    """Read-only view over a recorded fixture archive."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.entries: List[Dict[str, Any]] = []
+        self.by_key: Dict[str, Dict[str, Any]] = {}
+        self.by_path: Dict[Tuple[str, str], List[Tuple[FixtureRequest, Dict[str, Any]]]] = {}
+        self.blob_cache: Dict[str, bytes] = {}
+        self.lock = threading.Lock()
+
+        for entry in load_index(root):
+            self._add(entry)
+
+    @staticmethod
+    def request_for(entry: Dict[str, Any]) -> FixtureRequest:
+        query = tuple((str(name), str(value)) for name, value in entry.get("query", []))
+        # Archives recorded before "identity" existed only know their query identity.
+        identity = entry.get("identity")
+        if identity is None:
+            identity = [f"{name}={value}" for name, value in query if name in IDENTITY_PARAMS]
+        return FixtureRequest(
+            method=entry["method"],
+            path=entry["path"],
+            query=query,
+            body_digest=entry.get("body_digest"),
+            tokens=frozenset(entry.get("tokens", [])),
+            identity=frozenset(identity),
+        )
+
+    def _add(self, entry: Dict[str, Any]) -> None:
+        request = self.request_for(entry)
+        self.entries.append(entry)
+        self.by_key.setdefault(request.key, entry)
+        self.by_path.setdefault((request.method, request.path), []).append((request, entry))
+
+    def lookup(self, request: FixtureRequest) -> Optional[FixtureResponse]:
+        entry = self.by_key.get(request.key)
+        if entry is None:
+            candidates = self.by_path.get((request.method, request.path), [])
+            best_score = -1
+            for recorded, candidate in candidates:
+                if recorded.identity != request.identity:
+                    continue
+                score = len(recorded.tokens & request.tokens)
+                # Zero overlap means a different module or series, not a near miss.
+                if score > best_score and (score > 0 or not request.tokens):
+                    best_score = score
+                    entry = candidate
+        if entry is None:
+            return None
+        return FixtureResponse(
+            status=int(entry.get("status", 200)),
+            content_type=str(entry.get("content_type") or "application/json"),
+            body=self.read_blob(entry["blob"], str(entry.get("codec") or "gzip")),
+        )
+
+    def read_blob(self, digest: str, codec: str = "gzip") -> bytes:
+        with self.lock:
+            cached = self.blob_cache.get(digest)
+        if cached is not None:
+            return cached
+        body = decompress_blob(blob_path(self.root, digest, codec).read_bytes(), codec)
+        with self.lock:
+            self.blob_cache[digest] = body
+        return body
+
+
+class FixtureArchiveWriter:
+    """Thread-safe recorder that adds request/response pairs to an archive.
+
+    Existing entries are kept, a re-recorded request replaces its old entry,
+    and bodies are deduplicated by sha256. Blobs are written as they arrive;
+    ``flush()`` rewrites ``index.json`` atomically.
+    """
+
+    def __init__(self, root: Path, *, codec: str = "gzip") -> None:
+        if codec not in BLOB_CODECS:
+            raise ValueError(f"Unknown fixture codec: {codec}")
+        if codec == "zstd":
+            zstandard_module()
+        self.root = root
+        self.codec = codec
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        for entry in load_index(root):
+            self.entries[FixtureArchive.request_for(entry).key] = entry
+        self.recorded = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self.new_blobs = 0
+        (root / "blobs").mkdir(parents=True, exist_ok=True)
+
+    def record(self, request: FixtureRequest, *, status: int, content_type: str, body: bytes) -> Dict[str, Any]:
+        digest = hashlib.sha256(body).hexdigest()
+        path = blob_path(self.root, digest, self.codec)
+        stored = 0
+        if not path.exists():
+            data = compress_blob(body, self.codec)
+            atomic_write(path, data)
+            stored = len(data)
+
+        entry = {
+            "method": request.method,
+            "path": request.path,
+            "query": [list(item) for item in request.query],
+            "body_digest": request.body_digest,
+            "tokens": sorted(request.tokens),
+            "identity": sorted(request.identity),
+            "status": status,
+            "content_type": content_type,
+            "blob": digest,
+            "codec": self.codec,
+        }
+        with self.lock:
+            self.entries[request.key] = entry
+            self.recorded += 1
+            self.raw_bytes += len(body)
+            if stored:
+                self.new_blobs += 1
+                self.stored_bytes += stored
+        return entry
+
+    def flush(self) -> None:
+        with self.lock:
+            entries = [self.entries[key] for key in sorted(self.entries)]
+        index = {"version": ARCHIVE_VERSION, "entries": entries}
+        atomic_write(self.root / "index.json", json.dumps(index, separators=(",", ":")).encode("utf-8"))
+
+    def summary(self) -> Dict[str, Any]:
+        with self.lock:
+            blobs = {entry["blob"] for entry in self.entries.values()}
+            return {
+                "root": str(self.root),
+                "codec": self.codec,
+                "entries": len(self.entries),
+                "unique_bodies": len(blobs),
+                "recorded": self.recorded,
+                "new_blobs": self.new_blobs,
+                "raw_bytes": self.raw_bytes,
+                "stored_bytes": self.stored_bytes,
+            }
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(temp, path)
+    except BaseException:
+        Path(temp).unlink(missing_ok=True)
+        raise
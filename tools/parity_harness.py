@@ -10,22 +10,72 @@ Runs a normalized snapshot comparison per symbol and writes:
 from __future__ import annotations
 
 import argparse
+import collections
+import contextlib
 import datetime as dt
+import hashlib
+import importlib
 import json
 import math
 import os
+import queue
+import shutil
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import yfinance as yf
 
+from parity_tolerances import (
+    POLICY_FILE,
+    TolerancePolicy,
+    TolerancePolicyError,
+    Tolerances,
+    default_tolerances,
+    earnings_verdict,
+    history_verdict,
+    income_verdict,
+    load_policy,
+    match_values,
+    quote_verdict,
+    summarize_statuses,
+    worst_status,
+)
 
 DEFAULT_SYMBOLS = ["AAPL", "MSFT", "NVDA", "TSLA", "VOO", "BTC-USD"]
-STATUS_ORDER = {"pass": 0, "warn": 1, "fail": 2, "skip": 3}
+PRIORITY_CLASSES = ("interactive", "normal", "background")
+PYTHON_CACHE_MODES = ("off", "reuse", "refresh", "only")
+HISTORY_COLUMNS = ("open", "high", "low", "close", "adjustedClose", "volume")
+HISTORY_WINDOWS = ("limit", "max")
+# YFDiagnosticsExport counters; they sum across snapshots, symbols and scenarios.
+DIAGNOSTIC_COUNTERS = (
+    "logicalRequests",
+    "attempts",
+    "successes",
+    "failures",
+    "retries",
+    "rateLimits",
+    "coalescedRequests",
+    "cacheHits",
+    "cacheMisses",
+)
+SWIFT_BARS_FORMATS = ("json", "columns")
+SWIFT_CONFIGS = ("debug", "release")
+SWIFT_PRODUCT = "YFParityCLI"
+BAR_COLUMNS_MAGIC = b"YFCOL1\0\0"
+# Yahoo only serves intraday bars this far back, so `max` windows start here.
+INTRADAY_LOOKBACK_DAYS = {"1m": 29, "2m": 59, "5m": 59, "15m": 59, "30m": 59, "60m": 729, "90m": 59, "1h": 729}
+# Default `max` chunk span per interval: roughly 1,500-2,500 bars per side.
+HISTORY_CHUNK_DAYS = {"1m": 5, "2m": 10, "5m": 20, "15m": 59, "30m": 59, "60m": 180, "90m": 59, "1h": 180, "1d": 3650}
 
 
 @dataclass
@@ -65,7 +115,90 @@ def parse_args() -> argparse.Namespace:
         help="Markdown report output path (relative to package path if not absolute).",
     )
     parser.add_argument("--swift-bin", default="swift", help="Swift binary (default: swift).")
+    parser.add_argument(
+        "--swift-mode",
+        default="serve",
+        choices=["serve", "oneshot"],
+        help="serve: one long-lived `YFParityCLI serve` child per run; oneshot: one YFParityCLI process per symbol.",
+    )
+    parser.add_argument(
+        "--swift-config",
+        default="release",
+        choices=list(SWIFT_CONFIGS),
+        help="SwiftPM configuration YFParityCLI is built in once, before any request (default: release).",
+    )
     parser.add_argument("--timeout-sec", type=int, default=120, help="Per Swift snapshot timeout.")
+    parser.add_argument("--jobs", type=int, default=1, help="Symbols compared in parallel (default: 1).")
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=0,
+        help="Global cap on concurrent Swift/Python snapshot fetches (default: --jobs).",
+    )
+    parser.add_argument(
+        "--swift-bars",
+        default="json",
+        choices=SWIFT_BARS_FORMATS,
+        help="How YFParityCLI hands over history bars: inline JSON rows (default) or a memory-mapped columnar file.",
+    )
+    parser.add_argument(
+        "--history-window",
+        default="limit",
+        choices=HISTORY_WINDOWS,
+        help="History comparison: last --history-limit bars (default) or the full available range, streamed in chunks.",
+    )
+    parser.add_argument(
+        "--history-chunk-days",
+        type=int,
+        default=0,
+        help="Days per streamed chunk for --history-window max (default: per-interval preset).",
+    )
+    parser.add_argument(
+        "--standin-fixtures",
+        default=None,
+        help="Run offline: serve this recorded fixture archive via tools/parity_standin.py for both clients.",
+    )
+    parser.add_argument(
+        "--yahoo-base-url",
+        default=None,
+        help="Send both clients to an already running Yahoo stand-in at this base URL.",
+    )
+    parser.add_argument(
+        "--record-fixtures",
+        default=None,
+        help="Route both clients through tools/parity_recorder.py and add their Yahoo traffic to this archive.",
+    )
+    parser.add_argument(
+        "--fixture-codec",
+        default="gzip",
+        choices=["gzip", "zstd"],
+        help="Blob compression for --record-fixtures (zstd needs the zstandard package; default: gzip).",
+    )
+    parser.add_argument(
+        "--python-cache",
+        default="off",
+        choices=list(PYTHON_CACHE_MODES),
+        help=(
+            "Python yfinance snapshot cache: off (always live), reuse (hit or fetch+store), "
+            "refresh (always fetch+store), only (never touch Yahoo; misses fail)."
+        ),
+    )
+    parser.add_argument(
+        "--python-cache-dir",
+        default=".build/parity-cache/python",
+        help="Python snapshot cache directory (relative to package path if not absolute).",
+    )
+    parser.add_argument(
+        "--python-cache-ttl-hours",
+        type=float,
+        default=24.0,
+        help="Cached Python snapshots older than this are evicted (default: 24).",
+    )
+    parser.add_argument(
+        "--tolerances",
+        default=str(POLICY_FILE),
+        help="Tolerance policy file (default: tools/parity_tolerances.json).",
+    )
     return parser.parse_args()
 
 
@@ -82,21 +215,67 @@ def main() -> int:
     output_json.parent.mkdir(parents=True, exist_ok=True)
     output_md.parent.mkdir(parents=True, exist_ok=True)
 
-    report = run_harness(
+    if args.history_window == "max" and args.python_cache == "only":
+        print("--history-window max streams live history and cannot run with --python-cache only.", file=sys.stderr)
+        return 2
+    if args.history_window == "max" and (args.record_fixtures or args.standin_fixtures or args.yahoo_base_url):
+        # Fixture keys ignore period1/period2, so every window would replay the same chunk.
+        print(
+            "--history-window max fetches date windows that fixture archives cannot tell apart; "
+            "it cannot run with --record-fixtures, --standin-fixtures or --yahoo-base-url.",
+            file=sys.stderr,
+        )
+        return 2
+    if args.record_fixtures and args.python_cache != "off":
+        print("--record-fixtures needs --python-cache off so Python traffic is captured.", file=sys.stderr)
+        return 2
+    try:
+        tolerance_policy = load_policy(Path(args.tolerances).resolve())
+    except (OSError, TolerancePolicyError) as exc:
+        print(f"Cannot load tolerance policy: {exc}", file=sys.stderr)
+        return 2
+    try:
+        swift_cli = build_swift_cli(swift_bin=args.swift_bin, package_path=package_path, config=args.swift_config)
+    except SwiftBuildError as exc:
+        print(f"Cannot build {SWIFT_PRODUCT}: {exc}", file=sys.stderr)
+        return 2
+
+    with yahoo_endpoint(
         package_path=package_path,
-        symbols=symbols,
-        swift_bin=args.swift_bin,
-        period=args.period,
-        interval=args.interval,
-        history_limit=max(1, args.history_limit),
-        earnings_limit=max(1, args.earnings_limit),
-        income_limit=max(1, args.income_limit),
-        income_freq=args.income_freq,
-        timeout_sec=max(20, args.timeout_sec),
-    )
+        standin_fixtures=args.standin_fixtures,
+        record_fixtures=args.record_fixtures,
+        fixture_codec=args.fixture_codec,
+        yahoo_base_url=args.yahoo_base_url,
+    ) as (yahoo_base_url, data_source):
+        report = run_harness(
+            package_path=package_path,
+            symbols=symbols,
+            swift_bin=args.swift_bin,
+            swift_mode=args.swift_mode,
+            period=args.period,
+            interval=args.interval,
+            history_limit=max(1, args.history_limit),
+            earnings_limit=max(1, args.earnings_limit),
+            income_limit=max(1, args.income_limit),
+            income_freq=args.income_freq,
+            timeout_sec=max(20, args.timeout_sec),
+            jobs=args.jobs,
+            max_in_flight=args.max_in_flight,
+            python_cache=PythonSnapshotCache(
+                resolve_output_path(package_path, args.python_cache_dir),
+                ttl_sec=max(0.0, args.python_cache_ttl_hours) * 3600.0,
+            ),
+            python_cache_mode=args.python_cache,
+            yahoo_base_url=yahoo_base_url,
+            data_source=data_source,
+            history_window=args.history_window,
+            history_chunk_days=max(0, args.history_chunk_days),
+            swift_bars=args.swift_bars,
+            tolerance_policy=tolerance_policy,
+            swift_cli=swift_cli,
+        )
 
-    output_json.write_text(json.dumps(report, indent=2, sort_keys=True), encoding="utf-8")
-    output_md.write_text(render_markdown(report), encoding="utf-8")
+    write_reports(report, output_json=output_json, output_md=output_md)
 
     summary = report["summary"]
     print(
@@ -108,6 +287,67 @@ def main() -> int:
     return 0 if summary["fail"] == 0 else 1
 
 
+def load_tool_module(name: str) -> Any:
+    tools_dir = str(Path(__file__).resolve().parent)
+    if tools_dir not in sys.path:
+        sys.path.insert(0, tools_dir)
+    return importlib.import_module(name)
+
+
+@contextlib.contextmanager
+def yahoo_endpoint(
+    *,
+    package_path: Path,
+    standin_fixtures: Optional[str] = None,
+    record_fixtures: Optional[str] = None,
+    fixture_codec: str = "gzip",
+    yahoo_base_url: Optional[str] = None,
+) -> Iterator[Tuple[Optional[str], Optional[str]]]:
+    """Yield ``(base_url, data_source)`` for the Yahoo endpoint both clients should use.
+
+    Live Yahoo (``None, None``), an external stand-in, or an in-process stand-in
+    or recorder that is shut down on exit. ``data_source`` names where the data
+    really comes from so cached Python snapshots are not mixed across sources.
+    """
+    if standin_fixtures and record_fixtures:
+        raise SystemExit("--standin-fixtures and --record-fixtures are mutually exclusive.")
+    if standin_fixtures:
+        fixtures = resolve_output_path(package_path, standin_fixtures)
+        server = load_tool_module("parity_standin").start_standin(fixtures)
+        print(f"Yahoo stand-in: {server.base_url} ({fixtures})")
+        try:
+            yield server.base_url, f"fixtures:{fixtures}"
+        finally:
+            server.shutdown()
+            server.server_close()
+        return
+    if record_fixtures:
+        recorder_module = load_tool_module("parity_recorder")
+        fixtures = resolve_output_path(package_path, record_fixtures)
+        try:
+            recorder = recorder_module.start_recorder(fixtures, codec=fixture_codec)
+        except RuntimeError as exc:
+            raise SystemExit(str(exc))
+        print(f"Yahoo recorder: {recorder.base_url} -> {fixtures}")
+        try:
+            yield recorder.base_url, "yahoo"
+        finally:
+            recorder.shutdown()
+            recorder.server_close()
+            recorder.writer.flush()
+            for line in recorder_module.describe_recording(recorder.writer.summary()):
+                print(line)
+        return
+    yield yahoo_base_url, (f"standin:{yahoo_base_url}" if yahoo_base_url else None)
+
+
+def write_reports(report: Dict[str, Any], *, output_json: Path, output_md: Path) -> None:
+    output_json.parent.mkdir(parents=True, exist_ok=True)
+    output_md.parent.mkdir(parents=True, exist_ok=True)
+    output_json.write_text(json.dumps(report, indent=2, sort_keys=True), encoding="utf-8")
+    output_md.write_text(render_markdown(report), encoding="utf-8")
+
+
 def resolve_output_path(package_path: Path, raw: str) -> Path:
     path = Path(raw)
     if path.is_absolute():
@@ -115,6 +355,33 @@ def resolve_output_path(package_path: Path, raw: str) -> Path:
     return package_path / path
 
 
+def package_revision(package_path: Path) -> Dict[str, Any]:
+    """Git commit of the package checkout and whether tracked files differ from it."""
+
+    def git(*command: str) -> Optional[str]:
+        try:
+            proc = subprocess.run(
+                ["git", "-C", str(package_path), *command], capture_output=True, text=True, check=False
+            )
+        except OSError:
+            return None
+        return proc.stdout.strip() if proc.returncode == 0 else None
+
+    commit = git("rev-parse", "HEAD") or None
+    status = git("status", "--porcelain", "--untracked-files=no") if commit else None
+    return {"package_commit": commit, "package_dirty": bool(status) if status is not None else None}
+
+
+@contextlib.contextmanager
+def timed_phase(timings: Dict[str, float], name: str) -> Iterator[None]:
+    """Add the wall-clock seconds spent in the block to ``timings[name]``."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - started
+
+
 def run_harness(
     *,
     package_path: Path,
@@ -127,63 +394,215 @@ def run_harness(
     income_limit: int,
     income_freq: str,
     timeout_sec: int,
+    swift_mode: str = "serve",
+    jobs: int = 1,
+    max_in_flight: int = 0,
+    budget: Optional["RequestBudget"] = None,
+    priority: str = "normal",
+    python_cache: Optional["PythonSnapshotCache"] = None,
+    python_cache_mode: str = "off",
+    yahoo_base_url: Optional[str] = None,
+    data_source: Optional[str] = None,
+    history_window: str = "limit",
+    history_chunk_days: int = 0,
+    swift_bars: str = "json",
+    tolerance_policy: Optional[TolerancePolicy] = None,
+    swift_config: str = "release",
+    swift_cli: Optional["SwiftCLI"] = None,
 ) -> Dict[str, Any]:
     started_at = dt.datetime.now(dt.timezone.utc).isoformat()
-    symbol_reports: List[Dict[str, Any]] = []
-
-    counts = {"pass": 0, "warn": 0, "fail": 0, "skip": 0}
-
-    for symbol in symbols:
-        swift_snapshot = fetch_swift_snapshot(
-            swift_bin=swift_bin,
-            package_path=package_path,
-            symbol=symbol,
-            period=period,
-            interval=interval,
-            history_limit=history_limit,
-            earnings_limit=earnings_limit,
-            income_limit=income_limit,
-            income_freq=income_freq,
-            timeout_sec=timeout_sec,
-        )
-        python_snapshot = fetch_python_snapshot(
-            symbol=symbol,
-            period=period,
-            interval=interval,
-            history_limit=history_limit,
-            earnings_limit=earnings_limit,
-            income_limit=income_limit,
-            income_freq=income_freq,
+    jobs = max(1, jobs)
+    max_in_flight = max(1, max_in_flight or jobs)
+    if tolerance_policy is None:
+        tolerance_policy = load_policy()
+    # Every Swift request execs one prebuilt binary instead of `swift run`,
+    # so no request pays for a SwiftPM build check or runs a stale build.
+    if swift_cli is None:
+        swift_cli = build_swift_cli(swift_bin=swift_bin, package_path=package_path, config=swift_config)
+    else:
+        swift_cli.check_current()
+
+    # Every Swift or Python snapshot fetch holds one budget permit while it
+    # talks to Yahoo, so --jobs widens the pipeline without widening Yahoo
+    # pressure. parity_matrix.py passes one budget shared by all scenarios.
+    if budget is None:
+        budget = RequestBudget(max_concurrent=max_in_flight, max_background=max_in_flight)
+    # A stand-in base URL reroutes both clients: YFParityCLI via its
+    # YF_PARITY_BASE_URL override, yfinance via a URL-rewriting session.
+    swift_env: Optional[Dict[str, str]] = None
+    python_session: Any = None
+    if yahoo_base_url:
+        swift_env = {**os.environ, "YF_PARITY_BASE_URL": yahoo_base_url}
+        python_session = load_tool_module("parity_standin").standin_session(yahoo_base_url)
+
+    # With columnar Swift bars every history payload is a memory-mapped file
+    # in a per-run scratch directory instead of a JSON row list.
+    bars_dir = Path(tempfile.mkdtemp(prefix="parity-bars-")) if swift_bars == "columns" else None
+
+    def bars_path(symbol: str) -> Optional[Path]:
+        if bars_dir is None:
+            return None
+        return bars_dir / f"{symbol}-{uuid.uuid4().hex}.yfcol"
+
+    sessions: "queue.Queue[Optional[SwiftServeSession]]" = queue.Queue()
+    for _ in range(jobs):
+        sessions.put(
+            SwiftServeSession(swift_bin=swift_bin, package_path=package_path, env=swift_env, cli=swift_cli)
+            if swift_mode == "serve"
+            else None
         )
 
-        comparisons = compare_symbol(swift_snapshot, python_snapshot)
-        symbol_status = worst_status([c.status for c in comparisons.values()])
-
-        symbol_report = {
+    def swift_side(symbol: str) -> Dict[str, Any]:
+        session = sessions.get()
+        try:
+            with budget.permit(priority) as waited:
+                snapshot = fetch_swift_snapshot(
+                    swift_bin=swift_bin,
+                    package_path=package_path,
+                    symbol=symbol,
+                    period=period,
+                    interval=interval,
+                    history_limit=history_limit,
+                    earnings_limit=earnings_limit,
+                    income_limit=income_limit,
+                    income_freq=income_freq,
+                    timeout_sec=timeout_sec,
+                    session=session,
+                    env=swift_env,
+                    bars_path=bars_path(symbol),
+                    cli=swift_cli,
+                )
+            snapshot.setdefault("timings", {})["budget_wait"] = waited
+            return snapshot
+        finally:
+            sessions.put(session)
+
+    if python_cache is None:
+        python_cache_mode = "off"
+    elif python_cache_mode != "off":
+        # An "off" run never touches the cache directory, not even to clean it.
+        python_cache.evict_expired()
+
+    def python_side(symbol: str) -> Dict[str, Any]:
+        fetch_args = {
             "symbol": symbol,
-            "status": symbol_status,
-            "swift_ok": bool(swift_snapshot.get("ok", False)),
-            "swift_errors": swift_snapshot.get("errors", []),
-            "comparisons": {
-                name: {
-                    "status": result.status,
-                    "summary": result.summary,
-                    "metrics": result.metrics,
-                    "issues": result.issues,
-                }
-                for name, result in comparisons.items()
-            },
+            "period": period,
+            "interval": interval,
+            "history_limit": history_limit,
+            "earnings_limit": earnings_limit,
+            "income_limit": income_limit,
+            "income_freq": income_freq,
         }
-        symbol_reports.append(symbol_report)
-
-        counts[symbol_status] += 1
+        if python_cache_mode == "off" or python_cache is None:
+            with budget.permit(priority) as waited:
+                snapshot = fetch_python_snapshot(**fetch_args, session=python_session)
+            snapshot["timings"]["budget_wait"] = waited
+            return snapshot
+
+        key = python_cache.key(**fetch_args, source=data_source or "yahoo")
+        timings: Dict[str, float] = {}
+        if python_cache_mode in ("reuse", "only"):
+            with timed_phase(timings, "cache_load"):
+                cached = python_cache.load(key)
+            if cached is not None:
+                return {**cached, "cache": "hit", "timings": timings}
+        if python_cache_mode == "only":
+            return {**python_cache_miss_snapshot(**fetch_args), "timings": timings}
+
+        with budget.permit(priority) as waited:
+            snapshot = fetch_python_snapshot(**fetch_args, session=python_session)
+        stored = python_cache.store(key, snapshot)
+        snapshot["timings"].update(timings, budget_wait=waited)
+        return {**snapshot, "cache": "stored" if stored else "live"}
+
+    chunk_days = history_chunk_days or HISTORY_CHUNK_DAYS.get(interval, 36500)
+
+    def swift_history_chunk(symbol: str, start: dt.datetime, end: dt.datetime) -> Dict[str, Any]:
+        session = sessions.get()
+        try:
+            with budget.permit(priority):
+                return fetch_swift_history_window(
+                    swift_bin=swift_bin,
+                    package_path=package_path,
+                    symbol=symbol,
+                    interval=interval,
+                    start=start,
+                    end=end,
+                    timeout_sec=timeout_sec,
+                    session=session,
+                    env=swift_env,
+                    bars_path=bars_path(symbol),
+                    cli=swift_cli,
+                )
+        finally:
+            sessions.put(session)
+
+    def stream_history(symbol: str, swift_pool: ThreadPoolExecutor) -> "HistoryAccumulator":
+        # Both sides are fetched and reduced one date window at a time, so a
+        # period=max comparison holds at most one chunk per side in memory.
+        ticker = yf.Ticker(symbol, session=python_session) if python_session is not None else yf.Ticker(symbol)
+        now = dt.datetime.now(dt.timezone.utc)
+        try:
+            with budget.permit(priority):
+                first_trade = python_first_trade(ticker) if interval not in INTRADAY_LOOKBACK_DAYS else None
+        except Exception:  # noqa: BLE001
+            first_trade = None
+
+        accumulator = HistoryAccumulator()
+        for start, end in history_chunks(history_window_start(interval, first_trade, now), now, chunk_days):
+            label = f"{start.date()}..{end.date()}"
+            swift_future = swift_pool.submit(swift_history_chunk, symbol, start, end)
+            try:
+                with budget.permit(priority):
+                    py_bars = python_history_window(ticker, interval=interval, start=start, end=end)
+            except Exception as exc:  # noqa: BLE001
+                swift_future.result()
+                accumulator.add_failure(f"{label} python: {exc}")
+                continue
+            swift_payload = swift_future.result()
+            if not swift_payload.get("ok", False):
+                errors = swift_payload.get("errors") or [{"error": swift_payload.get("error")}]
+                accumulator.add_failure(f"{label} swift: {errors[0].get('error')}")
+                continue
+            swift_history = swift_payload.get("data") or {}
+            accumulator.add_chunk(history_bars(swift_history), py_bars)
+            discard_bar_columns(swift_history)
+        return accumulator
 
-    total = len(symbol_reports)
-    scored_total = max(0, total - counts["skip"])
-    if scored_total == 0:
-        score = 100.0
-    else:
-        score = max(0.0, ((counts["pass"] + 0.5 * counts["warn"]) / scored_total) * 100.0)
+    try:
+        with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="parity-swift") as swift_pool:
+
+            def run_symbol(symbol: str) -> Dict[str, Any]:
+                timings: Dict[str, float] = {}
+                with timed_phase(timings, "total"):
+                    swift_future = swift_pool.submit(swift_side, symbol)
+                    python_snapshot = python_side(symbol)
+                    history = None
+                    if history_window == "max":
+                        with timed_phase(timings, "history_stream"):
+                            history = stream_history(symbol, swift_pool)
+                    report = build_symbol_report(
+                        symbol,
+                        swift_future.result(),
+                        python_snapshot,
+                        history=history,
+                        timings=timings,
+                        tolerance_policy=tolerance_policy,
+                    )
+                report["timings_ms"]["total"] = round(timings["total"] * 1000.0, 1)
+                return report
+
+            with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="parity-symbol") as symbol_pool:
+                # map() yields in submission order, so the report never depends on
+                # which symbol finished first.
+                symbol_reports = list(symbol_pool.map(run_symbol, symbols))
+    finally:
+        while not sessions.empty():
+            session = sessions.get_nowait()
+            if session is not None:
+                session.close()
+        if bars_dir is not None:
+            shutil.rmtree(bars_dir, ignore_errors=True)
 
     return {
         "generated_at": started_at,
@@ -192,23 +611,360 @@ def run_harness(
             "period": period,
             "interval": interval,
             "history_limit": history_limit,
+            "history_window": history_window,
+            "history_chunk_days": chunk_days if history_window == "max" else None,
             "earnings_limit": earnings_limit,
             "income_limit": income_limit,
             "income_freq": income_freq,
             "package_path": str(package_path),
+            **package_revision(package_path),
+            "yfinance": getattr(yf, "__version__", "unknown"),
+            "swift_mode": swift_mode,
+            "swift_cli": swift_cli.describe(),
+            "swift_bars": swift_bars,
+            "jobs": jobs,
+            "max_in_flight": budget.max_concurrent,
+            "priority": priority,
+            "python_cache": python_cache_mode,
+            "yahoo_base_url": yahoo_base_url,
+            "data_source": data_source or "yahoo",
+            "tolerances": tolerance_policy.describe(),
         },
-        "summary": {
-            "total": total,
-            "pass": counts["pass"],
-            "warn": counts["warn"],
-            "fail": counts["fail"],
-            "skip": counts["skip"],
-            "score": score,
-        },
+        "summary": summarize_statuses(symbol_report["status"] for symbol_report in symbol_reports),
+        "diagnostics": aggregate_diagnostics(report.get("swift_diagnostics") for report in symbol_reports),
         "symbols": symbol_reports,
     }
 
 
+def build_symbol_report(
+    symbol: str,
+    swift_snapshot: Dict[str, Any],
+    python_snapshot: Dict[str, Any],
+    *,
+    history: Optional["HistoryAccumulator"] = None,
+    timings: Optional[Dict[str, float]] = None,
+    tolerance_policy: Optional[TolerancePolicy] = None,
+) -> Dict[str, Any]:
+    # The Python quote classifies first; Swift fills in fields it lacks.
+    asset_keys = match_values(python_snapshot.get("quote"), swift_snapshot.get("quote"))
+    tolerances = (tolerance_policy or load_policy()).for_quote(asset_keys)
+    compare_timings: Dict[str, float] = {}
+    comparisons = compare_symbol(swift_snapshot, python_snapshot, timings=compare_timings, tolerances=tolerances)
+    if history is not None:
+        comparisons["history"] = history.result(tolerances)
+    phases = {
+        **{f"swift.{name}": value for name, value in (swift_snapshot.get("timings") or {}).items()},
+        **{f"python.{name}": value for name, value in (python_snapshot.get("timings") or {}).items()},
+        **{f"compare.{name}": value for name, value in compare_timings.items()},
+        **(timings or {}),
+    }
+    return {
+        "symbol": symbol,
+        "status": worst_status([c.status for c in comparisons.values()]),
+        "asset_class": tolerances.asset_class,
+        "asset_keys": asset_keys,
+        "swift_ok": bool(swift_snapshot.get("ok", False)),
+        "swift_errors": swift_snapshot.get("errors", []),
+        "swift_diagnostics": diagnostics_from_export(swift_snapshot.get("diagnostics")),
+        "python_cache": python_snapshot.get("cache", "off"),
+        "timings_ms": {name: round(value * 1000.0, 1) for name, value in phases.items()},
+        "comparisons": {
+            name: {
+                "status": result.status,
+                "summary": result.summary,
+                "metrics": result.metrics,
+                "issues": result.issues,
+            }
+            for name, result in comparisons.items()
+        },
+    }
+
+
+class RequestBudget:
+    """Thread-safe Yahoo request budget mirroring ``YFRequestBudgetGate``.
+
+    Permits are granted interactive-first, then normal, then background, and
+    background work never holds more than ``max_background`` permits. An
+    optional ``max_per_second`` additionally paces permit grants.
+    """
+
+    def __init__(self, *, max_concurrent: int = 4, max_background: int = 1, max_per_second: float = 0.0) -> None:
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_background = min(self.max_concurrent, max(1, max_background))
+        self.min_interval = 1.0 / max_per_second if max_per_second > 0 else 0.0
+        self.condition = threading.Condition()
+        self.active = 0
+        self.active_background = 0
+        self.waiters: Dict[str, "collections.deque[object]"] = {p: collections.deque() for p in PRIORITY_CLASSES}
+        self.next_grant_at = 0.0
+
+    @contextlib.contextmanager
+    def permit(self, priority: str = "normal") -> Iterator[float]:
+        """Hold one permit; yields the seconds spent waiting for it."""
+        started = time.perf_counter()
+        self.acquire(priority)
+        try:
+            yield time.perf_counter() - started
+        finally:
+            self.release(priority)
+
+    def acquire(self, priority: str = "normal") -> None:
+        if priority not in self.waiters:
+            raise ValueError(f"Unknown request priority: {priority}")
+        ticket = object()
+        with self.condition:
+            self.waiters[priority].append(ticket)
+            while not self._can_start(priority, ticket):
+                self.condition.wait()
+            self.waiters[priority].popleft()
+            self.active += 1
+            if priority == "background":
+                self.active_background += 1
+            now = time.monotonic()
+            grant_at = max(now, self.next_grant_at)
+            self.next_grant_at = grant_at + self.min_interval
+        if grant_at > now:
+            time.sleep(grant_at - now)
+
+    def release(self, priority: str = "normal") -> None:
+        with self.condition:
+            self.active = max(0, self.active - 1)
+            if priority == "background":
+                self.active_background = max(0, self.active_background - 1)
+            self.condition.notify_all()
+
+    def _can_start(self, priority: str, ticket: object) -> bool:
+        if self.active >= self.max_concurrent:
+            return False
+        if priority == "background" and self.active_background >= self.max_background:
+            return False
+        if self.waiters[priority][0] is not ticket:
+            return False
+        higher = PRIORITY_CLASSES[: PRIORITY_CLASSES.index(priority)]
+        return not any(self.waiters[name] for name in higher)
+
+
+class SwiftBuildError(Exception):
+    """YFParityCLI could not be built or located, or no longer matches the sources."""
+
+
+@dataclass(frozen=True)
+class SwiftCLI:
+    """A built YFParityCLI executable and the digest of the sources it was built from."""
+
+    path: Path
+    config: str
+    package_path: Path
+    source_digest: str
+
+    def command(self, *args: str) -> List[str]:
+        return [str(self.path), *args]
+
+    def check_current(self) -> None:
+        """Raise SwiftBuildError if the binary is gone or the sources changed since it was built."""
+        if not self.path.is_file():
+            raise SwiftBuildError(f"{self.path} no longer exists")
+        if swift_source_digest(self.package_path) != self.source_digest:
+            raise SwiftBuildError(f"sources changed since {self.path} was built; rebuild before comparing")
+
+    def describe(self) -> Dict[str, Any]:
+        return {"path": str(self.path), "config": self.config, "source_digest": self.source_digest}
+
+
+def swift_source_files(package_path: Path) -> List[Path]:
+    files = [package_path / "Package.swift", package_path / "Package.resolved"]
+    files.extend(sorted((package_path / "Sources").rglob("*")))
+    return [path for path in files if path.is_file()]
+
+
+def swift_source_digest(package_path: Path) -> str:
+    digest = hashlib.sha256()
+    for path in swift_source_files(package_path):
+        digest.update(str(path.relative_to(package_path)).encode("utf-8") + b"\0")
+        digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+def build_swift_cli(*, swift_bin: str, package_path: Path, config: str = "release") -> SwiftCLI:
+    """Build YFParityCLI once in `config` and return its executable.
+
+    The source digest is taken before the build, so an edit made while SwiftPM
+    compiles fails the next ``check_current()`` instead of going unnoticed.
+    """
+    if config not in SWIFT_CONFIGS:
+        raise SwiftBuildError(f"unknown Swift configuration {config!r}")
+    source_digest = swift_source_digest(package_path)
+    build = [swift_bin, "build", "--package-path", str(package_path), "--configuration", config]
+    try:
+        subprocess.run([*build, "--product", SWIFT_PRODUCT], capture_output=True, text=True, check=True)
+        bin_path = subprocess.run([*build, "--show-bin-path"], capture_output=True, text=True, check=True).stdout
+    except subprocess.CalledProcessError as exc:
+        raise SwiftBuildError(f"`{' '.join(exc.cmd)}` exited {exc.returncode}: {(exc.stderr or '').strip()[-400:]}")
+    except OSError as exc:
+        raise SwiftBuildError(str(exc))
+
+    lines = bin_path.strip().splitlines()
+    path = Path(lines[-1].strip()) / SWIFT_PRODUCT if lines else Path(SWIFT_PRODUCT)
+    if not path.is_file():
+        raise SwiftBuildError(f"SwiftPM reported success but {path} does not exist")
+    # SwiftPM relinks whenever a Swift source changed, so a binary older than
+    # the newest one means the build did not pick up the current tree.
+    newest = max((source.stat().st_mtime for source in (package_path / "Sources").rglob("*.swift")), default=0.0)
+    if path.stat().st_mtime < newest:
+        raise SwiftBuildError(f"{path} is older than the sources after `swift build`; clean .build and retry")
+    cli = SwiftCLI(path=path, config=config, package_path=package_path, source_digest=source_digest)
+    cli.check_current()
+    return cli
+
+
+def parity_cli_command(*args: str, swift_bin: str, package_path: Path, cli: Optional[SwiftCLI]) -> List[str]:
+    """Argv for one YFParityCLI invocation: the prebuilt binary, or `swift run` without one."""
+    if cli is not None:
+        return cli.command(*args)
+    return [swift_bin, "run", "--package-path", str(package_path), SWIFT_PRODUCT, *args]
+
+
+class SwiftServeError(Exception):
+    """A serve child died or timed out; the message is the reported error code."""
+
+
+class SwiftServeSession:
+    """One long-lived ``YFParityCLI serve`` child that answers snapshot requests.
+
+    Requests and results are newline-delimited JSON. The child is spawned lazily
+    and respawned after a timeout or crash, so one stuck symbol cannot poison the
+    rest of the run. A fresh child is pinged before its first request, so
+    ``last_timings`` can split process startup (including the SwiftPM build
+    check when there is no prebuilt `cli`) from the request round trip and the
+    JSON parse of its reply.
+    """
+
+    def __init__(
+        self,
+        *,
+        swift_bin: str,
+        package_path: Path,
+        env: Optional[Dict[str, str]] = None,
+        cli: Optional["SwiftCLI"] = None,
+    ) -> None:
+        self.command = parity_cli_command("serve", swift_bin=swift_bin, package_path=package_path, cli=cli)
+        self.env = env
+        self.proc: Optional[subprocess.Popen] = None
+        self.lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self.stderr_tail: "collections.deque[str]" = collections.deque(maxlen=40)
+        self.next_id = 0
+        self.last_timings: Dict[str, float] = {}
+
+    def request(self, payload: Dict[str, Any], timeout_sec: int) -> Dict[str, Any]:
+        deadline = time.monotonic() + timeout_sec
+        timings: Dict[str, float] = {"spawn": 0.0, "fetch": 0.0, "parse": 0.0}
+        self.last_timings = timings
+        try:
+            if self.proc is None or self.proc.poll() is not None:
+                with timed_phase(timings, "spawn"):
+                    self._exchange(self._ensure_started(), {"command": "ping"}, deadline, {})
+            return self._exchange(self._ensure_started(), payload, deadline, timings)
+        except SwiftServeError as exc:
+            return self._failure(str(exc))
+
+    def _exchange(
+        self,
+        proc: subprocess.Popen,
+        payload: Dict[str, Any],
+        deadline: float,
+        timings: Dict[str, float],
+    ) -> Dict[str, Any]:
+        self.next_id += 1
+        request_id = self.next_id
+        started = time.perf_counter()
+        try:
+            assert proc.stdin is not None
+            proc.stdin.write(json.dumps({**payload, "id": request_id}) + "\n")
+            proc.stdin.flush()
+        except (BrokenPipeError, OSError):
+            raise SwiftServeError("swift_serve_exited")
+
+        parse_sec = 0.0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.close(kill=True)
+                raise SwiftServeError("swift_snapshot_timeout")
+            try:
+                line = self.lines.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if line is None:
+                self.close(kill=True)
+                raise SwiftServeError("swift_serve_exited")
+            parse_started = time.perf_counter()
+            result = parse_json_from_output(line)
+            parse_sec += time.perf_counter() - parse_started
+            # Skip build chatter and anything left over from an abandoned request.
+            if result is None or result.get("id") != request_id:
+                continue
+            result.pop("id", None)
+            timings["parse"] = timings.get("parse", 0.0) + parse_sec
+            timings["fetch"] = timings.get("fetch", 0.0) + time.perf_counter() - started - parse_sec
+            return result
+
+    def close(self, *, kill: bool = False) -> None:
+        proc, self.proc = self.proc, None
+        if proc is None:
+            return
+        if kill:
+            proc.kill()
+        try:
+            if proc.stdin is not None:
+                proc.stdin.close()
+            proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+            proc.wait()
+
+    def _ensure_started(self) -> subprocess.Popen:
+        if self.proc is not None and self.proc.poll() is None:
+            return self.proc
+        self.close(kill=True)
+        self.lines = queue.Queue()
+        self.stderr_tail.clear()
+        self.proc = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            env=self.env,
+        )
+        threading.Thread(target=self._pump_stdout, args=(self.proc, self.lines), daemon=True).start()
+        threading.Thread(target=self._pump_stderr, args=(self.proc,), daemon=True).start()
+        return self.proc
+
+    def _pump_stdout(self, proc: subprocess.Popen, lines: "queue.Queue[Optional[str]]") -> None:
+        assert proc.stdout is not None
+        for line in proc.stdout:
+            lines.put(line)
+        lines.put(None)
+
+    def _pump_stderr(self, proc: subprocess.Popen) -> None:
+        assert proc.stderr is not None
+        for line in proc.stderr:
+            self.stderr_tail.append(line)
+
+    def _failure(self, error: str) -> Dict[str, Any]:
+        return {
+            "ok": False,
+            "errors": [
+                {
+                    "operation": "snapshot",
+                    "error": error,
+                    "stderr": "".join(self.stderr_tail).strip()[-400:],
+                }
+            ],
+        }
+
+
 def fetch_swift_snapshot(
     *,
     swift_bin: str,
@@ -221,14 +977,29 @@ def fetch_swift_snapshot(
     income_limit: int,
     income_freq: str,
     timeout_sec: int,
+    session: Optional[SwiftServeSession] = None,
+    env: Optional[Dict[str, str]] = None,
+    bars_path: Optional[Path] = None,
+    cli: Optional["SwiftCLI"] = None,
 ) -> Dict[str, Any]:
-    cmd = [
-        swift_bin,
-        "run",
-        "--package-path",
-        str(package_path),
-        "YFParityCLI",
-        "snapshot",
+    if session is not None:
+        request: Dict[str, Any] = {
+            "command": "snapshot",
+            "symbol": symbol,
+            "period": period,
+            "interval": interval,
+            "history-limit": history_limit,
+            "earnings-limit": earnings_limit,
+            "income-limit": income_limit,
+            "freq": income_freq,
+        }
+        if bars_path is not None:
+            request["bars-path"] = str(bars_path)
+        payload = session.request(request, timeout_sec)
+        payload["timings"] = dict(session.last_timings)
+        return payload
+
+    cmd = parity_cli_command("snapshot", swift_bin=swift_bin, package_path=package_path, cli=cli) + [
         "--symbol",
         symbol,
         "--period",
@@ -244,19 +1015,31 @@ def fetch_swift_snapshot(
         "--freq",
         income_freq,
     ]
+    if bars_path is not None:
+        cmd.extend(["--bars-path", str(bars_path)])
 
+    # One-shot runs cannot tell process startup from the fetch, so "fetch"
+    # covers both.
+    timings: Dict[str, float] = {}
     try:
-        proc = subprocess.run(
-            cmd,
-            text=True,
-            capture_output=True,
-            timeout=timeout_sec,
-            check=False,
-        )
+        with timed_phase(timings, "fetch"):
+            proc = subprocess.run(
+                cmd,
+                text=True,
+                capture_output=True,
+                timeout=timeout_sec,
+                check=False,
+                env=env,
+            )
     except subprocess.TimeoutExpired:
-        return {"ok": False, "errors": [{"operation": "snapshot", "error": "swift_snapshot_timeout"}]}
+        return {
+            "ok": False,
+            "errors": [{"operation": "snapshot", "error": "swift_snapshot_timeout"}],
+            "timings": timings,
+        }
 
-    payload = parse_json_from_output(proc.stdout)
+    with timed_phase(timings, "parse"):
+        payload = parse_json_from_output(proc.stdout)
     if payload is None:
         return {
             "ok": False,
@@ -268,6 +1051,7 @@ def fetch_swift_snapshot(
                     "stderr": proc.stderr.strip()[-400:],
                 }
             ],
+            "timings": timings,
         }
 
     if proc.returncode != 0 and payload.get("ok", False):
@@ -275,6 +1059,7 @@ def fetch_swift_snapshot(
         payload.setdefault("errors", []).append(
             {"operation": "snapshot", "error": f"swift_exit_{proc.returncode}"}
         )
+    payload["timings"] = timings
     return payload
 
 
@@ -295,6 +1080,138 @@ def parse_json_from_output(stdout: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+def fetch_swift_history_window(
+    *,
+    swift_bin: str,
+    package_path: Path,
+    symbol: str,
+    interval: str,
+    start: dt.datetime,
+    end: dt.datetime,
+    timeout_sec: int,
+    session: Optional[SwiftServeSession] = None,
+    env: Optional[Dict[str, str]] = None,
+    bars_path: Optional[Path] = None,
+    cli: Optional["SwiftCLI"] = None,
+) -> Dict[str, Any]:
+    options: Dict[str, Any] = {
+        "symbol": symbol,
+        "interval": interval,
+        "start": int(start.timestamp()),
+        "end": int(end.timestamp()),
+    }
+    if bars_path is not None:
+        options["bars-path"] = str(bars_path)
+    if session is not None:
+        return session.request({"command": "history", **options}, timeout_sec)
+
+    cmd = parity_cli_command("history", swift_bin=swift_bin, package_path=package_path, cli=cli)
+    for name, value in options.items():
+        cmd.extend([f"--{name}", str(value)])
+    try:
+        proc = subprocess.run(cmd, text=True, capture_output=True, timeout=timeout_sec, check=False, env=env)
+    except subprocess.TimeoutExpired:
+        return {"ok": False, "error": "swift_history_timeout"}
+    payload = parse_json_from_output(proc.stdout) or {"ok": False, "error": "swift_history_invalid_json"}
+    if proc.returncode != 0 and payload.get("ok", False):
+        # A window the CLI printed but then failed on must not count as delivered bars.
+        return {"ok": False, "error": f"swift_exit_{proc.returncode}", "stderr": proc.stderr.strip()[-400:]}
+    return payload
+
+
+def history_window_start(interval: str, first_trade: Optional[dt.datetime], now: dt.datetime) -> dt.datetime:
+    lookback = INTRADAY_LOOKBACK_DAYS.get(interval)
+    if lookback is not None:
+        return now - dt.timedelta(days=lookback)
+    return first_trade or dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+
+
+def history_chunks(start: dt.datetime, end: dt.datetime, chunk_days: int) -> Iterator[Tuple[dt.datetime, dt.datetime]]:
+    """Date-ordered ``[start, end)`` windows on UTC midnight boundaries."""
+    cursor = start.astimezone(dt.timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    step = dt.timedelta(days=max(1, chunk_days))
+    while cursor < end:
+        upper = min(cursor + step, end)
+        yield cursor, upper
+        cursor = upper
+
+
+class PythonSnapshotCache:
+    """Content-addressed on-disk store of normalized Python yfinance snapshots.
+
+    Entries are addressed by the SHA-256 of the fetch parameters plus the
+    installed yfinance version, so upgrading yfinance never replays stale output.
+    Only fully successful snapshots are stored.
+    """
+
+    def __init__(self, root: Path, *, ttl_sec: float) -> None:
+        self.root = root
+        self.ttl_sec = ttl_sec
+
+    def key(self, **fetch_args: Any) -> str:
+        identity = {**fetch_args, "yfinance": getattr(yf, "__version__", "unknown")}
+        encoded = json.dumps(identity, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self.path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        if self._expired(entry):
+            path.unlink(missing_ok=True)
+            return None
+        snapshot = entry.get("snapshot")
+        return snapshot if isinstance(snapshot, dict) else None
+
+    def store(self, key: str, snapshot: Dict[str, Any]) -> bool:
+        if not snapshot.get("ok", False):
+            return False
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        # Timings describe the fetch that produced the entry, not the entry.
+        stored = {name: value for name, value in snapshot.items() if name != "timings"}
+        temp.write_text(json.dumps({"stored_at": time.time(), "snapshot": stored}, sort_keys=True), encoding="utf-8")
+        os.replace(temp, path)
+        return True
+
+    def evict_expired(self) -> int:
+        if not self.root.exists():
+            return 0
+        evicted = 0
+        for path in self.root.glob("*/*.json"):
+            try:
+                entry = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                entry = {}
+            if self._expired(entry):
+                path.unlink(missing_ok=True)
+                evicted += 1
+        return evicted
+
+    def _expired(self, entry: Dict[str, Any]) -> bool:
+        stored_at = to_float(entry.get("stored_at"))
+        return stored_at is None or time.time() - stored_at > self.ttl_sec
+
+
+def python_cache_miss_snapshot(*, symbol: str, period: str, interval: str, income_freq: str, **_: Any) -> Dict[str, Any]:
+    return {
+        "ok": False,
+        "symbol": symbol,
+        "quote": {},
+        "history": {"period": period, "interval": interval, "barCount": 0, "bars": []},
+        "earnings_dates": {"rowCount": 0, "rows": []},
+        "income_stmt": {"frequency": income_freq, "rowCount": 0, "rows": []},
+        "errors": [{"operation": "snapshot", "error": "python_cache_miss"}],
+        "cache": "miss",
+    }
+
+
 def fetch_python_snapshot(
     *,
     symbol: str,
@@ -304,9 +1221,11 @@ def fetch_python_snapshot(
     earnings_limit: int,
     income_limit: int,
     income_freq: str,
+    session: Any = None,
 ) -> Dict[str, Any]:
-    ticker = yf.Ticker(symbol)
+    ticker = yf.Ticker(symbol, session=session) if session is not None else yf.Ticker(symbol)
     errors: List[Dict[str, str]] = []
+    timings: Dict[str, float] = {}
 
     quote: Dict[str, Any]
     history: Dict[str, Any]
@@ -314,25 +1233,29 @@ def fetch_python_snapshot(
     income: Dict[str, Any]
 
     try:
-        quote = python_quote(symbol, ticker)
+        with timed_phase(timings, "quote"):
+            quote = python_quote(symbol, ticker)
     except Exception as exc:  # noqa: BLE001
         quote = {}
         errors.append({"operation": "quote", "error": str(exc)})
 
     try:
-        history = python_history(ticker, period=period, interval=interval, limit=history_limit)
+        with timed_phase(timings, "history"):
+            history = python_history(ticker, period=period, interval=interval, limit=history_limit)
     except Exception as exc:  # noqa: BLE001
         history = {"period": period, "interval": interval, "barCount": 0, "bars": []}
         errors.append({"operation": "history", "error": str(exc)})
 
     try:
-        earnings = python_earnings_dates(ticker, limit=earnings_limit)
+        with timed_phase(timings, "earnings_dates"):
+            earnings = python_earnings_dates(ticker, limit=earnings_limit)
     except Exception as exc:  # noqa: BLE001
         earnings = {"rowCount": 0, "rows": []}
         errors.append({"operation": "earnings-dates", "error": str(exc)})
 
     try:
-        income = python_income_stmt(ticker, frequency=income_freq, limit=income_limit)
+        with timed_phase(timings, "income_stmt"):
+            income = python_income_stmt(ticker, frequency=income_freq, limit=income_limit)
     except Exception as exc:  # noqa: BLE001
         income = {"frequency": income_freq, "rowCount": 0, "rows": []}
         errors.append({"operation": "income-stmt", "error": str(exc)})
@@ -345,6 +1268,7 @@ def fetch_python_snapshot(
         "earnings_dates": earnings,
         "income_stmt": income,
         "errors": errors,
+        "timings": timings,
     }
 
 
@@ -383,8 +1307,40 @@ def python_history(ticker: yf.Ticker, *, period: str, interval: str, limit: int)
     if frame is None or frame.empty:
         return {"period": period, "interval": interval, "barCount": 0, "bars": []}
 
-    frame = frame.tail(limit)
-    intraday = ("m" in interval.lower()) or ("h" in interval.lower())
+    rows = history_rows(frame.tail(limit), interval=interval)
+    return {"period": period, "interval": interval, "barCount": len(rows), "bars": rows}
+
+
+def python_history_window(ticker: yf.Ticker, *, interval: str, start: dt.datetime, end: dt.datetime) -> HistoryBars:
+    frame = ticker.history(
+        start=start,
+        end=end,
+        interval=interval,
+        prepost=False,
+        actions=True,
+        auto_adjust=True,
+        back_adjust=False,
+        repair=False,
+        rounding=False,
+    )
+    if frame is None or frame.empty:
+        return HistoryBars.from_rows([])
+    # Same [start, end) cut as YFParityCLI so chunk edges never double count.
+    index = frame.index.tz_convert("UTC") if frame.index.tz is not None else frame.index.tz_localize("UTC")
+    return HistoryBars.from_frame(frame[(index >= start) & (index < end)], interval=interval)
+
+
+def python_first_trade(ticker: yf.Ticker) -> Optional[dt.datetime]:
+    value = (ticker.get_history_metadata() or {}).get("firstTradeDate")
+    if isinstance(value, (int, float)):
+        return dt.datetime.fromtimestamp(value, tz=dt.timezone.utc)
+    if isinstance(value, dt.datetime):
+        return value.astimezone(dt.timezone.utc) if value.tzinfo else value.replace(tzinfo=dt.timezone.utc)
+    return None
+
+
+def history_rows(frame: pd.DataFrame, *, interval: str) -> List[Dict[str, Any]]:
+    intraday = is_intraday(interval)
     rows: List[Dict[str, Any]] = []
     for index, row in frame.iterrows():
         rows.append(
@@ -398,7 +1354,7 @@ def python_history(ticker: yf.Ticker, *, period: str, interval: str, limit: int)
                 "volume": to_int(row.get("Volume")),
             }
         )
-    return {"period": period, "interval": interval, "barCount": len(rows), "bars": rows}
+    return rows
 
 
 def python_earnings_dates(ticker: yf.Ticker, *, limit: int) -> Dict[str, Any]:
@@ -470,18 +1426,103 @@ def python_income_stmt(ticker: yf.Ticker, *, frequency: str, limit: int) -> Dict
     return {"frequency": frequency, "rowCount": len(rows), "rows": rows}
 
 
-def compare_symbol(swift_snapshot: Dict[str, Any], python_snapshot: Dict[str, Any]) -> Dict[str, CompareResult]:
+def diagnostics_from_export(export: Any) -> Optional[Dict[str, Any]]:
+    """Counters plus per-endpoint trace totals from one redacted YFDiagnosticsExport."""
+    if not isinstance(export, dict):
+        return None
+    endpoints: Dict[str, Dict[str, Any]] = {}
+    for trace in export.get("traces") or []:
+        if not isinstance(trace, dict):
+            continue
+        entry = endpoints.setdefault(
+            str(trace.get("endpoint") or "unknown"),
+            {"requests": 0, "attempts": 0, "duration_ms_total": 0, "duration_ms_max": 0, "outcomes": {}},
+        )
+        duration = to_int(trace.get("durationMilliseconds")) or 0
+        outcome = str(trace.get("outcome") or "unknown")
+        entry["requests"] += 1
+        entry["attempts"] += to_int(trace.get("attempts")) or 0
+        entry["duration_ms_total"] += duration
+        entry["duration_ms_max"] = max(entry["duration_ms_max"], duration)
+        entry["outcomes"][outcome] = entry["outcomes"].get(outcome, 0) + 1
+    counters = {name: to_int(export.get(name)) or 0 for name in DIAGNOSTIC_COUNTERS}
+    return {**counters, **diagnostics_ratios(counters), "endpoints": endpoints}
+
+
+def aggregate_diagnostics(items: Iterable[Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Sum per-symbol (or per-scenario) diagnostics and recompute the ratios."""
+    counters = {name: 0 for name in DIAGNOSTIC_COUNTERS}
+    endpoints: Dict[str, Dict[str, Any]] = {}
+    reporting = 0
+    for item in items:
+        if not item:
+            continue
+        reporting += item.get("reporting", 1)
+        for name in DIAGNOSTIC_COUNTERS:
+            counters[name] += int(item.get(name) or 0)
+        for endpoint, stats in (item.get("endpoints") or {}).items():
+            entry = endpoints.setdefault(
+                endpoint,
+                {"requests": 0, "attempts": 0, "duration_ms_total": 0, "duration_ms_max": 0, "outcomes": {}},
+            )
+            for name in ("requests", "attempts", "duration_ms_total"):
+                entry[name] += int(stats.get(name) or 0)
+            entry["duration_ms_max"] = max(entry["duration_ms_max"], int(stats.get("duration_ms_max") or 0))
+            for outcome, count in (stats.get("outcomes") or {}).items():
+                entry["outcomes"][outcome] = entry["outcomes"].get(outcome, 0) + int(count)
+    return {"reporting": reporting, **counters, **diagnostics_ratios(counters), "endpoints": endpoints}
+
+
+def diagnostics_ratios(counters: Dict[str, int]) -> Dict[str, Optional[float]]:
+    logical = counters["logicalRequests"]
+    attempts = counters["attempts"]
+    lookups = counters["cacheHits"] + counters["cacheMisses"]
     return {
-        "quote": compare_quote(swift_snapshot.get("quote"), python_snapshot.get("quote")),
-        "history": compare_history(swift_snapshot.get("history"), python_snapshot.get("history")),
-        "earnings_dates": compare_earnings(
-            swift_snapshot.get("earnings_dates"), python_snapshot.get("earnings_dates")
-        ),
-        "income_stmt": compare_income(swift_snapshot.get("income_stmt"), python_snapshot.get("income_stmt")),
+        "attempts_per_request": round(attempts / logical, 3) if logical else None,
+        "retry_rate": round(counters["retries"] / attempts, 3) if attempts else None,
+        "rate_limit_rate": round(counters["rateLimits"] / attempts, 3) if attempts else None,
+        "cache_hit_rate": round(counters["cacheHits"] / lookups, 3) if lookups else None,
+    }
+
+
+def describe_diagnostics(diagnostics: Optional[Dict[str, Any]]) -> str:
+    if not diagnostics:
+        return "no diagnostics"
+    amplification = diagnostics.get("attempts_per_request")
+    hit_rate = diagnostics.get("cache_hit_rate")
+    return (
+        f"logical={diagnostics.get('logicalRequests', 0)} attempts={diagnostics.get('attempts', 0)} "
+        f"({'n/a' if amplification is None else f'{amplification:.2f}'} per request) "
+        f"retries={diagnostics.get('retries', 0)} rate_limits={diagnostics.get('rateLimits', 0)} "
+        f"coalesced={diagnostics.get('coalescedRequests', 0)} "
+        f"cache_hit_rate={'n/a' if hit_rate is None else f'{hit_rate:.0%}'}"
+    )
+
+
+def compare_symbol(
+    swift_snapshot: Dict[str, Any],
+    python_snapshot: Dict[str, Any],
+    *,
+    timings: Optional[Dict[str, float]] = None,
+    tolerances: Optional[Tolerances] = None,
+) -> Dict[str, CompareResult]:
+    timings = {} if timings is None else timings
+    tolerances = tolerances or default_tolerances()
+    comparators = {
+        "quote": compare_quote,
+        "history": compare_history,
+        "earnings_dates": compare_earnings,
+        "income_stmt": compare_income,
     }
+    results: Dict[str, CompareResult] = {}
+    for name, comparator in comparators.items():
+        with timed_phase(timings, name):
+            results[name] = comparator(swift_snapshot.get(name), python_snapshot.get(name), tolerances)
+    return results
 
 
-def compare_quote(swift: Any, py: Any) -> CompareResult:
+def compare_quote(swift: Any, py: Any, tolerances: Optional[Tolerances] = None) -> CompareResult:
+    tolerances = tolerances or default_tolerances()
     swift = swift if isinstance(swift, dict) else {}
     py = py if isinstance(py, dict) else {}
 
@@ -503,107 +1544,423 @@ def compare_quote(swift: Any, py: Any) -> CompareResult:
         warns += 1
         issues.append(f"name differs: swift={swift.get('name')} python={py.get('name')}")
 
-    numeric_fields = {
-        "regularMarketPrice": 0.03,
-        "regularMarketChangePercent": 0.30,
-        "regularMarketVolume": 0.35,
-        "marketCap": 0.15,
-        "trailingPE": 0.25,
-        "forwardPE": 0.25,
-    }
-    for field, tolerance in numeric_fields.items():
+    # Raw values of every policy field (even ones this class skips) keep the
+    # report re-scorable under another policy.
+    fields = {}
+    for field in tolerances.quote:
         s = to_float(swift.get(field))
         p = to_float(py.get(field))
-        if s is None and p is None:
-            continue
-        if s is None or p is None:
-            warns += 1
-            issues.append(f"{field}: missing side swift={s} python={p}")
-            continue
-        if not nearly_equal(s, p, rel_tol=tolerance, abs_tol=1e-6):
-            warns += 1
-            issues.append(f"{field}: swift={s:.6g} python={p:.6g}")
-
-    status = "pass"
-    if fails > 0:
-        status = "fail"
-    elif warns > 0:
-        status = "warn"
+        if s is not None or p is not None:
+            fields[field] = [s, p]
+    metrics: Dict[str, Any] = {"fail_diffs": fails, "text_warn_diffs": warns, "fields": fields}
+    status, field_issues = quote_verdict(metrics, tolerances)
+    metrics["warn_diffs"] = warns + len(field_issues)
 
     return CompareResult(
         status=status,
-        summary=f"{fails} fail-level, {warns} warn-level differences",
-        metrics={"fail_diffs": fails, "warn_diffs": warns},
-        issues=issues,
+        summary=f"{fails} fail-level, {metrics['warn_diffs']} warn-level differences",
+        metrics=metrics,
+        issues=issues + field_issues,
     )
 
 
-def compare_history(swift: Any, py: Any) -> CompareResult:
-    swift_rows = ((swift or {}).get("bars") or []) if isinstance(swift, dict) else []
-    py_rows = ((py or {}).get("bars") or []) if isinstance(py, dict) else []
-    swift_rows = [row for row in swift_rows if isinstance(row, dict)]
-    py_rows = [row for row in py_rows if isinstance(row, dict)]
+def compare_history(swift: Any, py: Any, tolerances: Optional[Tolerances] = None) -> CompareResult:
+    # Both sides become date-sorted column arrays; one intersect on the date
+    # key aligns them and everything after is array arithmetic, so thousands
+    # of intraday bars compare in about a millisecond.
+    swift_bars = history_bars(swift)
+    py_bars = history_bars(py)
 
-    if not swift_rows and not py_rows:
+    if not swift_bars.count and not py_bars.count:
         return CompareResult("skip", "No history bars from either side", {"overlap": 0}, [])
-    if not swift_rows or not py_rows:
+    if not swift_bars.count or not py_bars.count:
         return CompareResult(
             "fail",
             "History only returned on one side",
-            {"swift_count": len(swift_rows), "python_count": len(py_rows)},
-            [f"swift_count={len(swift_rows)} python_count={len(py_rows)}"],
+            {"swift_count": swift_bars.count, "python_count": py_bars.count},
+            [f"swift_count={swift_bars.count} python_count={py_bars.count}"],
         )
 
-    swift_map = {str(r.get("date")): r for r in swift_rows if r.get("date")}
-    py_map = {str(r.get("date")): r for r in py_rows if r.get("date")}
-    overlap_dates = sorted(set(swift_map.keys()) & set(py_map.keys()))
-    if not overlap_dates:
-        return CompareResult(
-            "fail",
-            "No overlapping history dates",
-            {"swift_count": len(swift_rows), "python_count": len(py_rows), "overlap": 0},
-            [],
+    _, swift_idx, py_idx = np.intersect1d(swift_bars.dates, py_bars.dates, assume_unique=True, return_indices=True)
+    overlap = int(swift_idx.size)
+    drift = history_drift(swift_bars, py_bars, swift_idx, py_idx)
+    metrics: Dict[str, Any] = {
+        "swift_count": swift_bars.count,
+        "python_count": py_bars.count,
+        "overlap": overlap,
+        "swift_only": int(swift_bars.dates.size - overlap),
+        "python_only": int(py_bars.dates.size - overlap),
+        **drift,
+    }
+    if overlap == 0:
+        return CompareResult("fail", "No overlapping history dates", metrics, [])
+
+    columns = {
+        column: relative_error_stats(swift_bars.values[swift_idx, k], py_bars.values[py_idx, k])
+        for k, column in enumerate(HISTORY_COLUMNS)
+    }
+    metrics["columns"] = columns
+    metrics["avg_close_rel_diff"] = columns["close"]["mean"] or 0.0
+    status, issues = history_verdict(metrics, tolerances or default_tolerances())
+    return CompareResult(
+        status=status,
+        summary=(
+            f"overlap={overlap} avg_close_rel_diff={metrics['avg_close_rel_diff']:.4f} "
+            f"p95_close_rel_diff={columns['close']['p95'] or 0.0:.4f}"
+        ),
+        metrics=metrics,
+        issues=issues,
+    )
+
+
+@dataclass
+class HistoryBars:
+    """One side of a history comparison as date-sorted column arrays.
+
+    ``dates`` are the unique bar date keys, ``seconds`` the matching UTC epoch
+    seconds (NaN when a date does not parse) and ``values`` holds one float64
+    column per entry of ``HISTORY_COLUMNS`` (NaN for missing values).
+    """
+
+    dates: np.ndarray
+    seconds: np.ndarray
+    values: np.ndarray
+    count: int = 0
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]]) -> "HistoryBars":
+        rows = [row for row in rows if isinstance(row, dict)]
+        dated = [row for row in rows if row.get("date")]
+        dates = np.array([str(row["date"]) for row in dated], dtype="str")
+        values = np.column_stack([numeric_column([row.get(column) for row in dated]) for column in HISTORY_COLUMNS])
+        return cls.build(dates, values.reshape(dates.size, len(HISTORY_COLUMNS)), count=len(rows))
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, np.ndarray], *, interval: str) -> "HistoryBars":
+        """Bars from a ``yfcol1`` file, keyed exactly like YFParityCLI's JSON dates."""
+        stamps = columns["timestamp"].view("datetime64[s]")
+        if is_intraday(interval):
+            dates = np.char.add(np.datetime_as_string(stamps, unit="s"), "Z")
+        else:
+            stamps = stamps.astype("datetime64[D]")
+            dates = np.datetime_as_string(stamps, unit="D")
+        volume = columns["volume"].astype("float64")
+        volume[columns["volume"] == np.iinfo(np.int64).min] = np.nan
+        values = np.column_stack([*(columns[name] for name in HISTORY_COLUMNS[:-1]), volume])
+        # Seconds come straight from the timestamps instead of re-parsing the keys.
+        seconds = stamps.astype("datetime64[s]").astype("int64").astype("float64")
+        return cls.build(dates, values.reshape(dates.size, len(HISTORY_COLUMNS)), count=int(dates.size), seconds=seconds)
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, *, interval: str) -> "HistoryBars":
+        """Bars straight from a yfinance history frame, keyed like ``history_rows``."""
+        index = frame.index
+        if is_intraday(interval):
+            index = index.tz_convert("UTC") if index.tz is not None else index.tz_localize("UTC")
+            dates = np.array(index.strftime("%Y-%m-%dT%H:%M:%SZ"), dtype="str")
+        else:
+            dates = np.array(index.strftime("%Y-%m-%d"), dtype="str")
+        sources = ("Open", "High", "Low", "Close", "Adj Close", "Volume")
+        values = np.column_stack(
+            [
+                frame[name].to_numpy(dtype="float64", na_value=np.nan) if name in frame else np.full(len(frame), np.nan)
+                for name in sources
+            ]
         )
+        return cls.build(dates, values.reshape(dates.size, len(HISTORY_COLUMNS)), count=len(frame))
+
+    @classmethod
+    def build(
+        cls,
+        dates: np.ndarray,
+        values: np.ndarray,
+        *,
+        count: int,
+        seconds: Optional[np.ndarray] = None,
+    ) -> "HistoryBars":
+        # Later rows win on duplicate dates, as a dict keyed by date would;
+        # np.unique also sorts, and ISO dates sort chronologically.
+        _, last = np.unique(dates[::-1], return_index=True)
+        keep = dates.size - 1 - last
+        seconds = bar_seconds(dates[keep]) if seconds is None else seconds[keep]
+        return cls(dates=dates[keep], seconds=seconds, values=values[keep], count=count)
+
+
+def history_bars(payload: Any) -> HistoryBars:
+    """HistoryBars for a history payload carrying JSON ``bars`` or ``yfcol1`` ``columns``."""
+    if not isinstance(payload, dict):
+        return HistoryBars.from_rows([])
+    columns = payload.get("columns")
+    if isinstance(columns, dict) and columns.get("path"):
+        return HistoryBars.from_columns(read_bar_columns(Path(columns["path"])), interval=str(payload.get("interval") or "1d"))
+    return HistoryBars.from_rows(payload.get("bars") or [])
+
+
+def read_bar_columns(path: Path) -> Dict[str, np.ndarray]:
+    """Memory-map a ``yfcol1`` file written by ``YFParityCLI --bars-path``.
+
+    Layout: 8-byte magic, little-endian uint64 header length, JSON header
+    ``{"rows", "columns": [{"name", "dtype", "offset"}]}``, then the column
+    data starting at the next 8-byte boundary. The returned arrays are views
+    over the mapping, so nothing is parsed or copied here.
+    """
+    raw = np.memmap(path, dtype=np.uint8, mode="r")
+    if bytes(raw[:8]) != BAR_COLUMNS_MAGIC:
+        raise ValueError(f"Not a yfcol1 bar file: {path}")
+    header_length = int(raw[8:16].view("<u8")[0])
+    header = json.loads(bytes(raw[16 : 16 + header_length]))
+    data_start = (16 + header_length + 7) // 8 * 8
+    rows = int(header["rows"])
+    return {
+        column["name"]: np.frombuffer(raw, dtype=column["dtype"], count=rows, offset=data_start + int(column["offset"]))
+        for column in header["columns"]
+    }
 
-    close_diffs: List[float] = []
-    for date in overlap_dates:
-        s_close = to_float(swift_map[date].get("close"))
-        p_close = to_float(py_map[date].get("close"))
-        if s_close is None or p_close is None:
-            continue
-        denom = max(abs(p_close), 1e-9)
-        close_diffs.append(abs(s_close - p_close) / denom)
 
-    avg_diff = (sum(close_diffs) / len(close_diffs)) if close_diffs else 0.0
-    count_delta = abs(len(swift_rows) - len(py_rows))
+def discard_bar_columns(payload: Any) -> None:
+    columns = payload.get("columns") if isinstance(payload, dict) else None
+    if isinstance(columns, dict) and columns.get("path"):
+        Path(columns["path"]).unlink(missing_ok=True)
 
-    if avg_diff <= 0.03 and count_delta <= 2:
-        status = "pass"
-    elif avg_diff <= 0.10:
-        status = "warn"
-    else:
-        status = "fail"
 
-    issues = []
-    if count_delta > 2:
-        issues.append(f"bar count delta={count_delta}")
-    if avg_diff > 0.03:
-        issues.append(f"avg close rel diff={avg_diff:.4f}")
+def is_intraday(interval: str) -> bool:
+    return ("m" in interval.lower()) or ("h" in interval.lower())
 
-    return CompareResult(
-        status=status,
-        summary=f"overlap={len(overlap_dates)} avg_close_rel_diff={avg_diff:.4f}",
-        metrics={
-            "swift_count": len(swift_rows),
-            "python_count": len(py_rows),
-            "overlap": len(overlap_dates),
-            "avg_close_rel_diff": avg_diff,
-        },
-        issues=issues,
+
+def numeric_column(values: List[Any]) -> np.ndarray:
+    try:
+        return np.array(values, dtype="float64")
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values, dtype="object"), errors="coerce").to_numpy(dtype="float64")
+
+
+def bar_seconds(dates: np.ndarray) -> np.ndarray:
+    """UTC epoch seconds for ``YYYY-MM-DD`` / ``YYYY-MM-DDTHH:MM:SSZ`` bar dates."""
+    try:
+        parsed = np.array([date[:-1] if date.endswith("Z") else date for date in dates], dtype="datetime64[s]")
+    except ValueError:
+        parsed = (
+            pd.to_datetime(pd.Series(dates, dtype="object"), utc=True, errors="coerce")
+            .dt.tz_localize(None)
+            .to_numpy(dtype="datetime64[s]")
+        )
+    seconds = parsed.astype("int64").astype("float64")
+    seconds[np.isnat(parsed)] = np.nan
+    return seconds
+
+
+def relative_errors(swift: np.ndarray, python: np.ndarray) -> np.ndarray:
+    valid = np.isfinite(swift) & np.isfinite(python)
+    return np.abs(swift[valid] - python[valid]) / np.maximum(np.abs(python[valid]), 1e-9)
+
+
+def relative_error_stats(swift: np.ndarray, python: np.ndarray) -> Dict[str, Any]:
+    rel = relative_errors(swift, python)
+    if rel.size == 0:
+        return {"n": 0, "max": None, "mean": None, "p95": None}
+    return {
+        "n": int(rel.size),
+        "max": float(rel.max()),
+        "mean": float(rel.mean()),
+        "p95": float(np.percentile(rel, 95)),
+    }
+
+
+def history_drift(swift: HistoryBars, py: HistoryBars, swift_idx: np.ndarray, py_idx: np.ndarray) -> Dict[str, Any]:
+    """Timestamp drift between the two bar sets.
+
+    ``first_bar_drift_sec``/``last_bar_drift_sec`` compare the range edges
+    (Swift minus Python). ``max_drift_sec``/``median_drift_sec`` measure how far
+    each unmatched bar sits from the nearest bar on the other side, which
+    separates a systematic shift (timezone, session anchor) from missing bars.
+    """
+    drift: Dict[str, Any] = {
+        "first_bar_drift_sec": None,
+        "last_bar_drift_sec": None,
+        "max_drift_sec": None,
+        "median_drift_sec": None,
+    }
+    swift_sec = np.sort(swift.seconds[np.isfinite(swift.seconds)])
+    py_sec = np.sort(py.seconds[np.isfinite(py.seconds)])
+    if swift_sec.size == 0 or py_sec.size == 0:
+        return drift
+    drift["first_bar_drift_sec"] = float(swift_sec[0] - py_sec[0])
+    drift["last_bar_drift_sec"] = float(swift_sec[-1] - py_sec[-1])
+
+    gaps = np.concatenate(
+        [
+            nearest_gaps(np.delete(swift.seconds, swift_idx), py_sec),
+            nearest_gaps(np.delete(py.seconds, py_idx), swift_sec),
+        ]
     )
+    if gaps.size:
+        drift["max_drift_sec"] = float(gaps.max())
+        drift["median_drift_sec"] = float(np.median(gaps))
+    return drift
+
+
+def nearest_gaps(seconds: np.ndarray, other_sorted: np.ndarray) -> np.ndarray:
+    seconds = seconds[np.isfinite(seconds)]
+    if seconds.size == 0:
+        return seconds
+    right = np.searchsorted(other_sorted, seconds).clip(0, other_sorted.size - 1)
+    left = (right - 1).clip(0, other_sorted.size - 1)
+    return np.minimum(np.abs(seconds - other_sorted[left]), np.abs(seconds - other_sorted[right]))
+
+
+class LogHistogram:
+    """Fixed log-spaced histogram for quantile estimates in constant memory.
+
+    Values at or below ``low`` (including exact zeros) share the first bucket;
+    estimates are good to one bucket width (about 6% at 40 buckets per decade).
+    """
+
+    def __init__(self, *, low: float, high: float, per_decade: int = 40) -> None:
+        decades = math.log10(high / low)
+        self.edges = np.logspace(math.log10(low), math.log10(high), int(round(decades * per_decade)) + 1)
+        self.counts = np.zeros(self.edges.size + 1, dtype=np.int64)
 
+    def add(self, values: np.ndarray) -> None:
+        if values.size:
+            buckets = np.searchsorted(self.edges, values, side="right")
+            self.counts += np.bincount(buckets, minlength=self.counts.size)
 
-def compare_earnings(swift: Any, py: Any) -> CompareResult:
+    def quantile(self, q: float) -> Optional[float]:
+        total = int(self.counts.sum())
+        if total == 0:
+            return None
+        bucket = int(np.searchsorted(np.cumsum(self.counts), max(1, math.ceil(q * total))))
+        if bucket == 0:
+            return 0.0
+        if bucket >= self.edges.size:
+            return float(self.edges[-1])
+        return float(math.sqrt(self.edges[bucket - 1] * self.edges[bucket]))
+
+
+class RelativeErrorAccumulator:
+    """Running n/max/mean and a histogram p95 for one history column."""
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = LogHistogram(low=1e-12, high=1e3)
+
+    def add(self, swift: np.ndarray, python: np.ndarray) -> None:
+        rel = relative_errors(swift, python)
+        if rel.size == 0:
+            return
+        self.n += int(rel.size)
+        self.total += float(rel.sum())
+        self.max = max(self.max, float(rel.max()))
+        self.histogram.add(rel)
+
+    def stats(self) -> Dict[str, Any]:
+        if self.n == 0:
+            return {"n": 0, "max": None, "mean": None, "p95": None}
+        p95 = self.histogram.quantile(0.95) or 0.0
+        return {"n": self.n, "max": self.max, "mean": self.total / self.n, "p95": min(p95, self.max)}
+
+
+class HistoryAccumulator:
+    """Streaming counterpart of ``compare_history`` for date-ordered chunks.
+
+    Each chunk is aligned and reduced on arrival; only counters, range edges
+    and fixed-size histograms survive it, so memory does not grow with the
+    number of bars. p95 and median drift are histogram estimates, and
+    unmatched-bar drift is measured against bars of the same chunk.
+    """
+
+    def __init__(self) -> None:
+        self.chunks = 0
+        self.failed_chunks: List[str] = []
+        self.counts = {"swift_count": 0, "python_count": 0, "overlap": 0, "swift_only": 0, "python_only": 0}
+        self.columns = {column: RelativeErrorAccumulator() for column in HISTORY_COLUMNS}
+        self.edges: Dict[str, List[float]] = {"swift": [], "python": []}
+        self.max_drift: Optional[float] = None
+        self.drift = LogHistogram(low=1.0, high=1e10, per_decade=20)
+
+    def add_chunk(self, swift_bars: HistoryBars, py_bars: HistoryBars) -> None:
+        self.chunks += 1
+        _, swift_idx, py_idx = np.intersect1d(swift_bars.dates, py_bars.dates, assume_unique=True, return_indices=True)
+        self.counts["swift_count"] += swift_bars.count
+        self.counts["python_count"] += py_bars.count
+        self.counts["overlap"] += int(swift_idx.size)
+        self.counts["swift_only"] += int(swift_bars.dates.size - swift_idx.size)
+        self.counts["python_only"] += int(py_bars.dates.size - py_idx.size)
+        for k, column in enumerate(HISTORY_COLUMNS):
+            self.columns[column].add(swift_bars.values[swift_idx, k], py_bars.values[py_idx, k])
+
+        swift_sec = np.sort(swift_bars.seconds[np.isfinite(swift_bars.seconds)])
+        py_sec = np.sort(py_bars.seconds[np.isfinite(py_bars.seconds)])
+        for side, seconds in (("swift", swift_sec), ("python", py_sec)):
+            if seconds.size:
+                edges = self.edges[side]
+                self.edges[side] = [min(edges[0], seconds[0]), max(edges[1], seconds[-1])] if edges else [seconds[0], seconds[-1]]
+        if swift_sec.size and py_sec.size:
+            gaps = np.concatenate(
+                [
+                    nearest_gaps(np.delete(swift_bars.seconds, swift_idx), py_sec),
+                    nearest_gaps(np.delete(py_bars.seconds, py_idx), swift_sec),
+                ]
+            )
+            if gaps.size:
+                self.max_drift = max(self.max_drift or 0.0, float(gaps.max()))
+                self.drift.add(gaps)
+
+    def add_failure(self, label: str) -> None:
+        self.chunks += 1
+        self.failed_chunks.append(label)
+
+    def result(self, tolerances: Optional[Tolerances] = None) -> CompareResult:
+        swift_count = self.counts["swift_count"]
+        python_count = self.counts["python_count"]
+        metrics: Dict[str, Any] = {
+            "window": "max",
+            "chunks": self.chunks,
+            "failed_chunks": len(self.failed_chunks),
+            **self.counts,
+            "first_bar_drift_sec": None,
+            "last_bar_drift_sec": None,
+            "max_drift_sec": self.max_drift,
+            "median_drift_sec": self.drift.quantile(0.5),
+        }
+        if self.edges["swift"] and self.edges["python"]:
+            metrics["first_bar_drift_sec"] = float(self.edges["swift"][0] - self.edges["python"][0])
+            metrics["last_bar_drift_sec"] = float(self.edges["swift"][1] - self.edges["python"][1])
+        chunk_issues = [f"chunk failed: {label}" for label in self.failed_chunks[:10]]
+
+        if self.failed_chunks and len(self.failed_chunks) == self.chunks:
+            return CompareResult("fail", f"All {self.chunks} history chunks failed", metrics, chunk_issues)
+        if swift_count == 0 and python_count == 0:
+            return CompareResult("skip", "No history bars from either side", metrics, chunk_issues)
+        if swift_count == 0 or python_count == 0:
+            return CompareResult(
+                "fail",
+                "History only returned on one side",
+                metrics,
+                [f"swift_count={swift_count} python_count={python_count}", *chunk_issues],
+            )
+        if self.counts["overlap"] == 0:
+            return CompareResult("fail", "No overlapping history dates", metrics, chunk_issues)
+
+        columns = {column: accumulator.stats() for column, accumulator in self.columns.items()}
+        metrics["columns"] = columns
+        metrics["avg_close_rel_diff"] = columns["close"]["mean"] or 0.0
+        status, issues = history_verdict(metrics, tolerances or default_tolerances())
+        return CompareResult(
+            status=status,
+            summary=(
+                f"window=max chunks={self.chunks} overlap={self.counts['overlap']} "
+                f"avg_close_rel_diff={metrics['avg_close_rel_diff']:.4f} "
+                f"p95_close_rel_diff~{columns['close']['p95'] or 0.0:.4f}"
+            ),
+            metrics=metrics,
+            issues=[*issues, *chunk_issues],
+        )
+
+
+def compare_earnings(swift: Any, py: Any, tolerances: Optional[Tolerances] = None) -> CompareResult:
     swift_rows = ((swift or {}).get("rows") or []) if isinstance(swift, dict) else []
     py_rows = ((py or {}).get("rows") or []) if isinstance(py, dict) else []
     swift_rows = [row for row in swift_rows if isinstance(row, dict)]
@@ -636,28 +1993,17 @@ def compare_earnings(swift: Any, py: Any) -> CompareResult:
             diffs.append(abs(s - p) / denom)
 
     avg_diff = (sum(diffs) / len(diffs)) if diffs else 0.0
-    if len(overlap) >= 2 and avg_diff <= 0.10:
-        status = "pass"
-    elif avg_diff <= 0.25:
-        status = "warn"
-    else:
-        status = "fail"
-
-    issues: List[str] = []
-    if len(overlap) < 2:
-        issues.append("low overlap (<2 dates)")
-    if avg_diff > 0.10:
-        issues.append(f"avg EPS rel diff={avg_diff:.4f}")
-
+    metrics = {"swift_count": len(swift_rows), "python_count": len(py_rows), "overlap": len(overlap), "avg_eps_rel_diff": avg_diff}
+    status, issues = earnings_verdict(metrics, tolerances or default_tolerances())
     return CompareResult(
         status=status,
         summary=f"overlap={len(overlap)} avg_eps_rel_diff={avg_diff:.4f}",
-        metrics={"swift_count": len(swift_rows), "python_count": len(py_rows), "overlap": len(overlap), "avg_eps_rel_diff": avg_diff},
+        metrics=metrics,
         issues=issues,
     )
 
 
-def compare_income(swift: Any, py: Any) -> CompareResult:
+def compare_income(swift: Any, py: Any, tolerances: Optional[Tolerances] = None) -> CompareResult:
     swift_rows = ((swift or {}).get("rows") or []) if isinstance(swift, dict) else []
     py_rows = ((py or {}).get("rows") or []) if isinstance(py, dict) else []
     swift_rows = [row for row in swift_rows if isinstance(row, dict)]
@@ -690,23 +2036,12 @@ def compare_income(swift: Any, py: Any) -> CompareResult:
             diffs.append(abs(s - p) / denom)
 
     avg_diff = (sum(diffs) / len(diffs)) if diffs else 0.0
-    if len(overlap) >= 2 and avg_diff <= 0.15:
-        status = "pass"
-    elif avg_diff <= 0.35:
-        status = "warn"
-    else:
-        status = "fail"
-
-    issues: List[str] = []
-    if len(overlap) < 2:
-        issues.append("low overlap (<2 years)")
-    if avg_diff > 0.15:
-        issues.append(f"avg statement rel diff={avg_diff:.4f}")
-
+    metrics = {"swift_count": len(swift_rows), "python_count": len(py_rows), "overlap": len(overlap), "avg_stmt_rel_diff": avg_diff}
+    status, issues = income_verdict(metrics, tolerances or default_tolerances())
     return CompareResult(
         status=status,
         summary=f"overlap={len(overlap)} avg_stmt_rel_diff={avg_diff:.4f}",
-        metrics={"swift_count": len(swift_rows), "python_count": len(py_rows), "overlap": len(overlap), "avg_stmt_rel_diff": avg_diff},
+        metrics=metrics,
         issues=issues,
     )
 
@@ -719,7 +2054,7 @@ def render_markdown(report: Dict[str, Any]) -> str:
     cfg = report.get("config", {})
     lines.append(
         f"- Config: period=`{cfg.get('period')}` interval=`{cfg.get('interval')}` "
-        f"history_limit={cfg.get('history_limit')} earnings_limit={cfg.get('earnings_limit')} "
+        f"history_limit={cfg.get('history_limit')} history_window=`{cfg.get('history_window', 'limit')}` earnings_limit={cfg.get('earnings_limit')} "
         f"income_limit={cfg.get('income_limit')} income_freq=`{cfg.get('income_freq')}`"
     )
     summary = report.get("summary", {})
@@ -727,6 +2062,8 @@ def render_markdown(report: Dict[str, Any]) -> str:
         f"- Summary: pass={summary.get('pass', 0)} warn={summary.get('warn', 0)} "
         f"fail={summary.get('fail', 0)} skip={summary.get('skip', 0)} score={summary.get('score', 0):.1f}"
     )
+    if report.get("diagnostics"):
+        lines.append(f"- Swift requests: {describe_diagnostics(report['diagnostics'])}")
     lines.append("")
     lines.append("## Symbol Status")
     lines.append("")
@@ -745,11 +2082,17 @@ def render_markdown(report: Dict[str, Any]) -> str:
             )
         )
 
+    lines.extend(render_timings(report.get("symbols", [])))
+
     lines.append("")
     lines.append("## Details")
     lines.append("")
     for symbol_report in report.get("symbols", []):
         lines.append(f"### {symbol_report.get('symbol', '')} (`{symbol_report.get('status', '')}`)")
+        if symbol_report.get("asset_class"):
+            lines.append(f"- Tolerance class: `{symbol_report['asset_class']}`")
+        if symbol_report.get("swift_diagnostics"):
+            lines.append(f"- Swift requests: {describe_diagnostics(symbol_report['swift_diagnostics'])}")
         swift_errors = symbol_report.get("swift_errors") or []
         if swift_errors:
             lines.append("- Swift errors:")
@@ -766,6 +2109,50 @@ def render_markdown(report: Dict[str, Any]) -> str:
     return "\n".join(lines).rstrip() + "\n"
 
 
+def render_timings(symbol_reports: List[Dict[str, Any]], *, limit: int = 10) -> List[str]:
+    """Markdown for the slowest symbols and phases, from each report's ``timings_ms``."""
+    timed = [report for report in symbol_reports if report.get("timings_ms")]
+    if not timed:
+        return []
+
+    phase_totals: Dict[str, float] = collections.defaultdict(float)
+    operations: List[Tuple[float, str, str]] = []
+    for report in timed:
+        for phase, value in report["timings_ms"].items():
+            if phase == "total":
+                continue
+            phase_totals[phase] += value
+            operations.append((value, report.get("symbol", ""), phase))
+
+    lines = ["", "## Slowest Symbols / Operations", ""]
+    lines.append("Phase times are summed over symbols; with `--jobs` > 1 they overlap, so they can exceed wall time.")
+    lines.append("")
+    lines.append("| Phase | Total ms | Share |")
+    lines.append("|---|---:|---:|")
+    grand_total = sum(phase_totals.values()) or 1.0
+    for phase, value in sorted(phase_totals.items(), key=lambda item: (-item[1], item[0]))[:limit]:
+        lines.append(f"| `{phase}` | {value:.1f} | {100.0 * value / grand_total:.0f}% |")
+
+    lines.append("")
+    lines.append("| Symbol | Total ms | Slowest phase |")
+    lines.append("|---|---:|---|")
+    slowest_symbols = sorted(timed, key=lambda report: -report["timings_ms"].get("total", 0.0))[:limit]
+    for report in slowest_symbols:
+        phases = {name: value for name, value in report["timings_ms"].items() if name != "total"}
+        worst = max(phases.items(), key=lambda item: item[1]) if phases else ("", 0.0)
+        lines.append(
+            f"| {report.get('symbol', '')} | {report['timings_ms'].get('total', 0.0):.1f} | "
+            f"`{worst[0]}` {worst[1]:.1f} ms |"
+        )
+
+    lines.append("")
+    lines.append("| Symbol | Operation | ms |")
+    lines.append("|---|---|---:|")
+    for value, symbol, phase in sorted(operations, key=lambda item: (-item[0], item[1], item[2]))[:limit]:
+        lines.append(f"| {symbol} | `{phase}` | {value:.1f} |")
+    return lines
+
+
 def to_float(value: Any) -> Optional[float]:
     if value is None:
         return None
@@ -803,12 +2190,6 @@ def normalize_text(value: Any) -> str:
     return str(value).strip().lower()
 
 
-def nearly_equal(a: float, b: float, rel_tol: float, abs_tol: float = 1e-9) -> bool:
-    if math.isclose(a, b, rel_tol=rel_tol, abs_tol=abs_tol):
-        return True
-    return False
-
-
 def normalize_index_date(value: Any, include_time: bool) -> Optional[str]:
     if value is None:
         return None
@@ -884,13 +2265,5 @@ def find_index_key(index_map: Dict[str, Any], candidates: Iterable[str]) -> Any:
     return None
 
 
-def worst_status(statuses: Iterable[str]) -> str:
-    worst = "pass"
-    for status in statuses:
-        if STATUS_ORDER.get(status, 99) > STATUS_ORDER.get(worst, 0):
-            worst = status
-    return worst
-
-
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""SQLite ledger of parity results across YFinanceKit commits.
+
+``parity_harness.py`` and ``parity_matrix.py`` overwrite their reports on every
+run. ``ingest`` copies a harness report or a matrix aggregate (with all its
+scenario reports) into one SQLite file, keyed by YFinanceKit commit, yfinance
+version and scenario, so results can be compared over time:
+
+- ``runs``: one row per ingested report, with provenance and summary counts
+- ``results``: one row per (run, symbol, operation) with its status; the
+  symbol's overall status is stored as operation ``symbol``
+- ``metrics``: every numeric comparison metric, flattened to dotted names
+  (``avg_close_rel_diff``, ``columns.close.p95``, ``fields.marketCap.swift``)
+
+``(symbol, operation, status)`` and ``(name, symbol, operation)`` are indexed,
+so the query commands answer from the index instead of rescanning reports:
+
+    parity_ledger.py first --symbol VOD.L --operation history --status warn
+    parity_ledger.py transitions --symbol VOD.L --operation history
+    parity_ledger.py trend --metric avg_close_rel_diff --asset-class subunit
+    parity_ledger.py sql "SELECT ..."
+
+Runs are ordered by ``generated_at``. Re-ingesting an identical report is a
+no-op. Reports written before the harness recorded ``package_commit`` and
+``yfinance`` need ``--commit`` / ``--yfinance`` on ingest.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import hashlib
+import json
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from parity_rescore import load_scenario_report
+
+LEDGER_SCHEMA_VERSION = 1
+DEFAULT_LEDGER = ".build/parity-ledger.sqlite3"
+SYMBOL_OPERATION = "symbol"
+QUOTE_FIELD_SIDES = ("swift", "python")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    report_sha256 TEXT NOT NULL UNIQUE,
+    source TEXT NOT NULL,
+    generated_at TEXT NOT NULL,
+    ingested_at TEXT NOT NULL,
+    package_commit TEXT,
+    package_dirty INTEGER,
+    yfinance TEXT,
+    scenario TEXT NOT NULL,
+    period TEXT,
+    interval TEXT,
+    history_window TEXT,
+    data_source TEXT,
+    tolerances_digest TEXT,
+    total INTEGER,
+    pass INTEGER,
+    warn INTEGER,
+    fail INTEGER,
+    skip INTEGER,
+    score REAL
+);
+CREATE INDEX IF NOT EXISTS runs_commit ON runs (package_commit, yfinance, scenario);
+CREATE INDEX IF NOT EXISTS runs_generated_at ON runs (generated_at);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    symbol TEXT NOT NULL,
+    operation TEXT NOT NULL,
+    status TEXT NOT NULL,
+    asset_class TEXT,
+    summary TEXT,
+    PRIMARY KEY (run_id, symbol, operation)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_symbol_operation_status ON results (symbol, operation, status);
+CREATE INDEX IF NOT EXISTS results_asset_class ON results (asset_class, operation);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    symbol TEXT NOT NULL,
+    operation TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (run_id, symbol, operation, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS metrics_name_symbol ON metrics (name, symbol, operation);
+"""
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Record parity reports in a SQLite ledger and query them over time.")
+    parser.add_argument("--db", default=DEFAULT_LEDGER, help=f"Ledger file (default: {DEFAULT_LEDGER}).")
+    parser.add_argument("--json", action="store_true", help="Print query results as JSON rows instead of a table.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="Add harness reports or matrix aggregates to the ledger.")
+    ingest.add_argument("paths", nargs="+", help="parity_harness.py report JSON or parity_matrix.py aggregate.json")
+    ingest.add_argument("--commit", default=None, help="YFinanceKit commit for reports that do not record one.")
+    ingest.add_argument("--yfinance", default=None, help="yfinance version for reports that do not record one.")
+    ingest.add_argument(
+        "--scenario",
+        default=None,
+        help="Scenario name for a harness report (default: adhoc); aggregates use their scenario names.",
+    )
+
+    first = commands.add_parser("first", help="Earliest run in which a symbol/operation had a status.")
+    add_selection_args(first)
+    first.add_argument("--status", required=True, choices=["pass", "warn", "fail", "skip"])
+
+    transitions = commands.add_parser("transitions", help="Every status change of a symbol/operation over time.")
+    add_selection_args(transitions)
+
+    trend = commands.add_parser("trend", help="A metric per run: mean, min and max over the selected symbols.")
+    trend.add_argument("--metric", required=True, help="Flattened metric name, e.g. avg_close_rel_diff.")
+    trend.add_argument("--symbol", default=None)
+    trend.add_argument("--operation", default=None, help="Comparison, e.g. history (default: any).")
+    trend.add_argument("--asset-class", default=None, help="Tolerance class, e.g. subunit (see parity_tolerances.json).")
+    trend.add_argument("--scenario", default=None, help="Scenario name or glob, e.g. '*subunit*'.")
+
+    sql = commands.add_parser("sql", help="Run a read-only SQL query against the ledger.")
+    sql.add_argument("query")
+    return parser.parse_args()
+
+
+def add_selection_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--symbol", required=True)
+    parser.add_argument(
+        "--operation",
+        default=SYMBOL_OPERATION,
+        help=f"Comparison, e.g. history or quote (default: {SYMBOL_OPERATION}, the overall symbol status).",
+    )
+    parser.add_argument("--scenario", default=None, help="Scenario name or glob (default: any).")
+
+
+def main() -> int:
+    args = parse_args()
+    db = Path(args.db)
+    if args.command != "ingest" and not db.exists():
+        print(f"No parity ledger at {db}; run `ingest` first.", file=sys.stderr)
+        return 2
+    try:
+        conn = open_ledger(db)
+    except LedgerError as exc:
+        print(str(exc), file=sys.stderr)
+        return 2
+    with conn:
+        if args.command == "ingest":
+            return ingest_paths(conn, args)
+        if args.command == "sql":
+            conn.execute("PRAGMA query_only = ON")
+            try:
+                cursor = conn.execute(args.query)
+            except sqlite3.Error as exc:
+                print(f"SQL error: {exc}", file=sys.stderr)
+                return 2
+        elif args.command == "first":
+            cursor = query_first(conn, args.symbol, args.operation, args.status, scenario=args.scenario)
+        elif args.command == "transitions":
+            cursor = query_transitions(conn, args.symbol, args.operation, scenario=args.scenario)
+        else:
+            cursor = query_trend(
+                conn,
+                args.metric,
+                symbol=args.symbol,
+                operation=args.operation,
+                asset_class=args.asset_class,
+                scenario=args.scenario,
+            )
+        rows = print_rows(cursor, as_json=args.json)
+    return 0 if rows else 1
+
+
+class LedgerError(RuntimeError):
+    pass
+
+
+def open_ledger(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.executescript(SCHEMA)
+    row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+    if row is None:
+        with conn:
+            conn.execute("INSERT INTO meta (key, value) VALUES ('schema_version', ?)", (str(LEDGER_SCHEMA_VERSION),))
+    elif row[0] != str(LEDGER_SCHEMA_VERSION):
+        conn.close()
+        raise LedgerError(f"{path}: unsupported ledger schema_version {row[0]}")
+    return conn
+
+
+def ingest_paths(conn: sqlite3.Connection, args: argparse.Namespace) -> int:
+    added = skipped = 0
+    for path in (Path(raw) for raw in args.paths):
+        try:
+            document = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            print(f"Cannot read {path}: {exc}", file=sys.stderr)
+            return 2
+        for source, scenario, report, provenance in iter_reports(path, document):
+            provenance = {
+                "package_commit": provenance.get("package_commit") or args.commit,
+                "package_dirty": provenance.get("package_dirty"),
+                "yfinance": provenance.get("yfinance") or args.yfinance,
+            }
+            if not provenance["package_commit"]:
+                print(f"warning: {source} records no package commit; pass --commit", file=sys.stderr)
+            run_id = ingest_report(conn, report, source=source, scenario=scenario or args.scenario or "adhoc", **provenance)
+            if run_id is None:
+                skipped += 1
+            else:
+                added += 1
+    print(f"Ingested {added} report(s), {skipped} already present: {Path(args.db)}")
+    return 0
+
+
+def iter_reports(path: Path, document: Dict[str, Any]) -> Iterator[Tuple[str, Optional[str], Dict[str, Any], Dict[str, Any]]]:
+    """Yield ``(source, scenario, report, provenance)`` for a report or every report of an aggregate."""
+    if "scenarios" not in document:
+        yield str(path), None, document, document.get("config") or {}
+        return
+    package = Path(document.get("package_path") or path.parent)
+    for entry in document.get("scenarios") or []:
+        if not entry or not entry.get("json"):
+            continue
+        report = load_scenario_report(entry["json"], package=package, aggregate_dir=path.parent)
+        if report is None:
+            print(f"warning: scenario report {entry['json']} not found; skipped", file=sys.stderr)
+            continue
+        # The aggregate knows the commit even when an older scenario report does not.
+        provenance = {**document, **{key: value for key, value in (report.get("config") or {}).items() if value}}
+        yield f"{path}#{entry.get('name')}", entry.get("name"), report, provenance
+
+
+def ingest_report(
+    conn: sqlite3.Connection,
+    report: Dict[str, Any],
+    *,
+    source: str,
+    scenario: str,
+    package_commit: Optional[str],
+    package_dirty: Optional[bool],
+    yfinance: Optional[str],
+) -> Optional[int]:
+    """Insert one report; ``None`` when the identical report is already in the ledger."""
+    digest = hashlib.sha256(json.dumps(report, sort_keys=True).encode("utf-8")).hexdigest()
+    config = report.get("config") or {}
+    summary = report.get("summary") or {}
+    cursor = conn.execute(
+        """
+        INSERT OR IGNORE INTO runs (
+            report_sha256, source, generated_at, ingested_at, package_commit, package_dirty, yfinance,
+            scenario, period, interval, history_window, data_source, tolerances_digest,
+            total, pass, warn, fail, skip, score
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            digest,
+            source,
+            report.get("generated_at") or "",
+            dt.datetime.now(dt.timezone.utc).isoformat(),
+            package_commit,
+            None if package_dirty is None else int(bool(package_dirty)),
+            yfinance,
+            scenario,
+            config.get("period"),
+            config.get("interval"),
+            config.get("history_window"),
+            config.get("data_source"),
+            (config.get("tolerances") or {}).get("digest"),
+            summary.get("total"),
+            summary.get("pass"),
+            summary.get("warn"),
+            summary.get("fail"),
+            summary.get("skip"),
+            summary.get("score"),
+        ),
+    )
+    if cursor.rowcount == 0:
+        return None
+    run_id = cursor.lastrowid
+
+    results: List[Tuple[Any, ...]] = []
+    metrics: List[Tuple[Any, ...]] = []
+    for symbol_report in report.get("symbols") or []:
+        symbol = symbol_report.get("symbol")
+        asset_class = symbol_report.get("asset_class")
+        results.append((run_id, symbol, SYMBOL_OPERATION, symbol_report.get("status"), asset_class, None))
+        for operation, comparison in (symbol_report.get("comparisons") or {}).items():
+            results.append((run_id, symbol, operation, comparison.get("status"), asset_class, comparison.get("summary")))
+            metrics.extend(
+                (run_id, symbol, operation, name, value) for name, value in flatten_metrics(comparison.get("metrics") or {})
+            )
+    conn.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)", results)
+    conn.executemany("INSERT OR REPLACE INTO metrics VALUES (?, ?, ?, ?, ?)", metrics)
+    return run_id
+
+
+def flatten_metrics(metrics: Dict[str, Any], prefix: str = "") -> Iterator[Tuple[str, float]]:
+    """Numeric leaves of a metrics tree as dotted names; quote ``fields`` pairs become ``.swift``/``.python``."""
+    for key, value in metrics.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from flatten_metrics(value, f"{name}.")
+        elif isinstance(value, list) and prefix == "fields." and len(value) == len(QUOTE_FIELD_SIDES):
+            yield from flatten_metrics(dict(zip(QUOTE_FIELD_SIDES, value)), f"{name}.")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, float(value)
+
+
+def scenario_clause(scenario: Optional[str], column: str = "runs.scenario") -> Tuple[str, List[Any]]:
+    if not scenario:
+        return "", []
+    return f" AND {column} GLOB ?", [scenario]
+
+
+def query_first(
+    conn: sqlite3.Connection, symbol: str, operation: str, status: str, *, scenario: Optional[str] = None
+) -> sqlite3.Cursor:
+    clause, params = scenario_clause(scenario)
+    return conn.execute(
+        f"""
+        SELECT runs.package_commit, runs.yfinance, runs.scenario, runs.generated_at, results.status, results.summary
+        FROM results JOIN runs ON runs.id = results.run_id
+        WHERE results.symbol = ? AND results.operation = ? AND results.status = ?{clause}
+        ORDER BY runs.generated_at, runs.id
+        LIMIT 1
+        """,
+        [symbol, operation, status, *params],
+    )
+
+
+def query_transitions(
+    conn: sqlite3.Connection, symbol: str, operation: str, *, scenario: Optional[str] = None
+) -> sqlite3.Cursor:
+    clause, params = scenario_clause(scenario)
+    return conn.execute(
+        f"""
+        SELECT package_commit, yfinance, scenario, generated_at, previous AS "from", status AS "to", summary
+        FROM (
+            SELECT runs.package_commit, runs.yfinance, runs.scenario, runs.generated_at, results.status,
+                   results.summary,
+                   LAG(results.status) OVER (PARTITION BY runs.scenario ORDER BY runs.generated_at, runs.id) AS previous
+            FROM results JOIN runs ON runs.id = results.run_id
+            WHERE results.symbol = ? AND results.operation = ?{clause}
+        )
+        WHERE previous IS NULL OR previous != status
+        ORDER BY generated_at
+        """,
+        [symbol, operation, *params],
+    )
+
+
+def query_trend(
+    conn: sqlite3.Connection,
+    metric: str,
+    *,
+    symbol: Optional[str] = None,
+    operation: Optional[str] = None,
+    asset_class: Optional[str] = None,
+    scenario: Optional[str] = None,
+) -> sqlite3.Cursor:
+    filters = ["metrics.name = ?"]
+    params: List[Any] = [metric]
+    for column, value in (("metrics.symbol", symbol), ("metrics.operation", operation), ("results.asset_class", asset_class)):
+        if value:
+            filters.append(f"{column} = ?")
+            params.append(value)
+    clause, scenario_params = scenario_clause(scenario)
+    return conn.execute(
+        f"""
+        SELECT runs.package_commit, runs.yfinance, MIN(runs.generated_at) AS generated_at,
+               COUNT(*) AS samples, AVG(metrics.value) AS mean, MIN(metrics.value) AS min, MAX(metrics.value) AS max
+        FROM metrics
+        JOIN runs ON runs.id = metrics.run_id
+        JOIN results ON results.run_id = metrics.run_id AND results.symbol = metrics.symbol
+                    AND results.operation = metrics.operation
+        WHERE {" AND ".join(filters)}{clause}
+        GROUP BY runs.package_commit, runs.yfinance
+        ORDER BY MIN(runs.generated_at)
+        """,
+        [*params, *scenario_params],
+    )
+
+
+def print_rows(cursor: sqlite3.Cursor, *, as_json: bool = False) -> int:
+    columns = [column[0] for column in cursor.description or []]
+    rows = cursor.fetchall()
+    if as_json:
+        print(json.dumps([dict(zip(columns, row)) for row in rows], indent=2))
+        return len(rows)
+    if not rows:
+        print("(no rows)")
+        return 0
+    cells = [columns] + [[format_cell(value) for value in row] for row in rows]
+    widths = [max(len(row[index]) for row in cells) for index in range(len(columns))]
+    for index, row in enumerate(cells):
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip())
+        if index == 0:
+            print("  ".join("-" * width for width in widths))
+    return len(rows)
+
+
+def format_cell(value: Any) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.6g}"
+    return str(value)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,17 +4,26 @@
 This script deliberately orchestrates the canonical ``parity_harness.py`` rather
 than reimplementing comparison logic. It is intended for manual/local validation
 before advancing a YFinanceKit release or the nommminal package pin.
+
+Scenarios run concurrently in-process and share one ``RequestBudget``, the
+harness mirror of ``YFRequestBudgetGate``: every Swift/Python snapshot fetch of
+every scenario competes for the same concurrency and pacing limits, granted by
+each scenario's interactive/normal/background priority.
 """
 
 from __future__ import annotations
 
 import argparse
+import dataclasses
 import datetime as dt
+import hashlib
+import importlib.util
 import json
-import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
+from types import ModuleType
 from typing import Iterable
 
 
@@ -24,7 +33,10 @@ class Scenario:
     symbols: tuple[str, ...]
     period: str
     interval: str
+    priority: str = "normal"
+
 
+SYMBOL_STATUSES = ("pass", "warn", "fail", "skip")
 
 SCENARIOS: tuple[Scenario, ...] = (
     Scenario(
@@ -32,6 +44,7 @@ SCENARIOS: tuple[Scenario, ...] = (
         ("AAPL", "MSFT", "NVDA", "TSLA", "BRK-B"),
         "1mo",
         "1d",
+        "interactive",
     ),
     Scenario(
         "us-etfs-funds",
@@ -44,12 +57,14 @@ SCENARIOS: tuple[Scenario, ...] = (
         ("AAPL", "MSFT", "NVDA", "SPY"),
         "5d",
         "1h",
+        "background",
     ),
     Scenario(
         "uk-subunit",
         ("VOD.L", "BP.L", "HSBA.L", "SHEL.L"),
         "3mo",
         "1d",
+        "background",
     ),
     Scenario(
         "europe",
@@ -68,12 +83,14 @@ SCENARIOS: tuple[Scenario, ...] = (
         ("NPN.JO", "SOL.JO", "TEVA.TA"),
         "3mo",
         "1d",
+        "background",
     ),
     Scenario(
         "crypto-fx",
         ("BTC-USD", "ETH-USD", "EURUSD=X", "JPY=X"),
         "1mo",
         "1d",
+        "interactive",
     ),
     Scenario(
         "indices",
@@ -103,6 +120,84 @@ def parse_args() -> argparse.Namespace:
         help="Directory for scenario reports and aggregate JSON",
     )
     parser.add_argument("--timeout-sec", type=int, default=180)
+    parser.add_argument(
+        "--parallel-scenarios",
+        type=int,
+        default=3,
+        help="Scenarios running at once (default: 3). All share one request budget.",
+    )
+    parser.add_argument("--jobs", type=int, default=2, help="Symbols in parallel per scenario (default: 2).")
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=4,
+        help="Global cap on concurrent snapshot fetches across all scenarios (default: 4).",
+    )
+    parser.add_argument(
+        "--max-background",
+        type=int,
+        default=1,
+        help="Cap on concurrent fetches from background-priority scenarios (default: 1).",
+    )
+    parser.add_argument(
+        "--max-fetch-rate",
+        type=float,
+        default=2.0,
+        help="Global snapshot fetch starts per second; 0 disables pacing (default: 2).",
+    )
+    parser.add_argument(
+        "--python-cache",
+        default="off",
+        choices=["off", "reuse", "refresh", "only"],
+        help="Python yfinance snapshot cache mode, as in parity_harness.py (default: off).",
+    )
+    parser.add_argument("--python-cache-dir", default=".build/parity-cache/python")
+    parser.add_argument("--python-cache-ttl-hours", type=float, default=24.0)
+    parser.add_argument(
+        "--standin-fixtures",
+        default=None,
+        help="Run every scenario offline against this fixture archive (see parity_standin.py).",
+    )
+    parser.add_argument(
+        "--record-fixtures",
+        default=None,
+        help="Record all scenarios' Yahoo traffic into this fixture archive (see parity_recorder.py).",
+    )
+    parser.add_argument("--fixture-codec", default="gzip", choices=["gzip", "zstd"])
+    parser.add_argument(
+        "--history-window",
+        default="limit",
+        choices=["limit", "max"],
+        help="History comparison per scenario, as in parity_harness.py (default: limit).",
+    )
+    parser.add_argument(
+        "--swift-config",
+        default="release",
+        choices=["debug", "release"],
+        help="SwiftPM configuration YFParityCLI is built in once for all scenarios (default: release).",
+    )
+    parser.add_argument(
+        "--tolerances",
+        default=None,
+        help="Tolerance policy file shared by all scenarios (default: tools/parity_tolerances.json).",
+    )
+    parser.add_argument(
+        "--rerun-from",
+        default=None,
+        help="Previous aggregate.json: rerun only its (scenario, symbol) pairs with a --statuses status "
+        "and merge the fresh results into a complete aggregate.",
+    )
+    parser.add_argument(
+        "--statuses",
+        default="fail,warn",
+        help="Comma-separated symbol statuses --rerun-from reruns (default: fail,warn).",
+    )
+    parser.add_argument(
+        "--shard",
+        default=None,
+        help="Run only shard I of N, e.g. 2/4. (scenario, symbol) pairs are split by a stable hash, "
+        "so every runner agrees; combine the outputs with parity_merge.py.",
+    )
     return parser.parse_args()
 
 
@@ -117,74 +212,410 @@ def selected_scenarios(names: Iterable[str]) -> list[Scenario]:
     return [known[name] for name in sorted(wanted)]
 
 
+def parse_shard(raw: str) -> tuple[int, int]:
+    index, _, count = raw.partition("/")
+    try:
+        shard = (int(index), int(count))
+    except ValueError:
+        shard = (0, 0)
+    if not 1 <= shard[0] <= shard[1]:
+        raise SystemExit(f"--shard takes I/N with 1 <= I <= N; got {raw!r}")
+    return shard
+
+
+def shard_of(scenario: str, symbol: str, count: int) -> int:
+    """Zero-based shard of a (scenario, symbol) pair; stable across hosts and Python versions."""
+    digest = hashlib.sha256(f"{scenario}\0{symbol}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count
+
+
+def shard_scenarios(scenarios: list[Scenario], index: int, count: int) -> list[Scenario]:
+    """The scenarios of shard `index` (1-based), cut down to its symbols; empty ones are dropped."""
+    sharded = []
+    for scenario in scenarios:
+        symbols = tuple(symbol for symbol in scenario.symbols if shard_of(scenario.name, symbol, count) == index - 1)
+        if symbols:
+            sharded.append(dataclasses.replace(scenario, symbols=symbols))
+    return sharded
+
+
+@dataclass
+class PreviousScenario:
+    """One scenario of a previous aggregate, with its report if it still exists."""
+
+    entry: dict[str, object]
+    report: dict[str, object] | None
+
+    def scenario(self) -> Scenario:
+        # The aggregate records what actually ran, so a rerun does not depend
+        # on SCENARIOS still defining the scenario the same way.
+        return Scenario(
+            str(self.entry["name"]),
+            tuple(self.entry.get("symbols") or ()),
+            str(self.entry.get("period")),
+            str(self.entry.get("interval")),
+            str(self.entry.get("priority") or "normal"),
+        )
+
+    def affected(self, statuses: set[str]) -> tuple[str, ...]:
+        """Symbols to rerun: those with a selected status, or all if the scenario crashed."""
+        symbols = tuple(self.entry.get("symbols") or ())
+        if self.report is None or self.entry.get("summary") is None:
+            return symbols
+        previous = {item.get("symbol"): item.get("status") for item in self.report.get("symbols") or []}
+        return tuple(symbol for symbol in symbols if previous.get(symbol, "fail") in statuses)
+
+
+def load_previous_run(
+    path: Path, harness: ModuleType
+) -> tuple[list[PreviousScenario], dict[str, object] | None]:
+    """The scenarios of a previous aggregate, and its ``shard`` block if it was one shard of a plan."""
+    try:
+        aggregate = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise SystemExit(f"Cannot read previous aggregate {path}: {exc}")
+    package = Path(aggregate.get("package_path") or path.parent)
+    report_path = harness.load_tool_module("parity_rescore").scenario_report_path
+    previous = []
+    for entry in aggregate.get("scenarios") or []:
+        if not entry:
+            continue
+        found = report_path(entry.get("json") or "", package=package, aggregate_dir=path.parent)
+        report = json.loads(found.read_text(encoding="utf-8")) if found is not None else None
+        previous.append(PreviousScenario(entry, report))
+    return previous, aggregate.get("shard") or None
+
+
+def merge_rerun(previous: dict[str, object], fresh: dict[str, object], harness: ModuleType) -> dict[str, object]:
+    """Replace the rerun symbols of a previous report, keeping its symbol order."""
+    rerun = {item["symbol"]: item for item in fresh["symbols"]}
+    symbols = [rerun.pop(item.get("symbol"), item) for item in previous.get("symbols") or []]
+    symbols.extend(rerun.values())
+    return {
+        **fresh,
+        "config": {
+            **fresh["config"],
+            "symbols": [item["symbol"] for item in symbols],
+            "rerun": {"symbols": fresh["config"]["symbols"], "previous_generated_at": previous.get("generated_at")},
+        },
+        "summary": harness.summarize_statuses(item["status"] for item in symbols),
+        "diagnostics": harness.aggregate_diagnostics(item.get("swift_diagnostics") for item in symbols),
+        "symbols": symbols,
+    }
+
+
+def load_harness(harness: Path) -> ModuleType:
+    spec = importlib.util.spec_from_file_location("parity_harness", harness)
+    if spec is None or spec.loader is None:
+        raise SystemExit(f"Cannot load parity harness: {harness}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    try:
+        spec.loader.exec_module(module)
+    except ImportError as exc:
+        raise SystemExit(f"Parity harness dependencies are missing: {exc}")
+    return module
+
+
+def run_scenario(
+    scenario: Scenario,
+    *,
+    harness: ModuleType,
+    budget: object,
+    python_cache: object,
+    tolerance_policy: object,
+    swift_cli: object,
+    package: Path,
+    out_dir: Path,
+    args: argparse.Namespace,
+    yahoo_base_url: str | None = None,
+    data_source: str | None = None,
+    symbols: tuple[str, ...] | None = None,
+    previous: dict[str, object] | None = None,
+) -> dict[str, object]:
+    """Run one scenario and return its aggregate entry.
+
+    With `previous` (a report from --rerun-from) only `symbols` are fetched
+    and merged into it; with no symbols left the previous report is kept.
+    """
+    json_path = out_dir / f"{scenario.name}.json"
+    md_path = out_dir / f"{scenario.name}.md"
+    symbols = scenario.symbols if symbols is None else symbols
+    if previous is not None and not symbols:
+        print(f"=== {scenario.name}: nothing to rerun, keeping previous results ===", flush=True)
+    elif previous is not None:
+        print(f"=== {scenario.name} rerun started ({scenario.priority}): {', '.join(symbols)} ===", flush=True)
+    else:
+        print(f"=== {scenario.name} started ({scenario.priority}) ===", flush=True)
+
+    summary: dict[str, object] | None = None
+    diagnostics: dict[str, object] | None = None
+    try:
+        if previous is not None and not symbols:
+            report = previous
+        else:
+            report = harness.run_harness(
+                package_path=package,
+                symbols=list(symbols),
+                swift_bin="swift",
+                period=scenario.period,
+                interval=scenario.interval,
+                history_limit=30,
+                earnings_limit=4,
+                income_limit=4,
+                income_freq="yearly",
+                timeout_sec=max(20, args.timeout_sec),
+                jobs=args.jobs,
+                budget=budget,
+                priority=scenario.priority,
+                python_cache=python_cache,
+                python_cache_mode=args.python_cache,
+                yahoo_base_url=yahoo_base_url,
+                data_source=data_source,
+                history_window=args.history_window,
+                tolerance_policy=tolerance_policy,
+                swift_cli=swift_cli,
+            )
+            if previous is not None:
+                report = merge_rerun(previous, report, harness)
+        harness.write_reports(report, output_json=json_path, output_md=md_path)
+        summary = report["summary"]
+        diagnostics = report.get("diagnostics")
+        return_code = 0 if summary["fail"] == 0 else 1
+    except Exception as exc:  # noqa: BLE001
+        print(f"=== {scenario.name} crashed: {exc} ===", file=sys.stderr, flush=True)
+        return_code = 2
+
+    if summary is not None:
+        print(
+            f"=== {scenario.name} done: pass={summary['pass']} warn={summary['warn']} "
+            f"fail={summary['fail']} skip={summary['skip']} score={summary['score']:.1f} ===",
+            flush=True,
+        )
+
+    return {
+        "name": scenario.name,
+        "symbols": list(scenario.symbols),
+        "period": scenario.period,
+        "interval": scenario.interval,
+        "priority": scenario.priority,
+        "return_code": return_code,
+        "summary": summary,
+        "diagnostics": diagnostics,
+        # Relative to the aggregate, so a copied or archived run stays self-contained.
+        "json": json_path.name,
+        "markdown": md_path.name,
+    }
+
+
 def main() -> int:
     args = parse_args()
     package = Path(args.package_path).resolve()
-    harness = package / "tools" / "parity_harness.py"
+    harness = load_harness(package / "tools" / "parity_harness.py")
     out_dir = Path(args.output_dir)
     if not out_dir.is_absolute():
         out_dir = package / out_dir
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    scenarios = selected_scenarios(args.scenario)
+    # Per scenario: the symbols to fetch and, when rerunning, the report they merge into.
+    reruns: list[tuple[tuple[str, ...] | None, dict[str, object] | None]]
+    if args.rerun_from:
+        if args.scenario:
+            # The rerun aggregate replaces the previous one, so it must cover every scenario.
+            raise SystemExit("--scenario cannot be combined with --rerun-from; a rerun covers the whole previous run.")
+        statuses = {status.strip() for status in args.statuses.split(",") if status.strip()}
+        if not statuses or not statuses <= set(SYMBOL_STATUSES):
+            raise SystemExit(f"--statuses takes a subset of {','.join(SYMBOL_STATUSES)}; got {args.statuses!r}")
+        rerun_from = harness.resolve_output_path(package, args.rerun_from)
+        previous, previous_shard = load_previous_run(rerun_from, harness)
+        scenarios = [item.scenario() for item in previous]
+        reruns = [(item.affected(statuses), item.report) for item in previous]
+        pairs = sum(len(symbols or ()) for symbols, _ in reruns)
+        print(f"Rerunning {pairs} (scenario, symbol) pair(s) with status {', '.join(sorted(statuses))} from {rerun_from}")
+    else:
+        scenarios = selected_scenarios(args.scenario)
+    plan = scenarios
+    if args.shard:
+        if args.rerun_from:
+            raise SystemExit("--shard cannot be combined with --rerun-from; rerun from the shard's own aggregate.")
+        shard_index, shard_count = parse_shard(args.shard)
+        scenarios = shard_scenarios(plan, shard_index, shard_count)
+        print(
+            f"Shard {shard_index}/{shard_count}: {sum(len(scenario.symbols) for scenario in scenarios)} of "
+            f"{sum(len(scenario.symbols) for scenario in plan)} (scenario, symbol) pair(s)"
+        )
+    if not args.rerun_from:
+        reruns = [(None, None)] * len(scenarios)
+    if args.record_fixtures and args.python_cache != "off":
+        raise SystemExit("--record-fixtures needs --python-cache off so Python traffic is captured.")
+    if args.history_window == "max" and args.python_cache == "only":
+        raise SystemExit("--history-window max streams live history and cannot run with --python-cache only.")
+    if args.history_window == "max" and (args.record_fixtures or args.standin_fixtures):
+        # Fixture keys ignore period1/period2, so every window would replay the same chunk.
+        raise SystemExit(
+            "--history-window max fetches date windows that fixture archives cannot tell apart; "
+            "it cannot run with --record-fixtures or --standin-fixtures."
+        )
+    budget = harness.RequestBudget(
+        max_concurrent=args.max_in_flight,
+        max_background=args.max_background,
+        max_per_second=args.max_fetch_rate,
+    )
+    python_cache = harness.PythonSnapshotCache(
+        harness.resolve_output_path(package, args.python_cache_dir),
+        ttl_sec=max(0.0, args.python_cache_ttl_hours) * 3600.0,
+    )
+    try:
+        tolerance_policy = harness.load_policy(
+            Path(args.tolerances).resolve() if args.tolerances else harness.POLICY_FILE
+        )
+    except (OSError, harness.TolerancePolicyError) as exc:
+        raise SystemExit(f"Cannot load tolerance policy: {exc}")
+    # One build for every scenario; each run_harness call re-checks it
+    # against the source tree before its first request.
+    try:
+        swift_cli = harness.build_swift_cli(swift_bin="swift", package_path=package, config=args.swift_config)
+    except harness.SwiftBuildError as exc:
+        raise SystemExit(f"Cannot build {harness.SWIFT_PRODUCT}: {exc}")
+    print(f"{harness.SWIFT_PRODUCT} ({swift_cli.config}): {swift_cli.path}")
     aggregate: dict[str, object] = {
         "generated_at": dt.datetime.now(dt.timezone.utc).isoformat(),
         "package_path": str(package),
+        **harness.package_revision(package),
+        "yfinance": getattr(harness.yf, "__version__", "unknown"),
+        "budget": {
+            "parallel_scenarios": max(1, args.parallel_scenarios),
+            "jobs": max(1, args.jobs),
+            "max_in_flight": budget.max_concurrent,
+            "max_background": budget.max_background,
+            "max_fetch_rate": args.max_fetch_rate,
+        },
+        "tolerances": tolerance_policy.describe(),
+        "swift_cli": swift_cli.describe(),
         "scenarios": [],
     }
-    overall_rc = 0
+    if args.shard:
+        aggregate["shard"] = {
+            "index": shard_index,
+            "count": shard_count,
+            # The unsharded selection, so parity_merge.py can check coverage and restore order.
+            "plan": [{"name": scenario.name, "symbols": list(scenario.symbols)} for scenario in plan],
+        }
+    elif args.rerun_from and previous_shard:
+        # A rerun shard is still that shard of the same plan, so parity_merge.py accepts it.
+        aggregate["shard"] = previous_shard
+    if args.rerun_from:
+        aggregate["rerun"] = {"from": str(rerun_from), "statuses": sorted(statuses), "pairs": pairs}
 
-    for scenario in scenarios:
-        json_path = out_dir / f"{scenario.name}.json"
-        md_path = out_dir / f"{scenario.name}.md"
-        command = [
-            sys.executable,
-            str(harness),
-            "--package-path",
-            str(package),
-            "--symbols",
-            ",".join(scenario.symbols),
-            "--period",
-            scenario.period,
-            "--interval",
-            scenario.interval,
-            "--output-json",
-            str(json_path),
-            "--output-md",
-            str(md_path),
-            "--timeout-sec",
-            str(max(20, args.timeout_sec)),
-        ]
-        print(f"\n=== {scenario.name} ===")
-        proc = subprocess.run(command, check=False)
-        overall_rc = max(overall_rc, proc.returncode)
-
-        summary: dict[str, object] | None = None
-        if json_path.exists():
-            try:
-                report = json.loads(json_path.read_text(encoding="utf-8"))
-                summary = report.get("summary")
-            except (OSError, json.JSONDecodeError):
-                summary = None
-
-        aggregate["scenarios"].append(
-            {
-                "name": scenario.name,
-                "symbols": list(scenario.symbols),
-                "period": scenario.period,
-                "interval": scenario.interval,
-                "return_code": proc.returncode,
-                "summary": summary,
-                "json": str(json_path.relative_to(package)),
-                "markdown": str(md_path.relative_to(package)),
+    # Start interactive scenarios first; the aggregate keeps selection order.
+    launch_order = sorted(
+        range(len(scenarios)),
+        key=lambda index: harness.PRIORITY_CLASSES.index(scenarios[index].priority),
+    )
+    results: list[dict[str, object] | None] = [None] * len(scenarios)
+    with harness.yahoo_endpoint(
+        package_path=package,
+        standin_fixtures=args.standin_fixtures,
+        record_fixtures=args.record_fixtures,
+        fixture_codec=args.fixture_codec,
+    ) as (yahoo_base_url, data_source):
+        aggregate["data_source"] = data_source or "yahoo"
+        with ThreadPoolExecutor(max_workers=max(1, args.parallel_scenarios)) as pool:
+            futures = {
+                index: pool.submit(
+                    run_scenario,
+                    scenarios[index],
+                    harness=harness,
+                    budget=budget,
+                    python_cache=python_cache,
+                    tolerance_policy=tolerance_policy,
+                    swift_cli=swift_cli,
+                    package=package,
+                    out_dir=out_dir,
+                    args=args,
+                    yahoo_base_url=yahoo_base_url,
+                    data_source=data_source,
+                    symbols=reruns[index][0],
+                    previous=reruns[index][1],
+                )
+                for index in launch_order
             }
-        )
+            for index, future in futures.items():
+                results[index] = future.result()
 
-    aggregate_path = out_dir / "aggregate.json"
-    aggregate_path.write_text(json.dumps(aggregate, indent=2, sort_keys=True), encoding="utf-8")
+    aggregate["scenarios"] = results
+    aggregate["summary"] = run_summary(harness, results)
+    aggregate["diagnostics"] = harness.aggregate_diagnostics(entry["diagnostics"] for entry in results if entry)
+    overall_rc = max((int(entry["return_code"]) for entry in results if entry), default=0)
+
+    aggregate_path = write_aggregate(aggregate, out_dir=out_dir, harness=harness)
     print(f"\nAggregate: {aggregate_path}")
     return overall_rc
 
 
+def run_summary(harness: ModuleType, entries: Iterable[dict[str, object] | None]) -> dict[str, object]:
+    """Run-wide summary, scored over all symbols rather than by averaging scenario scores."""
+    statuses = [
+        status
+        for entry in entries
+        if entry and entry.get("summary")
+        for status in SYMBOL_STATUSES
+        for _ in range(int(entry["summary"].get(status, 0)))
+    ]
+    return harness.summarize_statuses(statuses)
+
+
+def write_aggregate(aggregate: dict[str, object], *, out_dir: Path, harness: ModuleType) -> Path:
+    aggregate_path = out_dir / "aggregate.json"
+    aggregate_path.write_text(json.dumps(aggregate, indent=2, sort_keys=True), encoding="utf-8")
+    (out_dir / "aggregate.md").write_text(render_aggregate_markdown(aggregate, harness), encoding="utf-8")
+    return aggregate_path
+
+
+def render_aggregate_markdown(aggregate: dict[str, object], harness: ModuleType) -> str:
+    lines = ["# YFinanceKit Parity Matrix", ""]
+    lines.append(f"- Generated: `{aggregate.get('generated_at', '')}`")
+    commit = aggregate.get("package_commit") or "unknown"
+    dirty = " (dirty)" if aggregate.get("package_dirty") else ""
+    lines.append(f"- Package: `{commit}`{dirty}, yfinance `{aggregate.get('yfinance', 'unknown')}`")
+    if aggregate.get("shard"):
+        lines.append(f"- Shard: {aggregate['shard']['index']}/{aggregate['shard']['count']}")
+    if aggregate.get("shards"):
+        lines.append(f"- Merged from {len(aggregate['shards'])} shard(s)")
+    summary = aggregate.get("summary") or {}
+    lines.append(
+        f"- Summary: pass={summary.get('pass', 0)} warn={summary.get('warn', 0)} "
+        f"fail={summary.get('fail', 0)} skip={summary.get('skip', 0)} score={summary.get('score', 0):.1f}"
+    )
+    if aggregate.get("diagnostics"):
+        lines.append(f"- Swift requests: {harness.describe_diagnostics(aggregate['diagnostics'])}")
+    lines.append("")
+    lines.append("## Scenarios")
+    lines.append("")
+    lines.append("| Scenario | Period | Interval | Symbols | Pass | Warn | Fail | Skip | Score | Report |")
+    lines.append("|---|---|---|---:|---:|---:|---:|---:|---:|---|")
+    for entry in aggregate.get("scenarios") or []:
+        if not entry:
+            continue
+        counts = entry.get("summary")
+        cells = (
+            [str(counts.get(status, 0)) for status in ("pass", "warn", "fail", "skip")] + [f"{counts.get('score', 0):.1f}"]
+            if counts
+            else ["-"] * 4 + [f"crashed (rc={entry.get('return_code')})"]
+        )
+        lines.append(
+            f"| {entry.get('name')} | {entry.get('period')} | {entry.get('interval')} | "
+            f"{len(entry.get('symbols') or [])} | {' | '.join(cells)} | {entry.get('markdown') or ''} |"
+        )
+    missing = aggregate.get("missing") or []
+    if missing:
+        lines.append("")
+        lines.append("## Missing Pairs")
+        lines.append("")
+        for pair in missing:
+            lines.append(f"- {pair['scenario']} / {pair['symbol']}")
+    return "\n".join(lines).rstrip() + "\n"
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
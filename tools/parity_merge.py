@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""Merge sharded ``parity_matrix.py`` runs into one aggregate.
+
+Each ``parity_matrix.py --shard I/N`` runner writes an aggregate covering its
+share of the (scenario, symbol) pairs. This tool checks that the inputs are
+the shards of one plan (same N, every index exactly once), joins each
+scenario's symbol entries back into plan order and recomputes summaries,
+scores and diagnostics from the symbols themselves, never by averaging shard
+scores. It writes per-scenario reports, ``aggregate.json`` and
+``aggregate.md`` exactly like a single-machine matrix run, so rescoring,
+diffing and ledger ingestion work on the merged output unchanged.
+
+The harness is loaded to render the reports, so this needs the same Python
+dependencies as ``parity_matrix.py``; nothing is fetched.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import ModuleType
+
+from parity_matrix import load_harness, run_summary, write_aggregate
+from parity_rescore import scenario_report_path
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Merge sharded parity_matrix.py outputs into one aggregate.")
+    parser.add_argument("inputs", nargs="+", help="aggregate.json of every shard, in any order")
+    parser.add_argument(
+        "--package-path",
+        default=str(Path(__file__).resolve().parents[1]),
+        help="YFinanceKit package root",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default="artifacts/parity-matrix",
+        help="Directory for the merged scenario reports and aggregate JSON",
+    )
+    parser.add_argument(
+        "--allow-partial",
+        action="store_true",
+        help="Merge even if shards or (scenario, symbol) pairs are missing; they are listed as missing.",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    package = Path(args.package_path).resolve()
+    harness = load_harness(package / "tools" / "parity_harness.py")
+    out_dir = harness.resolve_output_path(package, args.output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    shards = [load_shard(Path(raw)) for raw in args.inputs]
+    problems = check_shards(shards)
+    for problem in problems:
+        print(f"warning: {problem}", file=sys.stderr)
+    if problems and not args.allow_partial:
+        print("Refusing to merge an incomplete or inconsistent shard set (see --allow-partial).", file=sys.stderr)
+        return 2
+
+    shards.sort(key=lambda shard: shard[1]["shard"]["index"])
+    base = shards[0][1]
+    entries: list[dict[str, object]] = []
+    missing: list[dict[str, str]] = []
+    for planned in base["shard"]["plan"]:
+        entry, absent = merge_scenario(planned, shards, harness=harness, out_dir=out_dir)
+        entries.append(entry)
+        missing.extend({"scenario": planned["name"], "symbol": symbol} for symbol in absent)
+        summary = entry["summary"]
+        if summary is None:
+            print(f"{planned['name']}: no shard delivered results")
+            continue
+        print(
+            f"{planned['name']}: pass={summary['pass']} warn={summary['warn']} fail={summary['fail']} "
+            f"skip={summary['skip']} score={summary['score']:.1f}"
+            + (f" missing={len(absent)}" if absent else "")
+        )
+
+    aggregate = {key: value for key, value in base.items() if key not in ("shard", "rerun")}
+    aggregate.update(
+        {
+            "generated_at": dt.datetime.now(dt.timezone.utc).isoformat(),
+            "package_path": str(package),
+            "shards": [
+                {
+                    "index": document["shard"]["index"],
+                    "count": document["shard"]["count"],
+                    "source": str(path),
+                    "generated_at": document.get("generated_at"),
+                    "package_commit": document.get("package_commit"),
+                    "yfinance": document.get("yfinance"),
+                    "data_source": document.get("data_source"),
+                }
+                for path, document in shards
+            ],
+            "scenarios": entries,
+            "summary": run_summary(harness, entries),
+            "diagnostics": harness.aggregate_diagnostics(entry["diagnostics"] for entry in entries),
+            "missing": missing,
+        }
+    )
+    aggregate_path = write_aggregate(aggregate, out_dir=out_dir, harness=harness)
+    summary = aggregate["summary"]
+    print(
+        f"Merged {len(shards)} shard(s): pass={summary['pass']} warn={summary['warn']} fail={summary['fail']} "
+        f"skip={summary['skip']} score={summary['score']:.1f}"
+    )
+    print(f"Aggregate: {aggregate_path}")
+    return max((int(entry["return_code"]) for entry in entries), default=0)
+
+
+def load_shard(path: Path) -> tuple[Path, dict[str, object]]:
+    try:
+        document = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise SystemExit(f"Cannot read shard aggregate {path}: {exc}")
+    if not document.get("shard"):
+        raise SystemExit(f"{path} is not a sharded run (no 'shard' block); run parity_matrix.py with --shard I/N.")
+    return path, document
+
+
+def check_shards(shards: list[tuple[Path, dict[str, object]]]) -> list[str]:
+    """Reasons the shards do not form one complete, consistent run."""
+    problems = []
+    count = shards[0][1]["shard"]["count"]
+    plan = shards[0][1]["shard"]["plan"]
+    seen: dict[int, Path] = {}
+    for path, document in shards:
+        shard = document["shard"]
+        if shard["count"] != count or shard["plan"] != plan:
+            problems.append(f"{path} belongs to a different plan (shard {shard['index']}/{shard['count']})")
+        if shard["index"] in seen:
+            problems.append(f"shard {shard['index']} given twice: {seen[shard['index']]} and {path}")
+        seen[shard["index"]] = path
+    absent = sorted(set(range(1, count + 1)) - seen.keys())
+    if absent:
+        problems.append(f"missing shard(s) {', '.join(str(index) for index in absent)} of {count}")
+    for key in ("package_commit", "yfinance", "data_source"):
+        values = {str(document.get(key)) for _, document in shards}
+        if len(values) > 1:
+            problems.append(f"shards disagree on {key}: {', '.join(sorted(values))}")
+    digests = {str((document.get("tolerances") or {}).get("digest")) for _, document in shards}
+    if len(digests) > 1:
+        problems.append("shards ran with different tolerance policies")
+    return problems
+
+
+@dataclass
+class ShardedScenario:
+    """What the shards delivered for one planned scenario."""
+
+    entry: dict[str, object] = field(default_factory=dict)
+    reports: list[dict[str, object]] = field(default_factory=list)
+    symbols: dict[str, dict[str, object]] = field(default_factory=dict)
+    crashed: bool = False
+
+
+def collect_scenario(name: str, shards: list[tuple[Path, dict[str, object]]]) -> ShardedScenario:
+    collected = ShardedScenario()
+    for path, document in shards:
+        for shard_entry in document.get("scenarios") or []:
+            if not shard_entry or shard_entry.get("name") != name:
+                continue
+            collected.entry = collected.entry or shard_entry
+            # Each shard's reports are read from next to its own aggregate:
+            # shards usually share a package_path, which on this host holds at
+            # most one of them.
+            report_path = scenario_report_path(
+                shard_entry.get("json") or "",
+                package=Path(document.get("package_path") or path.parent),
+                aggregate_dir=path.parent,
+            )
+            if shard_entry.get("summary") is None or report_path is None:
+                print(f"warning: {path}: no report for {name}", file=sys.stderr)
+                collected.crashed = True
+                continue
+            report = json.loads(report_path.read_text(encoding="utf-8"))
+            collected.reports.append(report)
+            for symbol_report in report.get("symbols") or []:
+                collected.symbols[symbol_report["symbol"]] = symbol_report
+    return collected
+
+
+def merge_scenario(
+    planned: dict[str, object],
+    shards: list[tuple[Path, dict[str, object]]],
+    *,
+    harness: ModuleType,
+    out_dir: Path,
+) -> tuple[dict[str, object], list[str]]:
+    """Merged aggregate entry for one planned scenario, plus its symbols no shard delivered."""
+    name = str(planned["name"])
+    collected = collect_scenario(name, shards)
+    reports = collected.reports
+    symbols = [collected.symbols[symbol] for symbol in planned["symbols"] if symbol in collected.symbols]
+    absent = [symbol for symbol in planned["symbols"] if symbol not in collected.symbols]
+    json_path = out_dir / f"{name}.json"
+    md_path = out_dir / f"{name}.md"
+    if reports:
+        merged = {
+            **reports[0],
+            "generated_at": min(str(report.get("generated_at")) for report in reports),
+            "config": {**reports[0]["config"], "symbols": [item["symbol"] for item in symbols]},
+            "summary": harness.summarize_statuses(item["status"] for item in symbols),
+            "diagnostics": harness.aggregate_diagnostics(item.get("swift_diagnostics") for item in symbols),
+            "symbols": symbols,
+        }
+        harness.write_reports(merged, output_json=json_path, output_md=md_path)
+        summary = merged["summary"]
+        return_code = 2 if collected.crashed or absent else (0 if summary["fail"] == 0 else 1)
+    else:
+        merged, summary, return_code = None, None, 2
+    entry = collected.entry
+    return (
+        {
+            "name": name,
+            "symbols": list(planned["symbols"]),
+            "period": entry.get("period"),
+            "interval": entry.get("interval"),
+            "priority": entry.get("priority"),
+            "return_code": return_code,
+            "summary": summary,
+            "diagnostics": merged["diagnostics"] if merged else None,
+            "json": json_path.name if merged else None,
+            "markdown": md_path.name if merged else None,
+        },
+        absent,
+    )
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""Recording Yahoo Finance proxy that builds fixture archives for parity_standin.py.
+
+Both clients are pointed at the recorder exactly as they are pointed at the
+stand-in (``YF_PARITY_BASE_URL`` for YFParityCLI, ``standin_session`` for
+Python yfinance). The recorder answers the cookie/crumb handshake locally with
+the stand-in crumb, forwards every data request to the Yahoo host named by its
+``/__host/<host>`` prefix over its own cookie/crumb session (swapping in the
+real crumb), returns the live response and adds the pair to a deduplicated
+archive (see ``parity_fixtures.py``). Requests without the prefix go to
+``--upstream``.
+
+``parity_harness.py --record-fixtures DIR`` and ``parity_matrix.py
+--record-fixtures DIR`` start the recorder in-process; a later run with
+``--standin-fixtures DIR`` replays the capture offline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import queue
+import sys
+import threading
+import urllib.parse
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from parity_fixtures import BLOB_CODECS, FixtureArchiveWriter, FixtureRequest
+from parity_standin import StandInHandler, StandInServer, is_yahoo_host
+
+DEFAULT_UPSTREAM = "https://query2.finance.yahoo.com"
+COOKIE_BOOTSTRAP_URL = "https://fc.yahoo.com"
+CRUMB_URL = "https://query1.finance.yahoo.com/v1/test/getcrumb"
+
+# Responses that describe the recording session rather than the data (auth
+# failures, throttling, outages) are passed through but never archived.
+UNRECORDED_STATUSES = frozenset({401, 403, 429})
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Record Yahoo traffic into a parity fixture archive.")
+    parser.add_argument("--fixtures", required=True, help="Fixture archive directory to create or extend.")
+    parser.add_argument("--codec", default="gzip", choices=BLOB_CODECS, help="Blob compression (default: gzip).")
+    parser.add_argument(
+        "--upstream",
+        default=DEFAULT_UPSTREAM,
+        help=f"Yahoo API base URL for requests that do not name a host (default: {DEFAULT_UPSTREAM}).",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=8765, help="Bind port, 0 for any free port (default: 8765).")
+    return parser.parse_args()
+
+
+class UpstreamSession:
+    """One curl_cffi session with its own Yahoo cookie and crumb."""
+
+    def __init__(self, upstream: str) -> None:
+        from curl_cffi import requests as curl_requests
+
+        self.upstream = upstream.rstrip("/")
+        self.session = curl_requests.Session(impersonate="chrome")
+        self.crumb: Optional[str] = None
+
+    def refresh_crumb(self) -> None:
+        self.crumb = None
+        try:
+            self.session.get(COOKIE_BOOTSTRAP_URL, allow_redirects=True, timeout=30)
+            response = self.session.get(CRUMB_URL, timeout=30)
+        except Exception:  # noqa: BLE001
+            return
+        text = response.text.strip()
+        if response.status_code == 200 and text and "<" not in text:
+            self.crumb = text
+
+    def forward(
+        self, method: str, host: Optional[str], target: str, body: Optional[bytes], content_type: Optional[str]
+    ) -> Tuple[int, str, bytes]:
+        if self.crumb is None:
+            self.refresh_crumb()
+        response = self._send(method, host, target, body, content_type)
+        if response.status_code in (401, 403) and self.crumb is not None:
+            self.refresh_crumb()
+            response = self._send(method, host, target, body, content_type)
+        return (
+            response.status_code,
+            response.headers.get("Content-Type") or "application/json",
+            response.content,
+        )
+
+    def _send(
+        self, method: str, host: Optional[str], target: str, body: Optional[bytes], content_type: Optional[str]
+    ) -> Any:
+        parts = urllib.parse.urlsplit(target)
+        query = [
+            (name, self.crumb if name == "crumb" and self.crumb else value)
+            for name, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        ]
+        url = f"https://{host}{parts.path}" if host else f"{self.upstream}{parts.path}"
+        if query:
+            url += "?" + urllib.parse.urlencode(query)
+        headers = {"Content-Type": content_type} if content_type else {}
+        return self.session.request(method, url, data=body or None, headers=headers, timeout=60)
+
+
+class UpstreamPool:
+    """Reuses upstream sessions across recorder threads; each keeps its own crumb."""
+
+    def __init__(self, upstream: str) -> None:
+        self.upstream = upstream
+        self.idle: "queue.LifoQueue[UpstreamSession]" = queue.LifoQueue()
+
+    @contextlib.contextmanager
+    def session(self) -> Iterator[UpstreamSession]:
+        try:
+            session = self.idle.get_nowait()
+        except queue.Empty:
+            session = UpstreamSession(self.upstream)
+        try:
+            yield session
+        finally:
+            self.idle.put(session)
+
+
+class RecorderHandler(StandInHandler):
+    server: "RecorderServer"
+
+    def replay(self, request: FixtureRequest, body: Optional[bytes], *, host: Optional[str], target: str) -> None:
+        if host is not None and not is_yahoo_host(host):
+            self.server.note(False, request.key)
+            error = {"finance": {"result": None, "error": {"code": "Bad Request", "description": f"not Yahoo: {host}"}}}
+            self.send(400, "application/json", json.dumps(error).encode("utf-8"))
+            return
+        try:
+            with self.server.upstream.session() as session:
+                status, content_type, payload = session.forward(
+                    self.command, host, target, body, self.headers.get("Content-Type")
+                )
+        except Exception as exc:  # noqa: BLE001
+            self.server.note(False, request.key)
+            error = {"finance": {"result": None, "error": {"code": "Bad Gateway", "description": repr(exc)}}}
+            self.send(502, "application/json", json.dumps(error).encode("utf-8"))
+            return
+
+        # Without a host the request went to --upstream, which may not serve its
+        # path at all; a 404 from there says nothing about the data.
+        recorded = status < 500 and status not in UNRECORDED_STATUSES and not (status == 404 and host is None)
+        if recorded:
+            self.server.writer.record(request, status=status, content_type=content_type, body=payload)
+        self.server.note(recorded, request.key)
+        self.send(status, content_type, payload)
+
+
+class RecorderServer(StandInServer):
+    """Stand-in whose fixture lookups are live Yahoo calls written to an archive.
+
+    ``stats`` counts recorded responses as hits and unrecorded ones as misses.
+    """
+
+    def __init__(self, address: Tuple[str, int], writer: FixtureArchiveWriter, *, upstream: str) -> None:
+        super().__init__(address, None, RecorderHandler)
+        self.writer = writer
+        self.upstream = UpstreamPool(upstream)
+
+
+def start_recorder(
+    fixtures: Path,
+    *,
+    codec: str = "gzip",
+    upstream: str = DEFAULT_UPSTREAM,
+    host: str = "127.0.0.1",
+    port: int = 0,
+) -> RecorderServer:
+    """Start a recorder on a daemon thread; call ``shutdown()`` then ``writer.flush()``."""
+    server = RecorderServer((host, port), FixtureArchiveWriter(fixtures, codec=codec), upstream=upstream)
+    threading.Thread(target=server.serve_forever, name="parity-recorder", daemon=True).start()
+    return server
+
+
+def describe_recording(summary: Dict[str, Any]) -> List[str]:
+    stored_kib = summary["stored_bytes"] / 1024.0
+    raw_kib = summary["raw_bytes"] / 1024.0
+    return [
+        f"Fixtures: {summary['root']} ({summary['codec']})",
+        f"  recorded {summary['recorded']} responses, {raw_kib:.1f} KiB raw -> "
+        f"{summary['new_blobs']} new blobs, {stored_kib:.1f} KiB stored",
+        f"  archive: {summary['entries']} requests, {summary['unique_bodies']} unique bodies",
+    ]
+
+
+def main() -> int:
+    args = parse_args()
+    fixtures = Path(args.fixtures).resolve()
+    try:
+        writer = FixtureArchiveWriter(fixtures, codec=args.codec)
+    except (RuntimeError, ValueError) as exc:
+        print(str(exc), file=sys.stderr)
+        return 2
+
+    server = RecorderServer((args.host, args.port), writer, upstream=args.upstream)
+    print(f"Yahoo recorder forwarding to {args.upstream} at {server.base_url}", flush=True)
+    print(f"  YF_PARITY_BASE_URL={server.base_url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        writer.flush()
+        for line in describe_recording(writer.summary()):
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Re-score existing parity reports against a tolerance policy, offline.
+
+Takes a ``parity_harness.py`` report or a ``parity_matrix.py`` aggregate
+(whose scenario reports are re-scored in turn) and recomputes every comparison
+status, symbol status and summary from the stored metrics with
+``parity_tolerances.py``. Nothing is fetched, so trying a loosened threshold
+takes milliseconds instead of a scenario rerun.
+
+Status transitions are printed; ``--output-dir`` also writes the re-scored
+JSON (and, for an aggregate, an updated ``aggregate.json``). Comparisons from
+reports that predate the policy engine keep their stored quote status, since
+those reports lack the raw quote fields.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import datetime as dt
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from parity_tolerances import (
+    POLICY_FILE,
+    TolerancePolicy,
+    load_policy,
+    rescore_report,
+    summarize_statuses,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Re-score parity reports against a tolerance policy, offline.")
+    parser.add_argument("input", help="parity_harness.py report JSON or parity_matrix.py aggregate.json")
+    parser.add_argument(
+        "--tolerances",
+        default=str(POLICY_FILE),
+        help="Tolerance policy file (default: tools/parity_tolerances.json).",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=None,
+        help="Write re-scored reports here (default: only print the status transitions).",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    source = Path(args.input)
+    try:
+        policy = load_policy(Path(args.tolerances).resolve())
+        document = json.loads(source.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        print(f"Cannot re-score: {exc}", file=sys.stderr)
+        return 2
+
+    started = time.perf_counter()
+    if "scenarios" in document:
+        outputs, summary, before = rescore_aggregate(document, source, policy)
+    else:
+        rescored, transitions = rescore_report(document, policy)
+        print_transitions(None, transitions)
+        outputs = [(source.name, rescored)]
+        summary, before = rescored["summary"], document.get("summary") or {}
+    elapsed_ms = (time.perf_counter() - started) * 1000.0
+
+    if args.output_dir:
+        output_dir = Path(args.output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for name, payload in outputs:
+            (output_dir / name).write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+            print(f"JSON: {output_dir / name}")
+
+    print(
+        f"Re-scored in {elapsed_ms:.1f} ms with {policy.source}: "
+        f"{describe_summary(summary)} (was {describe_summary(before)})"
+    )
+    return 0 if summary.get("fail", 0) == 0 else 1
+
+
+def rescore_aggregate(
+    aggregate: Dict[str, Any], source: Path, policy: TolerancePolicy
+) -> Tuple[List[Tuple[str, Dict[str, Any]]], Dict[str, Any], Dict[str, Any]]:
+    """Re-score every scenario report of a matrix aggregate.
+
+    Returns the files to write (scenario reports plus the updated aggregate)
+    and the run-wide summary after and before re-scoring.
+    """
+    package = Path(aggregate.get("package_path") or source.parent)
+    outputs: List[Tuple[str, Dict[str, Any]]] = []
+    statuses: List[str] = []
+    previous: List[str] = []
+    updated = copy.deepcopy(aggregate)
+    for entry in updated.get("scenarios") or []:
+        if not entry or not entry.get("json"):
+            continue
+        report = load_scenario_report(entry["json"], package=package, aggregate_dir=source.parent)
+        if report is None:
+            print(f"{entry.get('name')}: scenario report {entry['json']} not found; kept as is", file=sys.stderr)
+            continue
+        rescored, transitions = rescore_report(report, policy)
+        print_transitions(entry.get("name"), transitions)
+        previous.extend(symbol.get("status", "pass") for symbol in report.get("symbols") or [])
+        statuses.extend(symbol["status"] for symbol in rescored.get("symbols") or [])
+        name = Path(entry["json"]).name
+        outputs.append((name, rescored))
+        entry["summary"] = rescored["summary"]
+        entry["return_code"] = 0 if rescored["summary"]["fail"] == 0 else 1
+        entry["json"] = name
+        entry["markdown"] = None
+    updated["tolerances"] = policy.describe()
+    updated["rescored"] = {
+        "at": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "from": str(source),
+        "tolerances": aggregate.get("tolerances"),
+    }
+    outputs.append(("aggregate.json", updated))
+    return outputs, summarize_statuses(statuses), summarize_statuses(previous)
+
+
+def scenario_report_path(raw: str, *, package: Path, aggregate_dir: Path) -> Optional[Path]:
+    # A scenario report sits next to its aggregate, wherever the aggregate was
+    # copied or archived. The package-relative path older aggregates store is
+    # only a fallback: tried first, it would pick up the latest run's report
+    # at that path instead of the one the aggregate describes.
+    for candidate in (aggregate_dir / Path(raw).name, package / raw):
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def load_scenario_report(raw: str, *, package: Path, aggregate_dir: Path) -> Optional[Dict[str, Any]]:
+    path = scenario_report_path(raw, package=package, aggregate_dir=aggregate_dir)
+    return json.loads(path.read_text(encoding="utf-8")) if path is not None else None
+
+
+def print_transitions(scenario: Optional[str], transitions: List[Dict[str, Any]]) -> None:
+    prefix = f"{scenario}/" if scenario else ""
+    for change in transitions:
+        print(f"{prefix}{change['symbol']} {change['comparison']}: {change['from']} -> {change['to']}")
+
+
+def describe_summary(summary: Dict[str, Any]) -> str:
+    return (
+        f"pass={summary.get('pass', 0)} warn={summary.get('warn', 0)} fail={summary.get('fail', 0)} "
+        f"skip={summary.get('skip', 0)} score={summary.get('score', 0.0):.1f}"
+    )
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
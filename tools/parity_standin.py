@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""Offline Yahoo Finance stand-in for end-to-end parity runs without network.
+
+Serves recorded chart/quote/quoteSummary/visualization/fundamentals-timeseries
+payloads from a fixture archive (see ``parity_fixtures.py``) plus the basic
+cookie/crumb handshake that ``YFCrumbStore`` and Python yfinance expect:
+
+- ``GET /`` installs an ``A3`` cookie (stands in for ``https://fc.yahoo.com``)
+- ``GET /v1/test/getcrumb`` returns a fixed plausible crumb
+
+Point YFParityCLI at it with ``YF_PARITY_BASE_URL=<base-url>``; point Python
+yfinance at it with ``standin_session(<base-url>)``. ``parity_harness.py
+--standin-fixtures DIR`` does both and starts the server in-process.
+
+Both clients keep the Yahoo host they meant as a ``/__host/<host>`` path
+prefix. The stand-in matches on the path after it, so fixtures stay
+host-agnostic; ``parity_recorder.py`` forwards to that host.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from parity_fixtures import FixtureArchive, FixtureRequest, normalize_request
+
+STANDIN_CRUMB = "standinCrumb0"
+STANDIN_COOKIE = "A3=d=standin&S=standin; Path=/; HttpOnly"
+HOST_PREFIX = "/__host/"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve recorded Yahoo fixtures for offline parity runs.")
+    parser.add_argument("--fixtures", required=True, help="Fixture archive directory (contains index.json).")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=8765, help="Bind port, 0 for any free port (default: 8765).")
+    return parser.parse_args()
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        archive: Optional[FixtureArchive],
+        handler: Optional[type] = None,
+    ) -> None:
+        super().__init__(address, handler or StandInHandler)
+        self.archive = archive
+        self.stats_lock = threading.Lock()
+        self.stats: Dict[str, Any] = {"hits": 0, "misses": 0, "missed": []}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def note(self, hit: bool, key: str) -> None:
+        with self.stats_lock:
+            if hit:
+                self.stats["hits"] += 1
+            else:
+                self.stats["misses"] += 1
+                if len(self.stats["missed"]) < 200:
+                    self.stats["missed"].append(key)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    server: StandInServer
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:  # noqa: N802
+        self.respond(None)
+
+    def do_HEAD(self) -> None:  # noqa: N802
+        self.respond(None)
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers.get("Content-Length") or 0)
+        self.respond(self.rfile.read(length) if length > 0 else b"")
+
+    def respond(self, body: Optional[bytes]) -> None:
+        host, target = split_host(self.path)
+        path = urllib.parse.urlsplit(target).path or "/"
+        if path == "/":
+            self.send(200, "text/html", b"ok", cookie=True)
+            return
+        if path == "/v1/test/getcrumb":
+            self.send(200, "text/plain", STANDIN_CRUMB.encode("utf-8"))
+            return
+        if path == "/__standin/stats":
+            with self.server.stats_lock:
+                payload = json.dumps(self.server.stats, sort_keys=True).encode("utf-8")
+            self.send(200, "application/json", payload)
+            return
+
+        self.replay(normalize_request(self.command, target, body), body, host=host, target=target)
+
+    def replay(self, request: FixtureRequest, body: Optional[bytes], *, host: Optional[str], target: str) -> None:
+        assert self.server.archive is not None
+        response = self.server.archive.lookup(request)
+        self.server.note(response is not None, request.key)
+        if response is None:
+            error = {
+                "finance": {
+                    "result": None,
+                    "error": {"code": "Not Found", "description": f"No recorded fixture for {request.key}"},
+                }
+            }
+            self.send(404, "application/json", json.dumps(error).encode("utf-8"))
+            return
+        self.send(response.status, response.content_type, response.body)
+
+    def send(self, status: int, content_type: str, payload: bytes, *, cookie: bool = False) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        if cookie:
+            self.send_header("Set-Cookie", STANDIN_COOKIE)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        return
+
+
+def start_standin(fixtures: Path, *, host: str = "127.0.0.1", port: int = 0) -> StandInServer:
+    """Start a stand-in on a daemon thread; call ``shutdown()`` when done."""
+    server = StandInServer((host, port), FixtureArchive(fixtures))
+    threading.Thread(target=server.serve_forever, name="parity-standin", daemon=True).start()
+    return server
+
+
+def is_yahoo_host(host: str) -> bool:
+    return host == "yahoo.com" or host.endswith(".yahoo.com")
+
+
+def split_host(target: str) -> Tuple[Optional[str], str]:
+    """The Yahoo host named by a ``/__host/<host>`` prefix (if any) and the target without it."""
+    if not target.startswith(HOST_PREFIX):
+        return None, target
+    host, slash, rest = target[len(HOST_PREFIX) :].partition("/")
+    if not rest and not slash:
+        host, _, query = host.partition("?")
+        rest = f"?{query}" if query else ""
+    return host.lower() or None, "/" + rest
+
+
+def rewrite_yahoo_url(url: str, base_url: str) -> str:
+    parts = urllib.parse.urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if not is_yahoo_host(host):
+        return url
+    base = urllib.parse.urlsplit(base_url)
+    path = base.path.rstrip("/") + HOST_PREFIX + host + (parts.path or "/")
+    return urllib.parse.urlunsplit((base.scheme, base.netloc, path, parts.query, parts.fragment))
+
+
+def standin_session(base_url: str) -> Any:
+    """curl_cffi session for Python yfinance that sends Yahoo traffic to the stand-in.
+
+    yfinance only accepts curl_cffi sessions and hard-codes https Yahoo hosts, so
+    every request URL is rewritten. yfinance's cookie/tz caches are moved to a
+    throwaway directory so the stand-in cookie never leaks into live runs.
+    """
+    import yfinance as yf
+    from curl_cffi import requests as curl_requests
+
+    class StandInSession(curl_requests.Session):
+        def request(self, method: str, url: str, *args: Any, **kwargs: Any) -> Any:
+            return super().request(method, rewrite_yahoo_url(url, base_url), *args, **kwargs)
+
+    yf.set_tz_cache_location(tempfile.mkdtemp(prefix="yfinance-standin-"))
+    return StandInSession(impersonate="chrome")
+
+
+def main() -> int:
+    args = parse_args()
+    fixtures = Path(args.fixtures).resolve()
+    if not (fixtures / "index.json").exists():
+        print(f"No fixture index at {fixtures / 'index.json'}", file=sys.stderr)
+        return 2
+
+    server = StandInServer((args.host, args.port), FixtureArchive(fixtures))
+    print(f"Yahoo stand-in serving {len(server.archive.entries)} fixtures at {server.base_url}", flush=True)
+    print(f"  YF_PARITY_BASE_URL={server.base_url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,333 @@
+"""Tolerance policy and scoring for the parity comparisons.
+
+Thresholds live in `parity_tolerances.json`. Its `defaults` hold one table per
+surface: quote field tolerances, history close/column error limits, and the
+earnings and income statement limits. `classes` (crypto, FX, minor-unit
+markets, funds) override parts of it. A class matches on the quote's
+``quoteType`` or ``currency``; the first class in file order wins.
+`TolerancePolicy` compiles every class into a complete table once, so finding
+a symbol's thresholds is one dict lookup.
+
+The verdict functions turn comparison metrics into a status. They only read
+metrics the reports already store, so `parity_rescore.py` can re-score an
+existing report against another policy without fetching anything.
+"""
+
+from __future__ import annotations
+
+import copy
+import functools
+import hashlib
+import json
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+POLICY_FILE = Path(__file__).resolve().with_name("parity_tolerances.json")
+POLICY_SCHEMA_VERSION = 1
+DEFAULT_CLASS = "default"
+SECTIONS = ("quote", "history", "earnings_dates", "income_stmt")
+REQUIRED_THRESHOLDS = {
+    "history": ("close_pass", "close_warn", "max_count_delta", "columns"),
+    "earnings_dates": ("pass", "warn", "min_overlap"),
+    "income_stmt": ("pass", "warn", "min_overlap"),
+}
+# Quote fields a class may match on; quoteType is compared case-insensitively,
+# currency exactly (GBp and GBP are different markets).
+MATCH_FIELDS = ("quoteType", "currency")
+QUOTE_ABS_TOL = 1e-6
+STATUS_ORDER = {"pass": 0, "warn": 1, "fail": 2, "skip": 3}
+
+
+class TolerancePolicyError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Tolerances:
+    """Complete thresholds for one asset class; a ``None`` quote tolerance skips that field."""
+
+    asset_class: str
+    quote: Dict[str, Optional[float]]
+    history: Dict[str, Any]
+    earnings_dates: Dict[str, Any]
+    income_stmt: Dict[str, Any]
+
+
+class TolerancePolicy:
+    def __init__(self, document: Dict[str, Any], *, source: str = "<memory>") -> None:
+        if document.get("schema_version") != POLICY_SCHEMA_VERSION:
+            raise TolerancePolicyError(f"{source}: unsupported schema_version {document.get('schema_version')!r}")
+        defaults = document.get("defaults")
+        if not isinstance(defaults, dict) or any(not isinstance(defaults.get(section), dict) for section in SECTIONS):
+            raise TolerancePolicyError(f"{source}: defaults need {', '.join(SECTIONS)} tables")
+        for section, required in REQUIRED_THRESHOLDS.items():
+            missing = [key for key in required if key not in defaults[section]]
+            if missing:
+                raise TolerancePolicyError(f"{source}: defaults.{section} is missing {', '.join(missing)}")
+
+        self.source = source
+        self.digest = hashlib.sha256(json.dumps(document, sort_keys=True).encode("utf-8")).hexdigest()
+        self.tables: Dict[str, Tolerances] = {DEFAULT_CLASS: compile_table(DEFAULT_CLASS, defaults, {}, source)}
+        self.index: Dict[Tuple[str, str], Tuple[int, str]] = {}
+        for rank, entry in enumerate(document.get("classes") or []):
+            name = entry.get("name") if isinstance(entry, dict) else None
+            if not isinstance(name, str) or not name or name in self.tables:
+                raise TolerancePolicyError(f"{source}: class #{rank + 1} needs a unique name")
+            match = entry.get("match")
+            if not isinstance(match, dict) or not match or any(field not in MATCH_FIELDS for field in match):
+                raise TolerancePolicyError(f"{source}: class {name} must match on {' or '.join(MATCH_FIELDS)}")
+            self.tables[name] = compile_table(name, defaults, entry, source)
+            for field, values in match.items():
+                for value in [values] if isinstance(values, str) else values:
+                    self.index.setdefault((field, match_key(field, value)), (rank, name))
+
+    def classify(self, *quotes: Any) -> str:
+        """Asset class of the first quote that has each match field, or ``default``."""
+        best: Optional[Tuple[int, str]] = None
+        for field, value in match_values(*quotes).items():
+            hit = self.index.get((field, match_key(field, value)))
+            if hit is not None and (best is None or hit < best):
+                best = hit
+        return best[1] if best is not None else DEFAULT_CLASS
+
+    def for_quote(self, *quotes: Any) -> Tolerances:
+        return self.tables[self.classify(*quotes)]
+
+    def describe(self) -> Dict[str, Any]:
+        return {"source": self.source, "digest": self.digest, "classes": list(self.tables)}
+
+
+def compile_table(name: str, defaults: Dict[str, Any], overrides: Dict[str, Any], source: str) -> Tolerances:
+    sections = {
+        section: merge_thresholds(defaults[section], overrides.get(section) or {}, f"{source}: {name}.{section}")
+        for section in SECTIONS
+    }
+    for section, low, high in (
+        ("history", "close_pass", "close_warn"),
+        ("earnings_dates", "pass", "warn"),
+        ("income_stmt", "pass", "warn"),
+    ):
+        if sections[section][low] > sections[section][high]:
+            raise TolerancePolicyError(f"{source}: {name}.{section}.{low} exceeds {high}")
+    return Tolerances(asset_class=name, **sections)
+
+
+def merge_thresholds(base: Dict[str, Any], override: Dict[str, Any], where: str) -> Dict[str, Any]:
+    """`base` with `override` applied; only thresholds the defaults define can be overridden."""
+    nullable = where.endswith(".quote")
+    merged: Dict[str, Any] = {}
+    for key, value in {**base, **override}.items():
+        if key not in base:
+            raise TolerancePolicyError(f"{where}: unknown threshold {key!r}")
+        if isinstance(base[key], dict):
+            if not isinstance(value, dict):
+                raise TolerancePolicyError(f"{where}.{key} must be a table")
+            merged[key] = merge_thresholds(base[key], value if key in override else {}, f"{where}.{key}")
+        elif value is None and nullable:
+            merged[key] = None
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0:
+            merged[key] = value
+        else:
+            raise TolerancePolicyError(f"{where}.{key} must be a non-negative number{' or null' if nullable else ''}")
+    return merged
+
+
+def match_key(field: str, value: Any) -> str:
+    text = str(value).strip()
+    return text.upper() if field == "quoteType" else text
+
+
+def match_values(*quotes: Any) -> Dict[str, str]:
+    """First non-empty value of each match field across `quotes`."""
+    values: Dict[str, str] = {}
+    for quote in quotes:
+        if not isinstance(quote, dict):
+            continue
+        for field in MATCH_FIELDS:
+            value = quote.get(field)
+            if field not in values and isinstance(value, str) and value.strip():
+                values[field] = value.strip()
+    return values
+
+
+@functools.lru_cache(maxsize=None)
+def load_policy(path: Path = POLICY_FILE) -> TolerancePolicy:
+    """Load and compile a policy file; each path is read once per process."""
+    try:
+        document = json.loads(Path(path).read_text(encoding="utf-8"))
+    except json.JSONDecodeError as exc:
+        raise TolerancePolicyError(f"{path}: {exc}") from None
+    return TolerancePolicy(document, source=str(path))
+
+
+def default_tolerances() -> Tolerances:
+    return load_policy().tables[DEFAULT_CLASS]
+
+
+def worst_status(statuses: Iterable[str]) -> str:
+    worst = "pass"
+    for status in statuses:
+        if STATUS_ORDER.get(status, 99) > STATUS_ORDER.get(worst, 0):
+            worst = status
+    return worst
+
+
+def summarize_statuses(statuses: Iterable[str]) -> Dict[str, Any]:
+    """Report summary counts; the score gives pass 1 and warn 0.5 and ignores skips."""
+    counts = {"pass": 0, "warn": 0, "fail": 0, "skip": 0}
+    for status in statuses:
+        counts[status] += 1
+    total = sum(counts.values())
+    scored_total = max(0, total - counts["skip"])
+    if scored_total == 0:
+        score = 100.0
+    else:
+        score = max(0.0, ((counts["pass"] + 0.5 * counts["warn"]) / scored_total) * 100.0)
+    return {"total": total, **counts, "score": score}
+
+
+def quote_verdict(metrics: Dict[str, Any], tolerances: Tolerances) -> Tuple[str, List[str]]:
+    """Status and numeric-field issues for quote metrics.
+
+    ``metrics["fields"]`` holds ``[swift, python]`` per numeric field; text
+    mismatches arrive pre-counted as ``fail_diffs`` and ``text_warn_diffs``.
+    """
+    fields = metrics.get("fields") or {}
+    issues: List[str] = []
+    for field, tolerance in tolerances.quote.items():
+        if tolerance is None:
+            continue
+        s, p = fields.get(field) or (None, None)
+        if s is None and p is None:
+            continue
+        if s is None or p is None:
+            issues.append(f"{field}: missing side swift={s} python={p}")
+            continue
+        if not math.isclose(s, p, rel_tol=tolerance, abs_tol=QUOTE_ABS_TOL):
+            issues.append(f"{field}: swift={s:.6g} python={p:.6g}")
+
+    if metrics.get("fail_diffs", 0) > 0:
+        return "fail", issues
+    if metrics.get("text_warn_diffs", 0) + len(issues) > 0:
+        return "warn", issues
+    return "pass", issues
+
+
+def history_verdict(metrics: Dict[str, Any], tolerances: Tolerances) -> Tuple[str, List[str]]:
+    """Status and issues for aligned history metrics, shared by both history modes."""
+    table = tolerances.history
+    avg_diff = metrics["avg_close_rel_diff"]
+    count_delta = abs(metrics["swift_count"] - metrics["python_count"])
+
+    if avg_diff <= table["close_pass"] and count_delta <= table["max_count_delta"]:
+        status = "pass"
+    elif avg_diff <= table["close_warn"]:
+        status = "warn"
+    else:
+        status = "fail"
+
+    issues = []
+    if count_delta > table["max_count_delta"]:
+        issues.append(f"bar count delta={count_delta}")
+    if avg_diff > table["close_pass"]:
+        issues.append(f"avg close rel diff={avg_diff:.4f}")
+    for column, limit in table["columns"].items():
+        mean = (metrics["columns"].get(column) or {}).get("mean")
+        if mean is not None and mean > limit:
+            status = worst_status([status, "warn"])
+            issues.append(f"avg {column} rel diff={mean:.4f}")
+    if metrics.get("max_drift_sec"):
+        issues.append(f"unmatched bars drift up to {metrics['max_drift_sec']:.0f}s from the nearest bar on the other side")
+    if metrics.get("failed_chunks"):
+        status = worst_status([status, "warn"])
+    return status, issues
+
+
+def statement_verdict(
+    avg_diff: float, overlap: int, table: Dict[str, Any], *, label: str, unit: str
+) -> Tuple[str, List[str]]:
+    if overlap >= table["min_overlap"] and avg_diff <= table["pass"]:
+        status = "pass"
+    elif avg_diff <= table["warn"]:
+        status = "warn"
+    else:
+        status = "fail"
+
+    issues: List[str] = []
+    if overlap < table["min_overlap"]:
+        issues.append(f"low overlap (<{table['min_overlap']} {unit})")
+    if avg_diff > table["pass"]:
+        issues.append(f"avg {label} rel diff={avg_diff:.4f}")
+    return status, issues
+
+
+def earnings_verdict(metrics: Dict[str, Any], tolerances: Tolerances) -> Tuple[str, List[str]]:
+    return statement_verdict(
+        metrics["avg_eps_rel_diff"], metrics["overlap"], tolerances.earnings_dates, label="EPS", unit="dates"
+    )
+
+
+def income_verdict(metrics: Dict[str, Any], tolerances: Tolerances) -> Tuple[str, List[str]]:
+    return statement_verdict(
+        metrics["avg_stmt_rel_diff"], metrics["overlap"], tolerances.income_stmt, label="statement", unit="years"
+    )
+
+
+VERDICTS: Dict[str, Callable[[Dict[str, Any], Tolerances], Tuple[str, List[str]]]] = {
+    "quote": quote_verdict,
+    "history": history_verdict,
+    "earnings_dates": earnings_verdict,
+    "income_stmt": income_verdict,
+}
+# A comparison with this metric reached its verdict; without it, it ended early
+# (skip, one-sided data, no overlap) and no threshold can change its status.
+VERDICT_METRICS = {
+    "quote": "fields",
+    "history": "columns",
+    "earnings_dates": "avg_eps_rel_diff",
+    "income_stmt": "avg_stmt_rel_diff",
+}
+
+
+def rescore_comparison(name: str, comparison: Dict[str, Any], tolerances: Tolerances) -> bool:
+    """Re-score one report comparison in place; ``False`` when it has nothing to re-score."""
+    metrics = comparison.get("metrics") or {}
+    if name not in VERDICTS or VERDICT_METRICS[name] not in metrics:
+        return False
+    status, issues = VERDICTS[name](metrics, tolerances)
+    previous = comparison.get("issues") or []
+    if name == "quote":
+        # Text mismatches do not depend on tolerances and come first.
+        fields = metrics["fields"]
+        comparison["issues"] = [issue for issue in previous if issue.split(":", 1)[0] not in fields] + issues
+        metrics["warn_diffs"] = metrics.get("text_warn_diffs", 0) + len(issues)
+        comparison["summary"] = f"{metrics.get('fail_diffs', 0)} fail-level, {metrics['warn_diffs']} warn-level differences"
+    elif name == "history":
+        comparison["issues"] = issues + [issue for issue in previous if issue.startswith("chunk failed:")]
+    else:
+        comparison["issues"] = issues
+    comparison["status"] = status
+    return True
+
+
+def rescore_report(report: Dict[str, Any], policy: TolerancePolicy) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """A copy of `report` scored under `policy`, plus every status transition."""
+    rescored = copy.deepcopy(report)
+    transitions: List[Dict[str, Any]] = []
+    for symbol_report in rescored.get("symbols") or []:
+        keys = symbol_report.get("asset_keys") or {}
+        tolerances = policy.for_quote(keys)
+        symbol_report["asset_class"] = tolerances.asset_class
+        comparisons = symbol_report.get("comparisons") or {}
+        for name, comparison in comparisons.items():
+            before = comparison.get("status")
+            if rescore_comparison(name, comparison, tolerances) and comparison["status"] != before:
+                transitions.append(
+                    {"symbol": symbol_report.get("symbol"), "comparison": name, "from": before, "to": comparison["status"]}
+                )
+        symbol_report["status"] = worst_status(comparison.get("status", "pass") for comparison in comparisons.values())
+    rescored["summary"] = summarize_statuses(symbol_report["status"] for symbol_report in rescored.get("symbols") or [])
+    rescored.setdefault("config", {})["tolerances"] = policy.describe()
+    return rescored, transitions
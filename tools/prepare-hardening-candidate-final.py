@@ -5,15 +5,23 @@ This supersedes the earlier incremental candidate helper. It applies every exact
 large-file migration currently staged by the remote hardening work, then runs
 static, build/test and warnings-as-errors strict-concurrency gates.
 
+The migrations run in-process as one transaction (see `source_migrations.py`):
+each Swift file is read once and written once, and nothing is written if any
+patch or invariant fails.
+
 It does not commit, tag, or run live Yahoo parity. Review the diff before commit.
 """
 
 from __future__ import annotations
 
 from pathlib import Path
+import argparse
 import subprocess
 import sys
 
+from hardening_migrations import MIGRATIONS
+from source_migrations import MigrationError, execute_migrations
+
 ROOT = Path(__file__).resolve().parents[1]
 
 
@@ -29,20 +37,38 @@ def run(command: list[str], label: str) -> None:
         raise PreparationError(f"{label} failed with exit code {proc.returncode}")
 
 
-def main() -> int:
-    run([sys.executable, "tools/apply-transport-extraction.py"], "Extract URLSession transport")
-    run(
-        [sys.executable, "tools/apply-coordinator-cancellation-hardening.py"],
-        "Make global permit waiting cancellation-safe",
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print the migrations as one unified diff and stop; writes nothing and runs no gates.",
     )
-    run(
-        [sys.executable, "tools/apply-post-permit-cooldown-recheck.py"],
-        "Recheck cooldown after queued permit acquisition",
-    )
-    run(
-        [sys.executable, "tools/apply-core-rate-limit-hardening.py"],
-        "Apply strict 429 and Retry-After behavior",
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-verify everything instead of reusing verdicts cached in .build/hardening-cache.",
     )
+    return parser.parse_args()
+
+
+def apply_migrations(*, dry_run: bool = False, use_cache: bool = True) -> None:
+    # Keep stdout a clean patch in dry-run mode.
+    stream = sys.stderr if dry_run else sys.stdout
+    print("\n== Apply exact-source migrations ==", file=stream)
+    for index, migration in enumerate(MIGRATIONS, start=1):
+        print(f"{index}. {migration.description}", file=stream)
+    try:
+        execute_migrations(MIGRATIONS, dry_run=dry_run, root=ROOT, use_cache=use_cache)
+    except MigrationError as exc:
+        raise PreparationError(f"Source migration failed, nothing was written: {exc}") from exc
+
+
+def main() -> int:
+    args = parse_args()
+    apply_migrations(dry_run=args.dry_run, use_cache=not args.no_cache)
+    if args.dry_run:
+        return 0
 
     run(
         [sys.executable, "tools/verify-final-hardening-source-state.py"],
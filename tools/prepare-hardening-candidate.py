@@ -4,15 +4,28 @@
 This command applies only exact-source migrations to the giant compatibility
 client, then runs the package/strict-concurrency gates. It does not commit or tag
 anything. Review the resulting diff before committing the candidate.
+
+The migrations run in-process as one transaction (see `source_migrations.py`):
+each Swift file is read once and written once, and nothing is written if any
+patch or invariant fails.
 """
 
 from __future__ import annotations
 
 from pathlib import Path
+import argparse
 import subprocess
 import sys
 
+from hardening_gate import evaluate, expand_rules, load_rules
+from hardening_migrations import CORE_RATE_LIMIT, TRANSPORT_EXTRACTION
+from source_migrations import MigrationError, execute_migrations
+from verdict_cache import VerdictCache
+
 ROOT = Path(__file__).resolve().parents[1]
+CANDIDATE_MIGRATIONS = (TRANSPORT_EXTRACTION, CORE_RATE_LIMIT)
+# Rule groups from hardening_gates.json that the prepared candidate must satisfy.
+SOURCE_STATE_GROUPS = ("prepared-client", "prepared-retry-after")
 
 
 class PreparationError(RuntimeError):
@@ -27,33 +40,47 @@ def run(command: list[str], label: str) -> None:
         raise PreparationError(f"{label} failed with exit code {proc.returncode}")
 
 
-def verify_source_state() -> None:
-    client = (ROOT / "Sources/YFinanceKit/YFinanceClient.swift").read_text(encoding="utf-8")
-    resilience = (ROOT / "Sources/YFinanceKit/YFinanceResilience.swift").read_text(encoding="utf-8")
-
-    required_client = (
-        "private let transport: any YFHTTPTransporting",
-        "self.transport = YFURLSessionTransport(session: session)",
-        "let response = try await transport.send(request)",
-        "retryAfterHeader: response.header(\"Retry-After\")",
-        "YFinanceErrorClassifier.kind(of: error) == .rateLimited",
-        "YFinanceError.rateLimited(retryAfter: retryAfter)",
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print the migrations as one unified diff and stop; writes nothing and runs no gates.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-verify everything instead of reusing verdicts cached in .build/hardening-cache.",
     )
-    for fragment in required_client:
-        if fragment not in client:
-            raise PreparationError(f"Prepared client missing expected fragment: {fragment}")
+    return parser.parse_args()
+
+
+def apply_migrations(*, dry_run: bool = False, use_cache: bool = True) -> None:
+    # Keep stdout a clean patch in dry-run mode.
+    stream = sys.stderr if dry_run else sys.stdout
+    print("\n== Apply exact-source migrations ==", file=stream)
+    for index, migration in enumerate(CANDIDATE_MIGRATIONS, start=1):
+        print(f"{index}. {migration.description}", file=stream)
+    try:
+        execute_migrations(CANDIDATE_MIGRATIONS, dry_run=dry_run, root=ROOT, use_cache=use_cache)
+    except MigrationError as exc:
+        raise PreparationError(f"Source migration failed, nothing was written: {exc}") from exc
 
-    if "session.data(for: request)" in client:
-        raise PreparationError("Prepared YFinanceClient still contains direct URLSession request I/O")
 
-    if "(error as? YFinanceError)?.retryAfter" not in resilience:
-        raise PreparationError("Prepared request coordinator does not honor Retry-After")
+def verify_source_state(*, use_cache: bool = True) -> None:
+    checks = expand_rules(load_rules(), SOURCE_STATE_GROUPS, ROOT)
+    cache = VerdictCache.for_repo(ROOT, enabled=use_cache)
+    failures = [result.message for result in evaluate(checks, ROOT, cache=cache) if not result.passed]
+    if failures:
+        raise PreparationError("Prepared source state failed:\n  - " + "\n  - ".join(failures))
 
 
 def main() -> int:
-    run([sys.executable, "tools/apply-transport-extraction.py"], "Extract URLSession transport")
-    run([sys.executable, "tools/apply-core-rate-limit-hardening.py"], "Apply strict 429/Retry-After behavior")
-    verify_source_state()
+    args = parse_args()
+    apply_migrations(dry_run=args.dry_run, use_cache=not args.no_cache)
+    if args.dry_run:
+        return 0
+    verify_source_state(use_cache=not args.no_cache)
     run(["bash", "tools/verify.sh"], "Build + offline tests")
     run(["bash", "tools/strict-concurrency.sh"], "Complete strict-concurrency audit")
 
@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+"""Discrete-event replay of recorded Yahoo request traces against limit settings.
+
+Reads ``YFDiagnosticsExport`` documents (same inputs as
+``diagnostics_analyzer.py``), turns every unique trace into a request arriving
+at its recorded ``startedAt``, and replays the whole workload once per setting
+in a grid. Two layers are modelled, as in YFinanceKit:
+
+- ``YFRequestBudgetGate`` (optional, ``--gate-concurrent``): priority classes
+  interactive > normal > background, with at most ``--max-background`` background
+  requests in flight; a request holds its gate permit for its whole life
+- ``YFRequestCoordinator``: wait out any cooldown, take one of
+  ``--max-concurrent`` FIFO permits, re-check the cooldown while holding it,
+  run the attempt, release; transient failures retry with exponential backoff
+  up to ``--max-attempts``, and a 429 opens a cooldown of
+  ``base * 2^(streak-1)`` capped at ``--max-cooldown``
+
+Per-attempt service time is the recorded duration divided by the recorded
+attempts, which includes whatever queueing the recording saw; treat results
+as relative between settings, not as absolute latency predictions.
+
+By default 429s are replayed where they were recorded. ``--upstream-rate``
+instead models Yahoo as a token bucket (rate per second, ``--upstream-burst``)
+so more concurrency can actually cause more rate limiting.
+"""
+
+from __future__ import annotations
+
+import argparse
+import collections
+import datetime as dt
+import heapq
+import itertools
+import json
+import math
+import random
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from diagnostics_analyzer import NUMERIC_DATE_MODES, iter_exports, parse_export_date
+
+PRIORITY_CLASSES = ("interactive", "normal", "background")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay recorded request traces against YFinanceKit limit settings.")
+    parser.add_argument("paths", nargs="+", help="YFDiagnosticsExport files (.json/.jsonl) or directories")
+    parser.add_argument("--output-json", default="artifacts/request_simulation.json")
+    parser.add_argument("--output-md", default="artifacts/request_simulation.md")
+    parser.add_argument("--numeric-dates", default="auto", choices=NUMERIC_DATE_MODES)
+    parser.add_argument(
+        "--priority",
+        action="append",
+        default=[],
+        metavar="ENDPOINT=CLASS",
+        help="Priority class per endpoint, e.g. quote=interactive. Repeatable; default: normal.",
+    )
+    parser.add_argument("--max-concurrent", default="2,4,8", help="Coordinator permits to try (default: 2,4,8)")
+    parser.add_argument("--gate-concurrent", default="0", help="Budget gate permits to try; 0 disables the gate")
+    parser.add_argument("--max-background", default="1", help="Background permits in the gate (default: 1)")
+    parser.add_argument("--max-attempts", default="3")
+    parser.add_argument("--base-cooldown", default="2.5", help="Seconds before the first post-429 retry window")
+    parser.add_argument("--max-cooldown", default="60")
+    parser.add_argument("--base-retry-delay", type=float, default=0.25)
+    parser.add_argument("--max-retry-delay", type=float, default=2.0)
+    parser.add_argument("--jitter-fraction", type=float, default=0.25)
+    parser.add_argument("--seed", type=int, default=0, help="Jitter seed; every setting replays the same draws")
+    parser.add_argument("--upstream-rate", type=float, default=0.0, help="Token-bucket Yahoo model, requests/second")
+    parser.add_argument("--upstream-burst", type=float, default=10.0)
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Multiply arrival gaps (0.5 = twice the load)")
+    return parser.parse_args()
+
+
+@dataclass(frozen=True)
+class TraceRequest:
+    arrival: float
+    endpoint: str
+    priority: str
+    service: float
+    attempts: int
+    outcome: str
+
+
+@dataclass(frozen=True)
+class SimSettings:
+    max_concurrent: int
+    gate_concurrent: int
+    max_background: int
+    max_attempts: int
+    base_cooldown: float
+    max_cooldown: float
+    base_retry_delay: float
+    max_retry_delay: float
+    jitter_fraction: float
+
+
+def main() -> int:
+    args = parse_args()
+    priorities = parse_priorities(args.priority)
+    requests = load_requests(
+        (Path(path) for path in args.paths),
+        priorities=priorities,
+        numeric_dates=args.numeric_dates,
+        time_scale=max(0.0, args.time_scale),
+    )
+    if not requests:
+        print("No replayable traces found.", file=sys.stderr)
+        return 2
+
+    results = []
+    for settings in settings_grid(args):
+        simulation = Simulation(
+            settings,
+            requests,
+            upstream_rate=args.upstream_rate,
+            upstream_burst=args.upstream_burst,
+            seed=args.seed,
+        )
+        results.append({"settings": asdict(settings), "metrics": simulation.run()})
+
+    report = {
+        "generated_at": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "workload": describe_workload(requests),
+        "model": {
+            "upstream": "token-bucket" if args.upstream_rate > 0 else "recorded",
+            "upstream_rate": args.upstream_rate or None,
+            "upstream_burst": args.upstream_burst if args.upstream_rate > 0 else None,
+            "time_scale": args.time_scale,
+            "seed": args.seed,
+            "priorities": priorities,
+        },
+        "results": results,
+    }
+    output_json = Path(args.output_json)
+    output_md = Path(args.output_md)
+    output_json.parent.mkdir(parents=True, exist_ok=True)
+    output_md.parent.mkdir(parents=True, exist_ok=True)
+    output_json.write_text(json.dumps(report, indent=2, sort_keys=True), encoding="utf-8")
+    output_md.write_text(render_markdown(report), encoding="utf-8")
+    print(f"Replayed {len(requests)} requests against {len(results)} settings")
+    print(f"JSON: {output_json}")
+    print(f"MD:   {output_md}")
+    return 0
+
+
+def parse_priorities(raw: List[str]) -> Dict[str, str]:
+    priorities: Dict[str, str] = {}
+    for item in raw:
+        endpoint, _, priority = item.partition("=")
+        if priority not in PRIORITY_CLASSES or not endpoint:
+            raise SystemExit(f"--priority expects ENDPOINT=interactive|normal|background, got {item!r}")
+        priorities[endpoint] = priority
+    return priorities
+
+
+def parse_grid(raw: str, cast: Callable[[str], Any]) -> List[Any]:
+    values = [cast(item.strip()) for item in raw.split(",") if item.strip()]
+    if not values:
+        raise SystemExit(f"Empty setting list: {raw!r}")
+    return values
+
+
+def settings_grid(args: argparse.Namespace) -> Iterable[SimSettings]:
+    for concurrent, gate, background, attempts, base, ceiling in itertools.product(
+        parse_grid(args.max_concurrent, int),
+        parse_grid(args.gate_concurrent, int),
+        parse_grid(args.max_background, int),
+        parse_grid(args.max_attempts, int),
+        parse_grid(args.base_cooldown, float),
+        parse_grid(args.max_cooldown, float),
+    ):
+        yield SimSettings(
+            max_concurrent=max(1, concurrent),
+            gate_concurrent=max(0, gate),
+            max_background=max(1, background),
+            max_attempts=max(1, attempts),
+            base_cooldown=max(0.0, base),
+            max_cooldown=max(base, ceiling),
+            base_retry_delay=max(0.0, args.base_retry_delay),
+            max_retry_delay=max(args.base_retry_delay, args.max_retry_delay),
+            jitter_fraction=min(max(0.0, args.jitter_fraction), 1.0),
+        )
+
+
+def load_requests(
+    paths: Iterable[Path],
+    *,
+    priorities: Dict[str, str],
+    numeric_dates: str = "auto",
+    time_scale: float = 1.0,
+) -> List[TraceRequest]:
+    """Unique, non-cancelled traces as requests, sorted by arrival offset in seconds."""
+    seen: set = set()
+    raw: List[Tuple[dt.datetime, Dict[str, Any]]] = []
+    for _, export in iter_exports(paths):
+        if export is None:
+            continue
+        for trace in export.get("traces") or []:
+            if not isinstance(trace, dict) or trace.get("outcome") == "cancelled":
+                continue
+            key = (
+                trace.get("endpoint"),
+                trace.get("resource"),
+                str(trace.get("startedAt")),
+                trace.get("durationMilliseconds"),
+                trace.get("attempts"),
+                trace.get("outcome"),
+            )
+            started_at = parse_export_date(trace.get("startedAt"), numeric_dates)
+            if key in seen or started_at is None:
+                continue
+            seen.add(key)
+            raw.append((started_at, trace))
+
+    raw.sort(key=lambda item: item[0])
+    if not raw:
+        return []
+    origin = raw[0][0]
+    requests = []
+    for started_at, trace in raw:
+        attempts = max(1, int(trace.get("attempts") or 1))
+        endpoint = str(trace.get("endpoint") or "unknown")
+        requests.append(
+            TraceRequest(
+                arrival=(started_at - origin).total_seconds() * time_scale,
+                endpoint=endpoint,
+                priority=priorities.get(endpoint, "normal"),
+                service=max(0.0, float(trace.get("durationMilliseconds") or 0) / 1000.0 / attempts),
+                attempts=attempts,
+                outcome=str(trace.get("outcome") or "success"),
+            )
+        )
+    return requests
+
+
+class Simulation:
+    """One replay of the workload under one setting; ``run()`` returns metrics."""
+
+    def __init__(
+        self,
+        settings: SimSettings,
+        requests: List[TraceRequest],
+        *,
+        upstream_rate: float = 0.0,
+        upstream_burst: float = 10.0,
+        seed: int = 0,
+    ) -> None:
+        self.settings = settings
+        self.requests = requests
+        self.upstream_rate = upstream_rate
+        self.upstream_burst = max(1.0, upstream_burst)
+        self.random = random.Random(seed)
+
+        self.now = 0.0
+        self.events: List[Tuple[float, int, Callable[[], None]]] = []
+        self.sequence = itertools.count()
+
+        # YFRequestBudgetGate
+        self.gate_active = 0
+        self.gate_background = 0
+        self.gate_waiters: Dict[str, Deque[Callable[[], None]]] = {p: collections.deque() for p in PRIORITY_CLASSES}
+        # YFRequestCoordinator
+        self.active = 0
+        self.permit_waiters: Deque[Callable[[], None]] = collections.deque()
+        self.cooldown_until: Optional[float] = None
+        self.rate_limit_streak = 0
+        self.cooldown_intervals: List[Tuple[float, float]] = []
+        # Upstream token bucket
+        self.tokens = self.upstream_burst
+        self.tokens_at = 0.0
+
+        self.latencies: Dict[str, List[float]] = {p: [] for p in PRIORITY_CLASSES}
+        self.queue_waits: List[float] = []
+        self.outcomes: Dict[str, int] = collections.Counter()
+        self.attempts = 0
+        self.retries = 0
+        self.max_queue = 0
+        self.last_completion = 0.0
+
+    def schedule(self, at: float, action: Callable[[], None]) -> None:
+        heapq.heappush(self.events, (at, next(self.sequence), action))
+
+    def run(self) -> Dict[str, Any]:
+        for request in self.requests:
+            self.schedule(request.arrival, lambda request=request: self.arrive(request))
+        while self.events:
+            self.now, _, action = heapq.heappop(self.events)
+            action()
+        return self.metrics()
+
+    # Budget gate -------------------------------------------------------
+
+    def arrive(self, request: TraceRequest) -> None:
+        state = {"arrival": self.now, "attempt": 0, "first_start": None}
+        proceed = lambda: self.coordinator_begin(request, state)  # noqa: E731
+        if self.settings.gate_concurrent <= 0:
+            proceed()
+        elif self.gate_can_start(request.priority):
+            self.gate_mark_started(request.priority)
+            proceed()
+        else:
+            self.gate_waiters[request.priority].append(proceed)
+            self.note_queue()
+
+    def gate_can_start(self, priority: str) -> bool:
+        if self.gate_active >= self.settings.gate_concurrent:
+            return False
+        return priority != "background" or self.gate_background < self.settings.max_background
+
+    def gate_mark_started(self, priority: str) -> None:
+        self.gate_active += 1
+        if priority == "background":
+            self.gate_background += 1
+
+    def gate_release(self, priority: str) -> None:
+        if self.settings.gate_concurrent <= 0:
+            return
+        self.gate_active = max(0, self.gate_active - 1)
+        if priority == "background":
+            self.gate_background = max(0, self.gate_background - 1)
+        while self.gate_active < self.settings.gate_concurrent:
+            for candidate in PRIORITY_CLASSES:
+                if candidate == "background" and self.gate_background >= self.settings.max_background:
+                    continue
+                if self.gate_waiters[candidate]:
+                    self.gate_mark_started(candidate)
+                    self.gate_waiters[candidate].popleft()()
+                    break
+            else:
+                return
+
+    # Coordinator -------------------------------------------------------
+
+    def coordinator_begin(self, request: TraceRequest, state: Dict[str, Any]) -> None:
+        self.after_cooldown(lambda: self.acquire_permit(request, state))
+
+    def after_cooldown(self, then: Callable[[], None]) -> None:
+        if self.cooldown_until is not None and self.now < self.cooldown_until:
+            self.schedule(self.cooldown_until, lambda: self.after_cooldown(then))
+            return
+        self.cooldown_until = None
+        then()
+
+    def acquire_permit(self, request: TraceRequest, state: Dict[str, Any]) -> None:
+        # Cooldown may open while queued for a permit; recheck while holding it.
+        start = lambda: self.after_cooldown(lambda: self.start_attempt(request, state))  # noqa: E731
+        if self.active < self.settings.max_concurrent:
+            self.active += 1
+            start()
+        else:
+            self.permit_waiters.append(start)
+            self.note_queue()
+
+    def release_permit(self) -> None:
+        if self.permit_waiters:
+            self.permit_waiters.popleft()()
+            return
+        self.active = max(0, self.active - 1)
+
+    def start_attempt(self, request: TraceRequest, state: Dict[str, Any]) -> None:
+        state["attempt"] += 1
+        self.attempts += 1
+        if state["first_start"] is None:
+            state["first_start"] = self.now
+            self.queue_waits.append(self.now - state["arrival"])
+        outcome = self.attempt_outcome(request, state["attempt"])
+        self.schedule(self.now + request.service, lambda: self.finish_attempt(request, state, outcome))
+
+    def attempt_outcome(self, request: TraceRequest, attempt: int) -> str:
+        if self.upstream_rate > 0:
+            self.tokens = min(
+                self.upstream_burst, self.tokens + (self.now - self.tokens_at) * self.upstream_rate
+            )
+            self.tokens_at = self.now
+            if self.tokens < 1.0:
+                return "rateLimited"
+            self.tokens -= 1.0
+            if attempt < request.attempts:
+                return "transient"
+            return "success" if request.outcome == "rateLimited" else request.outcome
+        if attempt < request.attempts:
+            return "transient"
+        return request.outcome
+
+    def finish_attempt(self, request: TraceRequest, state: Dict[str, Any], outcome: str) -> None:
+        self.release_permit()
+        if outcome == "success":
+            self.rate_limit_streak = 0
+            self.complete(request, state, "success")
+        elif outcome == "rateLimited":
+            self.rate_limit_streak += 1
+            self.open_cooldown()
+            self.complete(request, state, "rateLimited")
+        elif outcome == "transient" and state["attempt"] < self.settings.max_attempts:
+            self.retries += 1
+            delay = self.jittered(
+                min(self.settings.max_retry_delay, self.settings.base_retry_delay * 2 ** (state["attempt"] - 1))
+            )
+            self.schedule(self.now + delay, lambda: self.coordinator_begin(request, state))
+        else:
+            self.complete(request, state, "failure")
+
+    def open_cooldown(self) -> None:
+        exponent = max(0, min(self.rate_limit_streak - 1, 8))
+        base = min(self.settings.max_cooldown, self.settings.base_cooldown * 2**exponent)
+        proposed = self.now + min(self.settings.max_cooldown, self.jittered(base))
+        if self.cooldown_until is None or proposed > self.cooldown_until:
+            self.cooldown_until = proposed
+            self.cooldown_intervals.append((self.now, proposed))
+
+    def jittered(self, base: float) -> float:
+        width = base * self.settings.jitter_fraction
+        return base + (self.random.uniform(0.0, width) if width > 0 else 0.0)
+
+    def complete(self, request: TraceRequest, state: Dict[str, Any], outcome: str) -> None:
+        self.outcomes[outcome] += 1
+        self.latencies[request.priority].append(self.now - state["arrival"])
+        self.last_completion = max(self.last_completion, self.now)
+        self.gate_release(request.priority)
+
+    def note_queue(self) -> None:
+        depth = len(self.permit_waiters) + sum(len(waiters) for waiters in self.gate_waiters.values())
+        self.max_queue = max(self.max_queue, depth)
+
+    # Metrics -----------------------------------------------------------
+
+    def metrics(self) -> Dict[str, Any]:
+        everything = sorted(value for values in self.latencies.values() for value in values)
+        makespan = self.last_completion - (self.requests[0].arrival if self.requests else 0.0)
+        return {
+            "requests": len(self.requests),
+            "succeeded": self.outcomes["success"],
+            "rate_limited": self.outcomes["rateLimited"],
+            "failed": self.outcomes["failure"],
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "makespan_sec": round(makespan, 3),
+            "throughput_per_sec": round(self.outcomes["success"] / makespan, 3) if makespan > 0 else None,
+            "latency_ms": latency_summary(everything),
+            "latency_ms_by_priority": {
+                priority: latency_summary(sorted(values))
+                for priority, values in self.latencies.items()
+                if values
+            },
+            "queue_wait_ms": latency_summary(sorted(self.queue_waits)),
+            "max_queue_depth": self.max_queue,
+            "cooldown_sec": round(union_length(self.cooldown_intervals), 3),
+        }
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, math.ceil(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def latency_summary(sorted_seconds: List[float]) -> Dict[str, Any]:
+    def ms(value: Optional[float]) -> Optional[float]:
+        return None if value is None else round(value * 1000.0, 1)
+
+    return {
+        "count": len(sorted_seconds),
+        "p50": ms(percentile(sorted_seconds, 0.50)),
+        "p95": ms(percentile(sorted_seconds, 0.95)),
+        "p99": ms(percentile(sorted_seconds, 0.99)),
+        "max": ms(sorted_seconds[-1] if sorted_seconds else None),
+    }
+
+
+def union_length(intervals: List[Tuple[float, float]]) -> float:
+    total = 0.0
+    current: Optional[List[float]] = None
+    for start, end in sorted(intervals):
+        if current is not None and start <= current[1]:
+            current[1] = max(current[1], end)
+            continue
+        if current is not None:
+            total += current[1] - current[0]
+        current = [start, end]
+    if current is not None:
+        total += current[1] - current[0]
+    return total
+
+
+def describe_workload(requests: List[TraceRequest]) -> Dict[str, Any]:
+    by_endpoint: Dict[str, int] = collections.Counter(request.endpoint for request in requests)
+    by_priority: Dict[str, int] = collections.Counter(request.priority for request in requests)
+    span = requests[-1].arrival - requests[0].arrival if requests else 0.0
+    return {
+        "requests": len(requests),
+        "span_sec": round(span, 3),
+        "arrival_rate_per_sec": round(len(requests) / span, 3) if span > 0 else None,
+        "recorded_rate_limited": sum(1 for request in requests if request.outcome == "rateLimited"),
+        "recorded_retried": sum(1 for request in requests if request.attempts > 1),
+        "recorded_service_ms": latency_summary(sorted(request.service for request in requests)),
+        "by_endpoint": dict(sorted(by_endpoint.items())),
+        "by_priority": dict(sorted(by_priority.items())),
+    }
+
+
+def render_markdown(report: Dict[str, Any]) -> str:
+    workload = report.get("workload", {})
+    model = report.get("model", {})
+    lines: List[str] = []
+    lines.append("# YFinanceKit Request Simulation")
+    lines.append("")
+    lines.append(f"- Generated: `{report.get('generated_at', '')}`")
+    lines.append(
+        f"- Workload: requests={workload.get('requests', 0)} span={workload.get('span_sec', 0)}s "
+        f"arrival_rate={workload.get('arrival_rate_per_sec')}/s "
+        f"recorded_rate_limited={workload.get('recorded_rate_limited', 0)} "
+        f"recorded_retried={workload.get('recorded_retried', 0)}"
+    )
+    lines.append(
+        f"- Model: upstream=`{model.get('upstream')}` rate={model.get('upstream_rate')} "
+        f"burst={model.get('upstream_burst')} time_scale={model.get('time_scale')} seed={model.get('seed')}"
+    )
+    lines.append("")
+    lines.append("## Settings")
+    lines.append("")
+    lines.append(
+        "| Permits | Gate | Background | Attempts | Cooldown base..max s | OK | 429 | Failed | Throughput/s "
+        "| p50 ms | p95 ms | p99 ms | Interactive p95 ms | Max queue | Cooldown total s |"
+    )
+    lines.append("|---:|---:|---:|---:|---|---:|---:|---:|---:|---:|---:|---:|---:|---:|---:|")
+    for entry in report.get("results", []):
+        settings = entry["settings"]
+        metrics = entry["metrics"]
+        latency = metrics["latency_ms"]
+        interactive = metrics["latency_ms_by_priority"].get("interactive", {}).get("p95")
+        lines.append(
+            f"| {settings['max_concurrent']} | {settings['gate_concurrent'] or '-'} | {settings['max_background']} "
+            f"| {settings['max_attempts']} | {settings['base_cooldown']:g}..{settings['max_cooldown']:g} "
+            f"| {metrics['succeeded']} | {metrics['rate_limited']} | {metrics['failed']} "
+            f"| {metrics['throughput_per_sec']} | {latency['p50']} | {latency['p95']} | {latency['p99']} "
+            f"| {interactive if interactive is not None else '-'} | {metrics['max_queue_depth']} "
+            f"| {metrics['cooldown_sec']} |"
+        )
+    return "\n".join(lines).rstrip() + "\n"
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
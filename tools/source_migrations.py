@@ -0,0 +1,326 @@
+"""Shared engine for the exact-source Swift migrations.
+
+A migration is data: ordered `Patch` specs (old/new/identity, as the original
+`replace_once` helpers used) plus `Requirement` checks on the result. The
+engine loads each target file once, applies every pending patch in memory in
+order, checks every migration's requirements against the in-memory state right
+after its patches, and only then writes the changed files. Nothing touches
+disk unless the whole pass succeeds; each file is replaced atomically.
+
+`--dry-run` (see `preview_migrations`) plans the same pass and prints one
+git-style unified diff instead of writing; every hunk header names the
+migration patches that produced it.
+
+With a `VerdictCache`, a migration list already verified as fully applied
+against the exact same file contents is skipped without reading the sources.
+
+Specs for the hardening candidate live in `hardening_migrations.py`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+import difflib
+import os
+import re
+import sys
+import tempfile
+
+from verdict_cache import VerdictCache, digest_json, digest_text
+
+ROOT = Path(__file__).resolve().parents[1]
+HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+class MigrationError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class Patch:
+    """Replace `old` with `new` unless `identity` shows it is already applied.
+
+    `count` is the exact number of `old` occurrences to replace; the patch is
+    considered applied once `identity` occurs at least `count` times. A patch
+    whose every `skip_when` fragment is present is already satisfied by an
+    earlier migration. An `optional` patch is skipped when `old` is absent.
+    """
+
+    label: str
+    target: str
+    old: str
+    new: str
+    identity: str
+    count: int = 1
+    skip_when: tuple[str, ...] = ()
+    optional: bool = False
+
+
+@dataclass(frozen=True)
+class Requirement:
+    """The summed occurrences of `fragments` in `target` must stay within bounds.
+
+    Several fragments express "any of"; `maximum=0` forbids a fragment.
+    """
+
+    target: str
+    fragments: tuple[str, ...]
+    message: str
+    minimum: int = 1
+    maximum: int | None = None
+
+
+@dataclass(frozen=True)
+class Migration:
+    name: str
+    description: str
+    patches: tuple[Patch, ...]
+    requirements: tuple[Requirement, ...] = ()
+    applied_message: str = ""
+    noop_message: str = ""
+
+    @property
+    def targets(self) -> tuple[str, ...]:
+        return tuple(dict.fromkeys(patch.target for patch in self.patches))
+
+
+@dataclass(frozen=True)
+class AppliedPatch:
+    migration: str
+    label: str
+    target: str
+    new: str
+    identity: str
+
+    @property
+    def attribution(self) -> str:
+        return f"{self.migration}: {self.label}"
+
+
+@dataclass
+class MigrationResult:
+    root: Path
+    originals: dict[str, str] = field(default_factory=dict)
+    texts: dict[str, str] = field(default_factory=dict)
+    applied: list[AppliedPatch] = field(default_factory=list)
+    cached: bool = False
+
+    @property
+    def changed_targets(self) -> list[str]:
+        return [target for target, text in self.texts.items() if text != self.originals[target]]
+
+    def changed_by(self, migration: Migration) -> bool:
+        return any(record.migration == migration.name for record in self.applied)
+
+
+def apply_patch(text: str, patch: Patch) -> tuple[str, bool]:
+    if patch.skip_when and all(fragment in text for fragment in patch.skip_when):
+        return text, False
+    if text.count(patch.identity) >= patch.count:
+        return text, False
+    found = text.count(patch.old)
+    if found == 0 and patch.optional:
+        return text, False
+    if found != patch.count:
+        expected = "pattern" if patch.count == 1 else f"{patch.count} occurrences of the pattern"
+        raise MigrationError(
+            f"Expected {expected} for {patch.label!r} in {patch.target}, found {found} "
+            f"(identity {patch.identity!r} present {text.count(patch.identity)} times)"
+        )
+    return text.replace(patch.old, patch.new, patch.count), True
+
+
+def check_requirement(text: str, requirement: Requirement) -> None:
+    found = sum(text.count(fragment) for fragment in requirement.fragments)
+    if found < requirement.minimum or (requirement.maximum is not None and found > requirement.maximum):
+        raise MigrationError(requirement.message)
+
+
+def migration_targets(migrations: list[Migration] | tuple[Migration, ...]) -> list[str]:
+    targets = [patch.target for migration in migrations for patch in migration.patches]
+    targets += [requirement.target for migration in migrations for requirement in migration.requirements]
+    return list(dict.fromkeys(targets))
+
+
+def clean_verdict_key(
+    cache: VerdictCache, migrations: list[Migration] | tuple[Migration, ...], digests: dict[str, str]
+) -> str:
+    return cache.key("source-migrations", digest_json([asdict(migration) for migration in migrations]), digests)
+
+
+def cached_clean(cache: VerdictCache | None, migrations: list[Migration] | tuple[Migration, ...]) -> bool:
+    if cache is None or not cache.enabled:
+        return False
+    digests = {target: cache.file_sha256(target) for target in migration_targets(migrations)}
+    if any(digest is None for digest in digests.values()):
+        return False
+    return cache.load(clean_verdict_key(cache, migrations, digests)) == "clean"
+
+
+def remember_clean(
+    cache: VerdictCache | None, migrations: list[Migration] | tuple[Migration, ...], result: MigrationResult
+) -> None:
+    """Record that `result.texts` (as now on disk) need no further migration."""
+    if cache is None or not cache.enabled:
+        return
+    digests = {target: digest_text(result.texts[target]) for target in migration_targets(migrations)}
+    for target in result.changed_targets:
+        cache.remember(target, digests[target])
+    cache.store(clean_verdict_key(cache, migrations, digests), "clean")
+    cache.save()
+
+
+def plan_migrations(
+    migrations: list[Migration] | tuple[Migration, ...],
+    *,
+    root: Path = ROOT,
+    cache: VerdictCache | None = None,
+) -> MigrationResult:
+    """Apply `migrations` in order in memory; raises `MigrationError` on drift."""
+    if cached_clean(cache, migrations):
+        return MigrationResult(root=root, cached=True)
+    result = MigrationResult(root=root)
+    for migration in migrations:
+        for patch in migration.patches:
+            text = load_target(result, patch.target)
+            text, did = apply_patch(text, patch)
+            if did:
+                result.texts[patch.target] = text
+                result.applied.append(
+                    AppliedPatch(migration.name, patch.label, patch.target, patch.new, patch.identity)
+                )
+        for requirement in migration.requirements:
+            check_requirement(load_target(result, requirement.target), requirement)
+    return result
+
+
+def load_target(result: MigrationResult, target: str) -> str:
+    if target not in result.texts:
+        path = result.root / target
+        try:
+            text = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            raise MigrationError(f"Migration target not found: {target}") from None
+        result.originals[target] = text
+        result.texts[target] = text
+    return result.texts[target]
+
+
+def write_result(result: MigrationResult) -> list[str]:
+    """Write every changed target; all temp files are staged before any replace."""
+    staged: list[tuple[Path, Path]] = []
+    try:
+        for target in result.changed_targets:
+            path = result.root / target
+            handle, temp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+            temp = Path(temp_name)
+            staged.append((temp, path))
+            with os.fdopen(handle, "w", encoding="utf-8", newline="") as stream:
+                stream.write(result.texts[target])
+            os.chmod(temp, path.stat().st_mode & 0o7777)
+        for temp, path in staged:
+            os.replace(temp, path)
+    finally:
+        for temp, _ in staged:
+            temp.unlink(missing_ok=True)
+    return result.changed_targets
+
+
+def run_migrations(
+    migrations: list[Migration] | tuple[Migration, ...],
+    *,
+    root: Path = ROOT,
+    cache: VerdictCache | None = None,
+) -> MigrationResult:
+    """Plan, verify and write `migrations` as one transaction, printing a line each."""
+    result = plan_migrations(migrations, root=root, cache=cache)
+    if not result.cached:
+        write_result(result)
+        remember_clean(cache, migrations, result)
+    for migration in migrations:
+        if result.changed_by(migration):
+            print(migration.applied_message or f"Applied {migration.name}.")
+        else:
+            print(migration.noop_message or f"{migration.name} already applied.")
+    return result
+
+
+def patch_line_spans(text: str, record: AppliedPatch) -> list[tuple[int, int]]:
+    """1-based inclusive line spans of `record` in the final text.
+
+    A later patch may rewrite part of an earlier patch's output, so fall back
+    to the identity fragment when the full replacement text is gone.
+    """
+    spans = []
+    for fragment in (record.new, record.identity):
+        start = text.find(fragment)
+        while start >= 0:
+            first = text.count("\n", 0, start) + 1
+            spans.append((first, first + fragment.rstrip("\n").count("\n")))
+            start = text.find(fragment, start + len(fragment))
+        if spans:
+            break
+    return spans
+
+
+def render_diff(result: MigrationResult, *, context: int = 3) -> str:
+    """One unified diff of every changed target with per-hunk patch attribution."""
+    chunks: list[str] = []
+    for target in result.changed_targets:
+        final = result.texts[target]
+        spans = [
+            (record.attribution, span)
+            for record in result.applied
+            if record.target == target
+            for span in patch_line_spans(final, record)
+        ]
+        lines = difflib.unified_diff(
+            result.originals[target].splitlines(keepends=True),
+            final.splitlines(keepends=True),
+            fromfile=f"a/{target}",
+            tofile=f"b/{target}",
+            n=context,
+        )
+        for line in lines:
+            match = HUNK_HEADER.match(line)
+            if match:
+                first = int(match.group(1))
+                last = first + max(int(match.group(2) or 1), 1) - 1
+                names = dict.fromkeys(name for name, (start, end) in spans if start <= last and end >= first)
+                line = f"{match.group(0)} {'; '.join(names) or 'unattributed'}\n"
+            elif not line.endswith("\n"):
+                line += "\n\\ No newline at end of file\n"
+            chunks.append(line)
+    return "".join(chunks)
+
+
+def preview_migrations(
+    migrations: list[Migration] | tuple[Migration, ...],
+    *,
+    root: Path = ROOT,
+    cache: VerdictCache | None = None,
+) -> MigrationResult:
+    """Plan `migrations` without writing; diff to stdout, summary to stderr."""
+    result = plan_migrations(migrations, root=root, cache=cache)
+    sys.stdout.write(render_diff(result))
+    print(
+        f"Dry run: {len(result.applied)} patches would change {len(result.changed_targets)} files; nothing written.",
+        file=sys.stderr,
+    )
+    for record in result.applied:
+        print(f"  {record.target}: {record.attribution}", file=sys.stderr)
+    return result
+
+
+def execute_migrations(
+    migrations: list[Migration] | tuple[Migration, ...],
+    *,
+    dry_run: bool = False,
+    root: Path = ROOT,
+    use_cache: bool = True,
+) -> MigrationResult:
+    cache = VerdictCache.for_repo(root, enabled=use_cache)
+    if dry_run:
+        return preview_migrations(migrations, root=root, cache=cache)
+    return run_migrations(migrations, root=root, cache=cache)
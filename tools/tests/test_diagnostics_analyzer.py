@@ -0,0 +1,53 @@
+"""Counter totals of cumulative and windowed diagnostics exports."""
+
+from __future__ import annotations
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from diagnostics_analyzer import DiagnosticsAnalyzer, export_sequence  # noqa: E402
+
+
+def export(logical: int, attempts: int, retries: int) -> dict:
+    return {"logicalRequests": logical, "attempts": attempts, "retries": retries, "traces": []}
+
+
+class CounterModeTests(unittest.TestCase):
+    def totals(self, exports: list, *, mode: str) -> dict:
+        analyzer = DiagnosticsAnalyzer(counter_mode=mode)
+        for sequence, document in exports:
+            analyzer.add_export(document, sequence=sequence)
+        return analyzer.result()
+
+    def test_cumulative_exports_add_only_their_growth(self) -> None:
+        result = self.totals([("app", export(10, 12, 2)), ("app", export(30, 40, 10))], mode="cumulative")
+        self.assertEqual(
+            (result["totals"]["logicalRequests"], result["totals"]["attempts"], result["totals"]["retries"]),
+            (30, 40, 10),
+        )
+        self.assertEqual(result["totals"]["retry_rate"], 0.25)
+
+    def test_counter_drop_is_a_restart(self) -> None:
+        exports = [("app", export(10, 12, 2)), ("app", export(30, 40, 10)), ("app", export(5, 5, 0))]
+        result = self.totals(exports, mode="cumulative")
+        self.assertEqual(result["totals"]["logicalRequests"], 35)
+        self.assertEqual(result["inputs"]["restarts"], 1)
+
+    def test_sequences_are_tracked_separately(self) -> None:
+        exports = [("a", export(10, 10, 0)), ("b", export(4, 4, 0)), ("a", export(12, 12, 0))]
+        self.assertEqual(self.totals(exports, mode="cumulative")["totals"]["logicalRequests"], 16)
+
+    def test_windowed_exports_are_summed(self) -> None:
+        exports = [("cli", export(10, 12, 2)), ("cli", export(30, 40, 10))]
+        self.assertEqual(self.totals(exports, mode="windowed")["totals"]["logicalRequests"], 40)
+
+    def test_sequence_of_jsonl_line_and_json_file(self) -> None:
+        self.assertEqual(export_sequence("runs/app.jsonl:17"), "runs/app.jsonl")
+        self.assertEqual(export_sequence("runs/app/0001.json"), "runs/app")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""Fixture archive matching: exact hits, near misses and identity misses."""
+
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from parity_fixtures import FixtureArchive, FixtureArchiveWriter, normalize_request  # noqa: E402
+
+
+class FixtureLookupTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.writer = FixtureArchiveWriter(self.root)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def record(self, target: str, payload: object, *, method: str = "GET", body: bytes | None = None) -> None:
+        request = normalize_request(method, target, body)
+        self.writer.record(request, status=200, content_type="application/json", body=json.dumps(payload).encode())
+
+    def lookup(self, target: str, *, method: str = "GET", body: bytes | None = None) -> object:
+        self.writer.flush()
+        response = FixtureArchive(self.root).lookup(normalize_request(method, target, body))
+        return None if response is None else json.loads(response.body)
+
+    def test_near_miss_for_same_symbol_replays_recording(self) -> None:
+        self.record("/v7/finance/quote?symbols=AAPL&lang=en-US&region=US&formatted=false", {"symbol": "AAPL"})
+        self.assertEqual(self.lookup("/v7/finance/quote?symbols=AAPL&lang=en-US&region=US"), {"symbol": "AAPL"})
+
+    def test_other_symbol_is_a_miss_despite_shared_params(self) -> None:
+        self.record("/v7/finance/quote?symbols=AAPL&lang=en-US&region=US", {"symbol": "AAPL"})
+        self.assertIsNone(self.lookup("/v7/finance/quote?symbols=VOD.L&lang=en-US&region=US"))
+
+    def test_other_ticker_in_query_body_is_a_miss(self) -> None:
+        def body(ticker: str, offset: int) -> bytes:
+            query = {"operator": "eq", "operands": ["ticker", ticker]}
+            return json.dumps({"query": query, "offset": offset, "size": 12}).encode()
+
+        target = "/v1/finance/visualization?lang=en-US&region=US"
+        self.record(target, {"ticker": "AAPL"}, method="POST", body=body("AAPL", 0))
+        self.assertEqual(self.lookup(target, method="POST", body=body("AAPL", 12)), {"ticker": "AAPL"})
+        self.assertIsNone(self.lookup(target, method="POST", body=body("MSFT", 0)))
+
+    def test_archive_without_identity_field_still_refuses_other_symbols(self) -> None:
+        self.record("/v7/finance/quote?symbols=AAPL&lang=en-US", {"symbol": "AAPL"})
+        self.writer.flush()
+        index_path = self.root / "index.json"
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+        for entry in index["entries"]:
+            del entry["identity"]
+        index_path.write_text(json.dumps(index), encoding="utf-8")
+        archive = FixtureArchive(self.root)
+        self.assertIsNone(archive.lookup(normalize_request("GET", "/v7/finance/quote?symbols=VOD.L&lang=en-US")))
+        self.assertIsNotNone(archive.lookup(normalize_request("GET", "/v7/finance/quote?symbols=AAPL")))
+
+
+if __name__ == "__main__":
+    unittest.main()
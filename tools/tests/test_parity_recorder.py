@@ -0,0 +1,80 @@
+"""Recorder forwarding: each request goes to the Yahoo host its client meant."""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+import unittest
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import List, Optional, Tuple
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import parity_recorder  # noqa: E402
+from parity_fixtures import FixtureArchive, normalize_request  # noqa: E402
+from parity_standin import rewrite_yahoo_url  # noqa: E402
+
+
+class FakeUpstream:
+    """Answers like Yahoo: ``/xhr/*`` only exists on finance.yahoo.com."""
+
+    calls: List[Tuple[Optional[str], str]] = []
+
+    def __init__(self, upstream: str) -> None:
+        self.upstream = upstream
+
+    def forward(
+        self, method: str, host: Optional[str], target: str, body: Optional[bytes], content_type: Optional[str]
+    ) -> Tuple[int, str, bytes]:
+        self.calls.append((host, target))
+        served_by = host or "query2.finance.yahoo.com"
+        if target.startswith("/xhr/") and served_by != "finance.yahoo.com":
+            return 404, "application/json", b'{"error": "not found"}'
+        return 200, "application/json", f'{{"host": "{served_by}"}}'.encode("utf-8")
+
+
+class RecorderHostTests(unittest.TestCase):
+    def setUp(self) -> None:
+        FakeUpstream.calls = []
+        patch = mock.patch.object(parity_recorder, "UpstreamSession", FakeUpstream)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.server = parity_recorder.start_recorder(self.root)
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def fetch(self, url: str) -> int:
+        try:
+            with urllib.request.urlopen(url, timeout=10) as response:
+                return response.status
+        except urllib.error.HTTPError as exc:
+            return exc.code
+
+    def test_root_host_request_is_forwarded_to_its_host(self) -> None:
+        url = rewrite_yahoo_url("https://finance.yahoo.com/xhr/ncp?queryRef=latestNews", self.server.base_url)
+        self.assertEqual(self.fetch(url), 200)
+        self.assertEqual(FakeUpstream.calls, [("finance.yahoo.com", "/xhr/ncp?queryRef=latestNews")])
+        self.server.writer.flush()
+        response = FixtureArchive(self.root).lookup(normalize_request("GET", "/xhr/ncp?queryRef=latestNews"))
+        self.assertIsNotNone(response)
+        self.assertEqual(response.body, b'{"host": "finance.yahoo.com"}')
+
+    def test_hostless_404_is_not_recorded(self) -> None:
+        self.assertEqual(self.fetch(f"{self.server.base_url}/xhr/ncp?queryRef=latestNews"), 404)
+        self.assertEqual(self.server.writer.summary()["recorded"], 0)
+
+    def test_non_yahoo_host_is_refused(self) -> None:
+        self.assertEqual(self.fetch(f"{self.server.base_url}/__host/example.com/v7/finance/quote"), 400)
+        self.assertEqual(FakeUpstream.calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,224 @@
+"""Scenario report lookup for copied, archived and sharded matrix aggregates.
+
+Run with ``python3 -m unittest discover -s tools/tests`` (``tools/verify.sh``
+does). Everything runs offline; tests that drive ``parity_matrix.py`` load the
+real harness with a canned ``run_harness`` and are skipped when the harness's
+Python dependencies are not installed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import parity_matrix  # noqa: E402
+import parity_merge  # noqa: E402
+from parity_diff import diff_sides, load_side  # noqa: E402
+from parity_ledger import ingest_paths, open_ledger  # noqa: E402
+from parity_merge import collect_scenario  # noqa: E402
+from parity_rescore import scenario_report_path  # noqa: E402
+
+
+def symbol_report(symbol: str, status: str) -> dict:
+    return {
+        "symbol": symbol,
+        "status": status,
+        "comparisons": {
+            "history": {"status": status, "summary": "", "metrics": {"avg_close_rel_diff": 0.001}, "issues": []},
+        },
+    }
+
+
+def write_run(directory: Path, package: Path, statuses: dict, *, scenario: str = "europe", **fields: object) -> Path:
+    """Write a one-scenario matrix run the way older aggregates did (package-relative report path)."""
+    directory.mkdir(parents=True, exist_ok=True)
+    symbols = [symbol_report(symbol, status) for symbol, status in statuses.items()]
+    report = {"generated_at": str(directory), "config": {}, "summary": {}, "symbols": symbols}
+    (directory / f"{scenario}.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
+    aggregate = {
+        **fields,
+        "package_path": str(package),
+        "scenarios": [
+            {
+                "name": scenario,
+                "symbols": list(statuses),
+                "summary": {"total": len(statuses)},
+                "json": f"artifacts/parity-matrix/{scenario}.json",
+            }
+        ],
+    }
+    path = directory / "aggregate.json"
+    path.write_text(json.dumps(aggregate, indent=2), encoding="utf-8")
+    return path
+
+
+class ScenarioReportPathTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.package = Path(self.tmp.name)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_prefers_report_next_to_aggregate(self) -> None:
+        write_run(self.package / "artifacts" / "parity-matrix", self.package, {"A": "fail"})
+        baseline = write_run(self.package / "artifacts" / "baseline", self.package, {"A": "pass"})
+        found = scenario_report_path(
+            "artifacts/parity-matrix/europe.json", package=self.package, aggregate_dir=baseline.parent
+        )
+        self.assertEqual(found, baseline.parent / "europe.json")
+
+    def test_falls_back_to_package_path_for_legacy_aggregates(self) -> None:
+        current = write_run(self.package / "artifacts" / "parity-matrix", self.package, {"A": "pass"})
+        moved = self.package / "elsewhere"
+        moved.mkdir()
+        found = scenario_report_path("artifacts/parity-matrix/europe.json", package=self.package, aggregate_dir=moved)
+        self.assertEqual(found, current.parent / "europe.json")
+
+    def test_diff_against_copied_baseline_sees_regression(self) -> None:
+        baseline = write_run(self.package / "artifacts" / "baseline", self.package, {"A": "pass", "B": "pass"})
+        current = write_run(self.package / "artifacts" / "parity-matrix", self.package, {"A": "pass", "B": "fail"})
+        old, _ = load_side(baseline)
+        new, _ = load_side(current)
+        changes = diff_sides(old, new, rel_threshold=0.1, abs_threshold=1e-3)
+        regressions = [(change.symbol, change.before, change.after) for change in changes if change.kind == "regression"]
+        self.assertEqual(regressions, [("B", "pass", "fail")])
+
+    def test_equal_severity_status_change_is_not_a_regression(self) -> None:
+        baseline = write_run(self.package / "artifacts" / "baseline", self.package, {"A": "warn"})
+        current = write_run(self.package / "artifacts" / "parity-matrix", self.package, {"A": "skip"})
+        changes = diff_sides(load_side(baseline)[0], load_side(current)[0], rel_threshold=0.1, abs_threshold=1e-3)
+        self.assertEqual({change.kind for change in changes}, {"changed"})
+
+
+class LedgerIngestTests(unittest.TestCase):
+    def test_relocated_aggregate_ingests_its_own_reports(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            package = Path(tmp)
+            archived = write_run(
+                package / "artifacts" / "archive" / "c1", package, {"A": "pass"}, package_commit="c1"
+            )
+            current = write_run(
+                package / "artifacts" / "parity-matrix", package, {"A": "fail"}, package_commit="c2"
+            )
+            db = package / "ledger.sqlite3"
+            conn = open_ledger(db)
+            args = argparse.Namespace(
+                paths=[str(archived), str(current)], commit=None, yfinance=None, scenario=None, db=str(db)
+            )
+            with conn, contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(ingest_paths(conn, args), 0)
+            rows = conn.execute(
+                "SELECT runs.package_commit, results.status FROM results JOIN runs ON runs.id = results.run_id "
+                "WHERE results.symbol = 'A' AND results.operation = 'symbol' ORDER BY runs.package_commit"
+            ).fetchall()
+            conn.close()
+        self.assertEqual(rows, [("c1", "pass"), ("c2", "fail")])
+
+
+class ShardMergeTests(unittest.TestCase):
+    def test_shards_sharing_a_package_path_keep_their_own_reports(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            package = Path(tmp)
+            # This host also ran shard 1 into the default output directory.
+            write_run(package / "artifacts" / "parity-matrix", package, {"A": "pass"})
+            first = write_run(package / "shards" / "1", package, {"A": "pass"})
+            second = write_run(package / "shards" / "2", package, {"B": "fail"})
+            shards = [(path, json.loads(path.read_text(encoding="utf-8"))) for path in (first, second)]
+            collected = collect_scenario("europe", shards)
+        statuses = {symbol: report["status"] for symbol, report in collected.symbols.items()}
+        self.assertEqual(statuses, {"A": "pass", "B": "fail"})
+        self.assertFalse(collected.crashed)
+
+
+HARNESS_DEPENDENCIES = ("numpy", "pandas", "yfinance")
+PACKAGE = Path(__file__).resolve().parents[2]
+
+
+@unittest.skipUnless(
+    all(importlib.util.find_spec(name) for name in HARNESS_DEPENDENCIES),
+    "parity harness dependencies are not installed",
+)
+class ShardRerunTests(unittest.TestCase):
+    """A rerun of one shard must still merge with the other shards."""
+
+    scenario = "crypto-fx"
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.statuses: dict[str, str] = {}
+        real_load = parity_matrix.load_harness
+
+        def load(path: Path):
+            harness = real_load(path)
+
+            def run_harness(**kwargs: object) -> dict:
+                symbols = [symbol_report(symbol, self.statuses.get(symbol, "pass")) for symbol in kwargs["symbols"]]
+                return {
+                    "generated_at": "2026-01-01T00:00:00+00:00",
+                    "config": {"symbols": list(kwargs["symbols"])},
+                    "summary": harness.summarize_statuses(item["status"] for item in symbols),
+                    "diagnostics": None,
+                    "symbols": symbols,
+                }
+
+            harness.run_harness = run_harness
+            harness.build_swift_cli = lambda **kwargs: mock.Mock(config="release", describe=lambda: {})
+            return harness
+
+        patches = [
+            mock.patch.object(parity_matrix, "load_harness", load),
+            mock.patch.object(parity_merge, "load_harness", load),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def run_tool(self, module, *argv: str) -> int:
+        with mock.patch.object(sys, "argv", [module.__name__, *argv]), contextlib.redirect_stdout(io.StringIO()):
+            return module.main()
+
+    def matrix(self, output: str, *extra: str) -> Path:
+        self.run_tool(parity_matrix, "--package-path", str(PACKAGE), "--output-dir", str(self.root / output), *extra)
+        return self.root / output / "aggregate.json"
+
+    def test_rerun_shard_merges_with_the_other_shards(self) -> None:
+        symbols = next(scenario.symbols for scenario in parity_matrix.SCENARIOS if scenario.name == self.scenario)
+        failing = symbols[0]
+        self.statuses[failing] = "fail"
+        index = parity_matrix.shard_of(self.scenario, failing, 2) + 1
+        shards = {
+            shard: self.matrix(f"shard-{shard}", "--scenario", self.scenario, "--shard", f"{shard}/2")
+            for shard in (1, 2)
+        }
+
+        self.statuses.clear()
+        rerun = self.matrix("rerun", "--rerun-from", str(shards[index]))
+        rerun_aggregate = json.loads(rerun.read_text(encoding="utf-8"))
+        self.assertEqual(rerun_aggregate["rerun"]["pairs"], 1)
+        self.assertEqual(rerun_aggregate["shard"], json.loads(shards[index].read_text(encoding="utf-8"))["shard"])
+
+        merged = self.root / "merged"
+        inputs = [str(rerun), str(shards[3 - index])]
+        code = self.run_tool(parity_merge, "--package-path", str(PACKAGE), "--output-dir", str(merged), *inputs)
+        self.assertEqual(code, 0)
+        report = json.loads((merged / f"{self.scenario}.json").read_text(encoding="utf-8"))
+        self.assertEqual([item["symbol"] for item in report["symbols"]], list(symbols))
+        self.assertEqual({item["status"] for item in report["symbols"]}, {"pass"})
+
+if __name__ == "__main__":
+    unittest.main()
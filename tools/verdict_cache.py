@@ -0,0 +1,130 @@
+"""Content-hash verdict cache for the hardening gates and source migrations.
+
+Verdicts are addressed by the SHA-256 of (tool, rule set, file contents), so a
+changed source, a changed rule or a changed migration spec never replays a
+stale verdict. File digests go through a stat index (size + mtime_ns, as git's
+index does), so files that have not been touched since the last run are not
+even read. Everything lives under ``.build/hardening-cache`` and can be deleted
+at any time; ``--no-cache`` on the gate and preparation scripts bypasses it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_CACHE_DIR = ROOT / ".build" / "hardening-cache"
+# Bump when the meaning of a cached verdict changes (gate/migration engine semantics).
+CACHE_SCHEMA_VERSION = 1
+
+
+def digest_json(value: Any) -> str:
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def digest_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class VerdictCache:
+    def __init__(self, root: Path = DEFAULT_CACHE_DIR, *, repo_root: Path = ROOT, enabled: bool = True) -> None:
+        self.root = root
+        self.repo_root = repo_root
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index_path = root / "stat-index.json"
+        self._index: Dict[str, list] = {}
+        self._index_dirty = False
+        if enabled:
+            try:
+                loaded = json.loads(self._index_path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                loaded = {}
+            if loaded.get("schema_version") == CACHE_SCHEMA_VERSION and isinstance(loaded.get("files"), dict):
+                self._index = loaded["files"]
+
+    @classmethod
+    def for_repo(cls, repo_root: Path = ROOT, *, enabled: bool = True) -> "VerdictCache":
+        return cls(repo_root / ".build" / "hardening-cache", repo_root=repo_root, enabled=enabled)
+
+    def file_sha256(self, relative: str) -> Optional[str]:
+        """SHA-256 of a repository file, or ``None`` when it cannot be read."""
+        path = self.repo_root / relative
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._index.get(relative)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return entry[2]
+        try:
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        except OSError:
+            return None
+        self.remember(relative, digest)
+        return digest
+
+    def remember(self, relative: str, digest: str) -> None:
+        """Record `digest` for the file as it is on disk now (e.g. right after a write)."""
+        try:
+            stat = (self.repo_root / relative).stat()
+        except OSError:
+            return
+        with self._lock:
+            self._index[relative] = [stat.st_size, stat.st_mtime_ns, digest]
+            self._index_dirty = True
+
+    def key(self, tool: str, ruleset: str, digests: Mapping[str, str]) -> str:
+        return digest_json(
+            {"schema": CACHE_SCHEMA_VERSION, "tool": tool, "ruleset": ruleset, "files": dict(sorted(digests.items()))}
+        )
+
+    def path(self, key: str) -> Path:
+        return self.root / "verdicts" / key[:2] / f"{key}.json"
+
+    def load(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        try:
+            entry = json.loads(self.path(key).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            entry = None
+        with self._lock:
+            if isinstance(entry, dict) and "verdict" in entry:
+                self.hits += 1
+                return entry["verdict"]
+            self.misses += 1
+        return None
+
+    def store(self, key: str, verdict: Any) -> None:
+        if not self.enabled:
+            return
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temp.write_text(json.dumps({"stored_at": time.time(), "verdict": verdict}, sort_keys=True), encoding="utf-8")
+        os.replace(temp, path)
+
+    def save(self) -> None:
+        if not self.enabled or not self._index_dirty:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        temp = self._index_path.with_name(f".{self._index_path.name}.{os.getpid()}.tmp")
+        with self._lock:
+            document = {"schema_version": CACHE_SCHEMA_VERSION, "files": dict(sorted(self._index.items()))}
+            self._index_dirty = False
+        temp.write_text(json.dumps(document, sort_keys=True), encoding="utf-8")
+        os.replace(temp, self._index_path)
+
+    def describe(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "hits": self.hits, "misses": self.misses, "root": str(self.root)}
@@ -10,10 +10,29 @@ echo "== Python hardening/parity script syntax =="
 python3 -m py_compile \
   tools/parity_harness.py \
   tools/parity_matrix.py \
+  tools/parity_fixtures.py \
+  tools/parity_standin.py \
+  tools/parity_recorder.py \
+  tools/parity_bench.py \
+  tools/parity_tolerances.py \
+  tools/parity_rescore.py \
+  tools/parity_ledger.py \
+  tools/parity_diff.py \
+  tools/parity_merge.py \
+  tools/diagnostics_analyzer.py \
+  tools/request_simulator.py \
+  tools/source_migrations.py \
+  tools/hardening_migrations.py \
+  tools/verdict_cache.py \
   tools/apply-transport-extraction.py \
   tools/apply-core-rate-limit-hardening.py \
   tools/prepare-hardening-candidate.py \
-  tools/verify-hardening-source-state.py
+  tools/hardening_gate.py \
+  tools/verify-hardening-source-state.py \
+  tools/verify-final-hardening-source-state.py
+
+echo "== Offline tool tests =="
+python3 -m unittest discover -s tools/tests
 
 echo "== Static hardening source state =="
 python3 tools/verify-hardening-source-state.py